@@ -1,60 +1,86 @@
+# ASR backends are imported on demand (see asr_system_factory), so importing the package does not
+# load heavy dependencies (torch, transformers, NeMo, cloud SDKs) of backends that are not used.
+# Backend classes can still be imported from the package, e.g. "from asr_systems import FacebookMMS".
+_BACKEND_MODULES = {
+    "BaseASRSystem": "base_asr_system",
+    "GoogleCloudASR": "google_cloud_asr",
+    "GoogleCloudASRV2": "google_cloud_asr_v2",
+    "AzureCloudASR": "azure_cloud_asr",
+    "WhisperCloudASR": "whisper_cloud_asr",
+    "WhisperLocalASR": "whisper_local_asr",
+    "FacebookMMS": "facebook_mms_local",
+    "FacebookWav2Vec": "facebook_wav2vec",
+    "NvidiaNemoASR": "nvidia_nemo_asr",
+    "AssemblyAIASR": "assembly_ai_asr",
+    "CacheOnlyASRSystem": "cache_only_asr_system",
+    # failing when running locally (CUDA error)
+    #"OWSMLocalASR": "owsm_local_asr",
+}
 
-from .base_asr_system import BaseASRSystem
-from .google_cloud_asr import GoogleCloudASR
-from .google_cloud_asr_v2 import GoogleCloudASRV2
-from .azure_cloud_asr import AzureCloudASR
-from .whisper_cloud_asr import WhisperCloudASR
-from .whisper_local_asr import WhisperLocalASR
-from .facebook_mms_local import FacebookMMS
-from .facebook_wav2vec import FacebookWav2Vec
-from .nvidia_nemo_asr import NvidiaNemoASR
-from .assembly_ai_asr import AssemblyAIASR
+# if you added a new ASR system, add its class and module here
 
-# failing when running locally (CUDA error)
-#from .owsm_local_asr import OWSMLocalASR
+def __getattr__(name):
+    """Import the module of an ASR backend class on first access."""
+    if name in _BACKEND_MODULES:
+        import importlib
+        return getattr(importlib.import_module("." + _BACKEND_MODULES[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-# if you added a new ASR system, import it here
+def initialize_asr_system(system, model, config_file, inference_engine=None):
+    return asr_system_factory(system, model, config_file, inference_engine)
 
-def initialize_asr_system(system, model, config_file):
-    return asr_system_factory(system, model, config_file)
+def initialize_cache_only_asr_system(system, model, version=None):
+    """Create a reader of cached hypotheses without loading the model or the cloud client."""
+    from .cache_only_asr_system import CacheOnlyASRSystem
+    return CacheOnlyASRSystem(system, model, version)
 
-def asr_system_factory(system, model, config):
+def asr_system_factory(system, model, config, inference_engine=None):
     if system == 'google':
+        from .google_cloud_asr import GoogleCloudASR
         google_api_key_path = config.get("CREDENTIALS", "GOOGLE_API_KEY_FILE")
         return GoogleCloudASR(system, model, google_api_key_path)
     
     elif system == 'google_v2':
+        from .google_cloud_asr_v2 import GoogleCloudASRV2
         google_api_key_path = config.get("CREDENTIALS", "GOOGLE_API_KEY_FILE")
         project_id = config.get("CREDENTIALS", "GOOGLE_PROJECT_ID")
         return GoogleCloudASRV2(system, model, google_api_key_path, project_id)
     
     elif system == 'azure':
+        from .azure_cloud_asr import AzureCloudASR
         azure_api_key_path = config.get("CREDENTIALS", "AZURE_API_KEY")
         azure_region = config.get("CLOUD_ASR_SETTINGS", "AZURE_REGION")
         return AzureCloudASR(system, model, azure_api_key_path, azure_region)
     
     elif system == 'whisper_cloud':
+        from .whisper_cloud_asr import WhisperCloudASR
         openai_api_key = config.get("CREDENTIALS", "WHISPER_API_KEY")
         return WhisperCloudASR(system, model, openai_api_key)
 
     elif system == 'assembly_ai':
+        from .assembly_ai_asr import AssemblyAIASR
         assemblyai_api_key = config.get("CREDENTIALS", "ASSEMBLYAI_API_KEY")
         return AssemblyAIASR(system, model, assemblyai_api_key)
         
     elif system == 'whisper_local':
+        from .whisper_local_asr import WhisperLocalASR
         return WhisperLocalASR(system, model)
     
     elif system == 'mms':
-        return FacebookMMS(system, model)
+        from .facebook_mms_local import FacebookMMS
+        return FacebookMMS(system, model, inference_engine=inference_engine)
     
     elif system == 'wav2vec2':
-        return FacebookWav2Vec(system, model)
+        from .facebook_wav2vec import FacebookWav2Vec
+        return FacebookWav2Vec(system, model, inference_engine=inference_engine)
     
     elif system == 'nemo':
+        from .nvidia_nemo_asr import NvidiaNemoASR
         return NvidiaNemoASR(system, model)
 
     # Failiing when running locally (CUDA error)
     #elif system == 'owsm_local':
+    #    from .owsm_local_asr import OWSMLocalASR
     #    return OWSMLocalASR(system, model)
     
     # Add your ASR system here
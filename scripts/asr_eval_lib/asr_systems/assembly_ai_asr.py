@@ -1,6 +1,10 @@
 from .base_asr_system import BaseASRSystem
+from .request_engine import is_rate_limit_error
 import assemblyai as aai
 from pathlib import Path
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class AssemblyAIASR(BaseASRSystem):
@@ -26,7 +30,6 @@ class AssemblyAIASR(BaseASRSystem):
         Raises:
             SystemExit: If an unsupported model is specified.
         """
-        print(system, model, language_code)
         super().__init__(system, model, language_code)
         
         aai.settings.api_key = credentials
@@ -38,10 +41,10 @@ class AssemblyAIASR(BaseASRSystem):
         elif model == "nano":
             speech_model=aai.SpeechModel.nano
         else:
-            print("Model {} not supported".format(model))
+            logger.error("Model %s not supported", model)
             exit()
         lang_code_short = language_code.split("-")[0]
-        print("Language code short: ", lang_code_short)
+        logger.debug("Language code short: %s", lang_code_short)
         self.config = aai.TranscriptionConfig(language_code=lang_code_short, speech_model=speech_model)
         
     def generate_asr_hyp(self, speech_file):
@@ -55,15 +58,17 @@ class AssemblyAIASR(BaseASRSystem):
         """
         try:   
             # Create transcription from audio file
-            print("Transcribing audio file: ", speech_file)
+            self.hyp_gen_stats.debug(speech_file, "transcribing with AssemblyAI")
             transcript_obj = self.transcriber.transcribe(speech_file, config=self.config)
             #print("Transcript object: ", transcript_obj)
             hyp = transcript_obj.text
             #print("Generated hyp inside assembly ASR class: ", hyp)       
             #time.sleep(1)
         except Exception as e:
-            print(f"Other error: {e}")
+            # rate limit errors are retried by the request engine
+            if is_rate_limit_error(e):
+                raise
+            logger.warning("AssemblyAI error for %s: %s", speech_file, e)
         
-        self.update_cache(speech_file, hyp)
         return hyp
 
@@ -0,0 +1,164 @@
+"""
+Audio Digest Index Module.
+
+This module computes content-based cache keys of audio files. The key is a digest of the
+audio file bytes, so cached hypotheses survive moving the data to another directory or
+machine and are shared by identical recordings in different subsets.
+
+Digests are persisted in a path -> digest side index
+(<BIGOS_EVAL_DATA_REPO_PATH>/asr_hyps_cache/audio_digests.jsonl), so that audio files are
+hashed only once. An entry is reused only while the file size and modification time match.
+
+The index file is written by a single process. HYP_GEN worker processes collect their new
+digests in memory (collect_new_digests) and send them to the parent process, which appends them.
+"""
+
+import os
+import hashlib
+import threading
+
+from .hyp_cache import append_jsonl_line, read_jsonl_cache
+
+DIGEST_KEY_PREFIX = "blake2b:"
+
+# indexes shared by all ASR systems initialized in the process
+_audio_digest_indexes = {}
+
+# True in processes whose new digests are written by another process
+_collect_new_digests = False
+
+def get_audio_digest_index(index_file):
+    """Get the digest index stored in the index file, loading it on first use.
+
+    Args:
+        index_file (str): Path to the JSONL side index on disk.
+
+    Returns:
+        AudioDigestIndex: The index shared by all ASR systems in the process.
+    """
+    if index_file not in _audio_digest_indexes:
+        _audio_digest_indexes[index_file] = AudioDigestIndex(index_file)
+    return _audio_digest_indexes[index_file]
+
+def collect_new_digests():
+    """Keep new digests of all indexes of the process in memory instead of appending them to the index files.
+
+    Used by HYP_GEN worker processes, the parent process writes the digests taken with pop_new_digests.
+    """
+    global _collect_new_digests
+    _collect_new_digests = True
+    for index in _audio_digest_indexes.values():
+        if index.pending is None:
+            index.pending = {}
+
+def pop_new_digests():
+    """Take the new digests collected since the last call.
+
+    Returns:
+        dict: Dictionary mapping index files to lists of (audio_path, entry) tuples.
+    """
+    new_digests = {}
+    for index_file, index in _audio_digest_indexes.items():
+        items = index.pop_pending()
+        if items:
+            new_digests[index_file] = items
+    return new_digests
+
+def compute_audio_digest(audio_path, chunk_size=1 << 20):
+    """Compute the digest of the audio file bytes.
+
+    Args:
+        audio_path (str): Path to the audio file.
+        chunk_size (int, optional): Number of bytes read at once. Defaults to 1 MiB.
+
+    Returns:
+        str: Hex encoded 128-bit BLAKE2b digest.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(audio_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class AudioDigestIndex:
+    """Persistent path -> digest index of audio files.
+
+    Attributes:
+        index_file (str): Path to the JSONL side index on disk.
+        entries (dict): Dictionary mapping audio paths to {"size", "mtime_ns", "digest"} dictionaries.
+        lock (threading.Lock): Lock serializing updates of the index from concurrent requests.
+        pending (dict or None): New entries not written to the index file (worker processes),
+            None if new entries are appended to the index file.
+    """
+
+    def __init__(self, index_file):
+        """Initialize the index and load it from disk if it exists.
+
+        Args:
+            index_file (str): Path to the JSONL side index on disk.
+        """
+        self.index_file = index_file
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.pending = {} if _collect_new_digests else None
+        if os.path.exists(index_file):
+            self.entries, _ = read_jsonl_cache(index_file)
+
+    def get_digest(self, audio_path):
+        """Get the digest of the audio file, hashing it only if it is new or was modified.
+
+        Args:
+            audio_path (str): Path to the audio file.
+
+        Returns:
+            str or None: Hex encoded digest, None if the file does not exist.
+        """
+        try:
+            stat = os.stat(audio_path)
+        except OSError:
+            return None
+        entry = self.entries.get(audio_path)
+        if entry is not None and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+            return entry["digest"]
+
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "digest": compute_audio_digest(audio_path)}
+        self.add_entries([(audio_path, entry)])
+        return entry["digest"]
+
+    def add_entries(self, items):
+        """Add new entries to the index and append them to the index file (or collect them, see collect_new_digests).
+
+        Args:
+            items (list): List of (audio_path, {"size", "mtime_ns", "digest"}) tuples.
+        """
+        with self.lock:
+            for audio_path, entry in items:
+                self.entries[audio_path] = entry
+                if self.pending is not None:
+                    self.pending[audio_path] = entry
+                else:
+                    append_jsonl_line(self.index_file, audio_path, entry)
+
+    def pop_pending(self):
+        """Take the new entries collected since the last call.
+
+        Returns:
+            list: List of (audio_path, entry) tuples, empty if new entries are appended to the index file.
+        """
+        with self.lock:
+            items = list((self.pending or {}).items())
+            if self.pending:
+                self.pending = {}
+        return items
+
+    def get_key(self, audio_path):
+        """Get the content-based cache key of the audio file.
+
+        Args:
+            audio_path (str): Path to the audio file.
+
+        Returns:
+            str or None: Cache key, e.g. "blake2b:<digest>", None if the file does not exist.
+        """
+        digest = self.get_digest(audio_path)
+        return DIGEST_KEY_PREFIX + digest if digest is not None else None
@@ -0,0 +1,144 @@
+"""
+Audio Prefetching Module.
+
+Local backends decode and resample every audio file right before running the model on it,
+so the model is idle while the audio is decoded. AudioPrefetcher decodes the next files of
+the planned processing order in background threads into a bounded window, while the model
+runs on the current file.
+
+The prefetcher reports the time spent in every stage (decoding in the background threads,
+waiting of the model for audio, and the rest of the pipeline, i.e. inference), so that it
+can be checked that the model is not waiting on audio.
+"""
+
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+class AudioPrefetcher:
+    """Bounded producer/consumer pipeline decoding audio files ahead of the model.
+
+    Files are decoded in the planned order, at most `queue_depth` files ahead of the file
+    requested last. Requesting a file further in the plan skips the files before it (e.g.
+    samples found in the cache). Files outside of the plan are decoded on request.
+
+    Attributes:
+        decode_fn (callable): Function decoding the audio file into an audio array.
+        speech_files (list): Planned processing order of the audio files.
+        queue_depth (int): Maximum number of files decoded ahead.
+        decode_sec (float): Total decoding time of the background threads.
+        wait_sec (float): Total time the consumer waited for audio.
+        nr_of_prefetched_files (int): Number of files served from the prefetch window.
+        nr_of_missed_files (int): Number of files outside of the plan, decoded on request.
+    """
+
+    def __init__(self, decode_fn, speech_files, queue_depth=4, num_workers=2):
+        """Start decoding the first files of the plan.
+
+        Args:
+            decode_fn (callable): Function decoding the audio file into an audio array.
+            speech_files (list): Planned processing order of the audio files.
+            queue_depth (int, optional): Maximum number of files decoded ahead. Defaults to 4.
+            num_workers (int, optional): Number of decoding threads. Defaults to 2.
+        """
+        self.decode_fn = decode_fn
+        self.speech_files = list(speech_files)
+        self.positions = {speech_file: i for i, speech_file in reversed(list(enumerate(self.speech_files)))}
+        self.queue_depth = max(1, queue_depth)
+        self.executor = ThreadPoolExecutor(max_workers=max(1, num_workers))
+        self.futures = {}
+        self.next_position = 0
+        self.lock = threading.Lock()
+        self.decode_sec = 0.0
+        self.wait_sec = 0.0
+        self.nr_of_prefetched_files = 0
+        self.nr_of_missed_files = 0
+        self.start_time = time.monotonic()
+        self._fill(0)
+
+    def _decode(self, speech_file):
+        """Decode the audio file and measure the decoding time."""
+        start_time = time.monotonic()
+        try:
+            return self.decode_fn(speech_file)
+        finally:
+            with self.lock:
+                self.decode_sec += time.monotonic() - start_time
+
+    def _fill(self, position):
+        """Drop the files before the position and schedule decoding up to queue_depth files ahead.
+
+        Args:
+            position (int): Position of the file requested by the consumer in the plan.
+        """
+        for i in list(self.futures):
+            if i < position:
+                self.futures.pop(i).cancel()
+        self.next_position = max(self.next_position, position)
+        while self.next_position < len(self.speech_files) and self.next_position < position + self.queue_depth:
+            self.futures[self.next_position] = self.executor.submit(self._decode, self.speech_files[self.next_position])
+            self.next_position += 1
+
+    def get(self, speech_file):
+        """Get the decoded audio of the file, waiting for the background threads if needed.
+
+        Args:
+            speech_file (str): Path to the audio file.
+
+        Returns:
+            The audio array returned by decode_fn.
+
+        Raises:
+            Exception: Errors raised by decode_fn.
+        """
+        position = self.positions.get(speech_file)
+        if position is None or (position not in self.futures and position < self.next_position):
+            # not planned or already consumed, e.g. retried generation
+            self.nr_of_missed_files += 1
+            start_time = time.monotonic()
+            try:
+                return self.decode_fn(speech_file)
+            finally:
+                self.wait_sec += time.monotonic() - start_time
+
+        self._fill(position)
+        future = self.futures.pop(position)
+        self._fill(position + 1)
+        start_time = time.monotonic()
+        try:
+            return future.result()
+        finally:
+            self.wait_sec += time.monotonic() - start_time
+            self.nr_of_prefetched_files += 1
+
+    def get_stats(self):
+        """Get the per-stage timing of the pipeline.
+
+        Returns:
+            dict: Wall time, decoding time, time the model waited for audio and the rest
+                  of the wall time (inference), in seconds, and the numbers of files.
+        """
+        wall_sec = time.monotonic() - self.start_time
+        return {"wall_sec": wall_sec, "decode_sec": self.decode_sec, "wait_sec": self.wait_sec,
+                "inference_sec": wall_sec - self.wait_sec, "prefetched_files": self.nr_of_prefetched_files,
+                "missed_files": self.nr_of_missed_files}
+
+    def close(self):
+        """Stop decoding and log the per-stage timing.
+
+        Returns:
+            dict: Per-stage timing returned by get_stats.
+        """
+        for future in self.futures.values():
+            future.cancel()
+        self.futures = {}
+        self.executor.shutdown(wait=True)
+        stats = self.get_stats()
+        logger.info("Audio prefetch: %d prefetched files, %d decoded on request", stats["prefetched_files"], stats["missed_files"])
+        logger.info("Audio prefetch timing [s]: wall %.1f, decoding %.1f, waiting for audio %.1f (%.1f%% of wall time), inference and other %.1f",
+                    stats["wall_sec"], stats["decode_sec"], stats["wait_sec"], 100 * stats["wait_sec"] / stats["wall_sec"] if stats["wall_sec"] else 0.0,
+                    stats["inference_sec"])
+        return stats
@@ -1,5 +1,9 @@
 from .base_asr_system import BaseASRSystem
+from .request_engine import is_rate_limit_error, RateLimitExceededError
 from azure.cognitiveservices.speech import SpeechConfig, SpeechRecognizer, AudioConfig, ResultReason, CancellationReason
+import logging
+
+logger = logging.getLogger(__name__)
 
 class AzureCloudASR(BaseASRSystem):
     """Microsoft Azure Speech Service implementation for the BIGOS framework.
@@ -43,19 +47,25 @@ class AzureCloudASR(BaseASRSystem):
                 result = recognizer.recognize_once()
                 hyp = result.text
                 if result.reason == ResultReason.RecognizedSpeech:
-                    print("Azure: {}".format(hyp))
+                    self.hyp_gen_stats.debug(speech_file, "Azure hypothesis: %s", hyp)
                 elif result.reason == ResultReason.NoMatch:
-                    print("No speech could be recognized: {}".format(result.no_match_details))
+                    self.hyp_gen_stats.debug(speech_file, "no speech could be recognized: %s", result.no_match_details)
                 elif result.reason == ResultReason.Canceled:
                     cancellation_details = result.cancellation_details
-                    print("Speech Recognition canceled: {}".format(cancellation_details.reason))
+                    logger.warning("Speech recognition of %s canceled: %s", speech_file, cancellation_details.reason)
                     if cancellation_details.reason == CancellationReason.Error:
-                        print("Error details: {}".format(cancellation_details.error_details))
-                        print("Did you set the speech resource key and region values?")
+                        logger.warning("Error details: %s", cancellation_details.error_details)
+                        if is_rate_limit_error(Exception(cancellation_details.error_details)):
+                            raise RateLimitExceededError(cancellation_details.error_details)
+                        logger.warning("Did you set the speech resource key and region values?")
             except Exception as e:
-                print(f"Error generating outputs: {e}. Skipping generation and returing empty hypothesis.")
+                # rate limit errors are retried by the request engine
+                if is_rate_limit_error(e):
+                    raise
+                logger.warning("Error generating outputs for %s: %s. Skipping generation and returning empty hypothesis.", speech_file, e)
                 hyp = ""        
         except Exception as e:
-            print(f"Other error: {e}")
-        self.update_cache(speech_file, hyp)
+            if is_rate_limit_error(e):
+                raise
+            logger.warning("Azure error for %s: %s", speech_file, e)
         return(hyp)
@@ -1,24 +1,68 @@
 import os
 import json
 from datetime import datetime
-import librosa
-import sys
+import asyncio
+import logging
+import threading
+import time
 
-# Get the parent directory
+# scripts.* modules are importable after the entry points added the repository root to sys.path
+from scripts.utils.utils import read_config_ini, read_config_json, configure_logging, get_log_settings
+from scripts.utils.sample_catalog import get_sample_catalog, get_sample_catalog_file
+from .hyp_cache import init_hyp_cache_store, get_cache_codename, INVALID_HYP_MARKERS
+from .hyp_cache_service import HypCacheServiceClient
+from .audio_digest import get_audio_digest_index
+from .request_engine import CLOUD_ASR_SYSTEMS, create_request_engine
+from .audio_prefetch import AudioPrefetcher
+from .hyp_gen_stats import HypGenStats
+
+logger = logging.getLogger(__name__)
+
+# repository root, containing the user-specific config
 repo_root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../'))
-print("repo_root_dir", repo_root_dir)
 
-# Add the parent directory to sys.path
-sys.path.insert(0, repo_root_dir)
+# user-specific config and cache settings, read on first use (not at import time)
+_config_user = None
+_cache_settings = None
 
-from scripts.utils.utils import read_config_ini, read_config_json
+def get_config_user():
+    """Get the user-specific config, read from config/user-specific/config.ini on first use.
+
+    Returns:
+        configparser.ConfigParser: User-specific config.
+    """
+    global _config_user
+    if _config_user is None:
+        config_user_path = os.path.join(repo_root_dir, 'config/user-specific/config.ini')
+        logger.debug("config_user_path %s", config_user_path)
+        _config_user = read_config_ini(config_user_path)
+    return _config_user
 
-# Load the user-specific config file
-config_user_path = os.path.join(repo_root_dir, 'config/user-specific/config.ini')
-print("config_user_path", config_user_path)
+def get_cache_settings():
+    """Get the hypothesis and logits cache settings (optional CACHE_SETTINGS section of the user-specific config).
+
+    Returns:
+        dict: Cache settings with defaults for the missing options.
+    """
+    global _cache_settings
+    if _cache_settings is None:
+        config_user = get_config_user()
+        _cache_settings = {
+            "backend": config_user.get("CACHE_SETTINGS", "HYP_CACHE_BACKEND", fallback="jsonl"),
+            "sqlite_file": config_user.get("CACHE_SETTINGS", "HYP_CACHE_SQLITE_FILE", fallback=None),
+            "write_mode": config_user.get("CACHE_SETTINGS", "HYP_CACHE_WRITE_MODE", fallback="append"),
+            "compaction_interval": config_user.getint("CACHE_SETTINGS", "HYP_CACHE_COMPACTION_INTERVAL", fallback=1000),
+            "service_url": config_user.get("CACHE_SETTINGS", "HYP_CACHE_SERVICE_URL", fallback=None),
+            "service_token": config_user.get("CACHE_SETTINGS", "HYP_CACHE_SERVICE_TOKEN", fallback=None),
+            "key_scheme": config_user.get("CACHE_SETTINGS", "HYP_CACHE_KEY_SCHEME", fallback="path"),
+            "flush_every": config_user.getint("CACHE_SETTINGS", "HYP_CACHE_FLUSH_EVERY", fallback=1),
+            "flush_interval_sec": config_user.getfloat("CACHE_SETTINGS", "HYP_CACHE_FLUSH_INTERVAL_SEC", fallback=30),
+            "logits_cache": config_user.getboolean("CACHE_SETTINGS", "LOGITS_CACHE", fallback=False),
+            "logits_cache_shard_size": config_user.getint("CACHE_SETTINGS", "LOGITS_CACHE_SHARD_SIZE", fallback=256),
+        }
+    return _cache_settings
 
-config_user = read_config_ini(config_user_path)
-bigos_eval_data_dir = config_user["PATHS"]["BIGOS_EVAL_DATA_REPO_PATH"]
+CACHE_KEY_SCHEMES = ["path", "digest"]
 
 class BaseASRSystem:
     """Base class for all ASR system implementations in the BIGOS framework.
@@ -38,22 +82,49 @@ class BaseASRSystem:
         name (str): Human-readable name for this ASR system.
         common_cache_dir (str): Directory for storing cached hypotheses.
         cache (dict): Dictionary storing cached transcription results.
-        cache_file (str): Path to the cache file on disk.
+        cache_file (str): Path to the JSONL cache file on disk.
+        cache_store (JsonlHypCacheStore, IndexedJsonlHypCacheStore, SqliteHypCacheStore or WriteBehindHypCacheStore):
+            Storage layer persisting the cache on disk.
+        cache_service (HypCacheServiceClient or None): Client of the hypothesis cache service shared
+            across machines, None if HYP_CACHE_SERVICE_URL is not configured.
+        audio_digest_index (AudioDigestIndex or None): Path -> digest index of audio files used for
+            content-based cache keys, None if HYP_CACHE_KEY_SCHEME is "path".
+        request_engine (RequestEngine or None): Concurrent, rate limited dispatcher of requests
+            to the cloud ASR provider, None for local ASR systems.
+        cache_lock (threading.RLock): Lock serializing cache access from the request engine and asyncio worker threads.
+        async_clients (dict): Asyncio clients of the provider SDK, keyed by client factory and event loop.
+        audio_prefetcher (AudioPrefetcher or None): Background decoding of the next audio files, None if disabled.
+        sample_catalog (SampleCatalog): Catalog of audio file existence, sizes and durations.
+        fallback_models (dict): Fallback models (e.g. CPU copies of GPU models) loaded on first use, keyed by name.
+        model_manager (ModelManager or None): Manager enforcing the memory budget, None if the system
+            was not loaded by a ModelManager.
+        logits_cache (LogitsCache or None): Cache of the logits of CTC models, None if LOGITS_CACHE is disabled
+            or the system is not a CTC model.
     """
+
+    # attributes holding the models and processors of local ASR systems, released by unload
+    MODEL_ATTRIBUTES = ()
     
-    def __init__(self, system, model, language_code):
+    def __init__(self, system, model, language_code, version=None):
         """Initialize the ASR system with basic parameters.
         
         Args:
             system (str): Identifier for the ASR system type (e.g., 'google', 'azure').
             model (str): The specific model of the ASR system being used.
             language_code (str): Language code in format supported by the ASR system.
+            version (str, optional): Version of the ASR system in YYQ format. Defaults to None (2024Q1).
+            
+        Raises:
+            ValueError: If an unsupported cache key scheme is configured.
         """
         self.system = system
         self.model = model
         self.language_code = language_code
         self.max_audio_length_to_process_sec = 300
-        self.bigos_eval_data_dir = bigos_eval_data_dir
+        config_user = get_config_user()
+        configure_logging(config_user)
+        cache_settings = get_cache_settings()
+        self.bigos_eval_data_dir = config_user["PATHS"]["BIGOS_EVAL_DATA_REPO_PATH"]
 
         # add version encoded as YYQ (year and quarter) to codename to control for changes in the ASR system and model over time
         # assumes that the ASR system and model are evaluated at most once per quarter
@@ -62,32 +133,56 @@ class BaseASRSystem:
 
         #self.year = datetime.now().year
         #self.quarter = (datetime.now().month-1)//3 + 1
-        self.version = "2024Q1"
-        # TODO - add version as input argument to control ASR version somehow
+        self.version = version.strip() if version else "2024Q1"
         #"{}Q{}".format(self.year, self.quarter)
         
-        self.codename = "{}_{}".format(system.lower(), model.lower())
-        #remove "/" from codename
-        self.codename = self.codename.replace("/", "_")
+        self.codename = get_cache_codename(system, model)
         
         self.name = "{} - {}".format(system.upper(), model.upper())
-        print("Initializing ASR system {}, model {}, version {}".format(system, model, self.version))
+        logger.info("Initializing ASR system %s, model %s, version %s", system, model, self.version)
 
         self.common_cache_dir = os.path.join(self.bigos_eval_data_dir, "asr_hyps_cache")
         os.makedirs(self.common_cache_dir, exist_ok=True)
 
         # Set up cache for already processed audio samples
-        self.cache = {}
         self.cache_file = os.path.join(self.common_cache_dir, self.codename + ".asr_cache.jsonl")
-        print("Reading cache: ", self.cache_file)
-        if os.path.exists(self.cache_file):
-            with open(self.cache_file, "r") as f:
-                # read as JSONL file
-                for line in f:
-                    self.cache.update(json.loads(line))
-        else:
-            print("Cache file does not exist")
-            
+        logger.info("Reading cache (%s backend): %s", cache_settings["backend"], self.cache_file)
+        self.cache_store = init_hyp_cache_store(cache_settings["backend"], self.common_cache_dir, self.codename, cache_settings["write_mode"],
+                                                cache_settings["compaction_interval"], cache_settings["sqlite_file"],
+                                                cache_settings["flush_every"], cache_settings["flush_interval_sec"])
+
+        self.cache_service = None
+        # audio paths already requested from the cache service in this run
+        self.cache_service_requested_paths = set()
+        if cache_settings["service_url"]:
+            logger.info("Using hypothesis cache service: %s", cache_settings["service_url"])
+            self.cache_service = HypCacheServiceClient(cache_settings["service_url"], cache_settings["service_token"])
+
+        if cache_settings["key_scheme"] not in CACHE_KEY_SCHEMES:
+            raise ValueError(f"Unknown cache key scheme: {cache_settings['key_scheme']}. Supported schemes: {CACHE_KEY_SCHEMES}")
+        self.audio_digest_index = None
+        digest_index_file = os.path.join(self.common_cache_dir, "audio_digests.jsonl")
+        if cache_settings["key_scheme"] == "digest":
+            self.audio_digest_index = get_audio_digest_index(digest_index_file)
+
+        self.cache_lock = threading.RLock()
+        self.async_clients = {}
+        self.audio_prefetcher = None
+        self.sample_catalog = get_sample_catalog(get_sample_catalog_file(config_user), digest_index_file)
+        self.request_engine = None
+        if system in CLOUD_ASR_SYSTEMS:
+            self.request_engine = create_request_engine(config_user, system)
+        self.fallback_models = {}
+        self.model_manager = None
+        self.logits_cache = None
+        log_settings = get_log_settings(config_user)
+        self.hyp_gen_stats = HypGenStats(self.codename, log_settings["progress_every"], log_settings["debug_sample_every"])
+
+    @property
+    def cache(self):
+        """Dictionary storing cached transcription results, keyed by audio path."""
+        return self.cache_store.as_dict()
+
     def get_model(self):
         """Get the model identifier for this ASR system.
         
@@ -109,73 +204,319 @@ class BaseASRSystem:
         Returns:
             str: The transcription result, or "EMPTY"/"INVALID" for problematic cases.
         """
-        # Load the audio into memory
-        print("Processing audio with {}".format(self.get_name()))
-        print("Filename:", os.path.basename(speech_file))
-        print("Path:", speech_file)
+        if not force_hyps:
+            asr_hyp = self.get_valid_hyp_from_cache(speech_file)
+            if asr_hyp is not None:
+                return asr_hyp
 
-        # check librosa version
-        print("Librosa version: ", librosa.__version__)
-        if librosa.__version__ < "0.10.0":
-            audio_duration = round(librosa.get_duration(path=speech_file),2)
-        else:
-            audio_duration = round(librosa.get_duration(filename=speech_file),2)
+        if not self.check_audio(speech_file):
+            self.hyp_gen_stats.count("skipped")
+            return ""
+
+        asr_hyp = self.generate_hyp(speech_file)
+        return self.handle_new_hyp(speech_file, asr_hyp)
+
+    async def aprocess_audio(self, speech_file, force_hyps):
+        """Asyncio version of process_audio, generating the hypothesis with agenerate_asr_hyp.
         
-        print("Audio duration [s]: ", audio_duration)
+        Cache lookups, audio checks and cache writes (file I/O and requests to the cache service)
+        run in worker threads, so that they do not block the other requests in flight.
+        
+        Args:
+            speech_file (str): Path to the audio file to transcribe.
+            force_hyps (bool): If True, ignore the cache and force regeneration of hypothesis.
+            
+        Returns:
+            str: The transcription result, or "EMPTY"/"INVALID" for problematic cases.
+        """
+        if not force_hyps:
+            asr_hyp = await asyncio.to_thread(self.get_valid_hyp_from_cache, speech_file)
+            if asr_hyp is not None:
+                return asr_hyp
 
-        # Check if the files exists
-        if not os.path.exists(speech_file):
-            print("File does not exist")
-            return ""
-        if os.path.getsize(speech_file) == 0:
-            print("File is empty")
+        if not await asyncio.to_thread(self.check_audio, speech_file):
+            self.hyp_gen_stats.count("skipped")
             return ""
+
+        asr_hyp = await self.agenerate_hyp(speech_file)
+        if asr_hyp is None:
+            # retry here, so that handle_new_hyp does not block the event loop with a synchronous retry
+            self.hyp_gen_stats.debug(speech_file, "hypothesis is None, trying again")
+            asr_hyp = await self.agenerate_hyp(speech_file)
+            if asr_hyp is None:
+                self.hyp_gen_stats.debug(speech_file, "hypothesis is None again, saving INVALID in cache")
+                await asyncio.to_thread(self.update_cache, speech_file, "INVALID")
+                self.hyp_gen_stats.count("failed")
+                return "INVALID"
+        return await asyncio.to_thread(self.handle_new_hyp, speech_file, asr_hyp)
+
+    def process_audio_async(self, speech_files, force_hyps):
+        """Process audio files with up to ASYNC_MAX_IN_FLIGHT concurrent asyncio requests.
+        
+        Args:
+            speech_files (list): Paths to the audio files to transcribe.
+            force_hyps (bool): If True, ignore the cache and force regeneration of hypotheses.
+            
+        Returns:
+            list: The transcription results, or "EMPTY"/"INVALID" for problematic cases,
+                  in the order of speech_files (None for failed requests).
+        """
+        async def process_all():
+            return await self.request_engine.amap(lambda speech_file: self.aprocess_audio(speech_file, force_hyps), speech_files)
+
+        return asyncio.run(process_all())
+
+    def process_audio_batch(self, speech_files, force_hyps):
+        """Process a batch of audio files and return transcription results.
+        
+        Cached hypotheses are returned as in process_audio. The remaining files are
+        transcribed with a single generate_asr_hyps_batch call.
+        
+        Args:
+            speech_files (list): Paths to the audio files to transcribe.
+            force_hyps (bool): If True, ignore the cache and force regeneration of hypotheses.
+            
+        Returns:
+            list: The transcription results, or "EMPTY"/"INVALID" for problematic cases,
+                  in the order of speech_files.
+        """
+        asr_hyps = [""] * len(speech_files)
+        files_to_generate = []
+        for i, speech_file in enumerate(speech_files):
+            if not force_hyps:
+                asr_hyp = self.get_valid_hyp_from_cache(speech_file)
+                if asr_hyp is not None:
+                    asr_hyps[i] = asr_hyp
+                    continue
+            if not self.check_audio(speech_file):
+                self.hyp_gen_stats.count("skipped")
+                continue
+            files_to_generate.append(i)
+
+        if files_to_generate:
+            logger.debug("Generating %d hypotheses in a batch", len(files_to_generate))
+            start_time = time.monotonic()
+            new_asr_hyps = self.generate_asr_hyps_batch([speech_files[i] for i in files_to_generate])
+            self.hyp_gen_stats.add_generation_time(time.monotonic() - start_time)
+            for i, asr_hyp in zip(files_to_generate, new_asr_hyps):
+                asr_hyps[i] = self.handle_new_hyp(speech_files[i], asr_hyp)
+        return asr_hyps
+
+    def check_audio(self, speech_file):
+        """Check if the audio file exists, is not empty and is not too long to process.
+        
+        The checks use the sample catalog, so the audio file is opened only if it is not cataloged yet.
+        
+        Args:
+            speech_file (str): Path to the audio file to transcribe.
+            
+        Returns:
+            bool: True if the audio file can be processed.
+        """
+        # existence, size and duration from the sample catalog, the audio file is not opened if it is cataloged
+        sample = self.sample_catalog.get_entry(speech_file)
+
+        # Check if the files exists
+        if not sample["exists"]:
+            logger.warning("File does not exist: %s", speech_file)
+            return False
+        if sample["size"] == 0:
+            logger.warning("File is empty: %s", speech_file)
+            return False
+        if sample["duration"] is None:
+            logger.warning("Audio header can not be read: %s", speech_file)
+            return False
+
+        audio_duration = round(sample["duration"], 2)
+        self.hyp_gen_stats.debug(speech_file, "audio duration %.2f s", audio_duration)
         
         # check if audio length exceeds maximum allowed duration
         if audio_duration > self.max_audio_length_to_process_sec:
-            print("Audio length exceeds max allowed duration of {} seconds. Skipping".format(self.max_audio_length_to_process_sec))
-            return ""
+            self.hyp_gen_stats.debug(speech_file, "audio length exceeds max allowed duration of %s seconds, skipping",
+                                     self.max_audio_length_to_process_sec)
+            return False
+        self.hyp_gen_stats.add_audio_time(sample["duration"])
+        return True
+
+    def decode_audio(self, speech_file):
+        """Decode the audio file and resample it to the sampling rate of the model.
+        
+        Args:
+            speech_file (str): Path to the audio file.
+            
+        Returns:
+            numpy.ndarray: Mono audio array.
+        """
+        import librosa
+        speech_array, _ = librosa.load(speech_file, sr=getattr(self, "sampling_rate", 16000))
+        return speech_array
+
+    def load_audio(self, speech_file):
+        """Get the decoded audio of the file, prefetched in the background if possible.
+        
+        Backends decoding audio themselves (e.g. wav2vec2, MMS) use this method instead of
+        calling librosa directly, so that decoding overlaps with inference.
+        
+        Args:
+            speech_file (str): Path to the audio file.
+            
+        Returns:
+            numpy.ndarray: Mono audio array.
+        """
+        if self.audio_prefetcher is not None:
+            return self.audio_prefetcher.get(speech_file)
+        return self.decode_audio(speech_file)
 
+    def start_audio_prefetch(self, speech_files, force_hyps, queue_depth=4, num_workers=2):
+        """Start decoding the audio files in the background, in the order they will be processed.
+        
+        Files with valid cached hypotheses are not decoded unless force_hyps is set.
+        
+        Args:
+            speech_files (list): Paths to the audio files in the processing order.
+            force_hyps (bool): If True, the hypotheses of all files will be regenerated.
+            queue_depth (int, optional): Maximum number of files decoded ahead. Defaults to 4.
+            num_workers (int, optional): Number of decoding threads. Defaults to 2.
+        """
+        self.stop_audio_prefetch()
         if not force_hyps:
-            # Load results from cache if possible
-            print("Checking cache:")
-            asr_hyp = self.get_hyp_from_cache(speech_file, self.version)
+            speech_files = [speech_file for speech_file in speech_files if not self.has_valid_cached_hyp(speech_file)]
+        logger.info("Prefetching audio of %d files (queue depth: %d, decoding threads: %d)", len(speech_files), queue_depth, num_workers)
+        self.audio_prefetcher = AudioPrefetcher(self.decode_audio, speech_files, queue_depth, num_workers)
 
-            # Generate new hypothesis if cache is empty or None
-            if asr_hyp is None:
-                print("Hypothesis in cache not available. Generating new hypothesis.")
-            elif asr_hyp == "INVALID":
-                print("Hypothesis in cache is invalid. Generating new hypothesis.")
-            elif asr_hyp == "":
-                print("Hypothesis in cache is the empty string. Generating new hypothesis.")
-            else:
-                print("Hypothesis in cache is VALID: {}. Returning.".format(asr_hyp))
-                return asr_hyp
+    def stop_audio_prefetch(self):
+        """Stop the background decoding and print its per-stage timing.
+        
+        Returns:
+            dict or None: Per-stage timing of the prefetcher, None if prefetching was not started.
+        """
+        if self.audio_prefetcher is None:
+            return None
+        stats = self.audio_prefetcher.close()
+        self.audio_prefetcher = None
+        return stats
+
+    def get_fallback_model(self, name, load_fn):
+        """Get a fallback model, loading it on first use.
+        
+        Args:
+            name (str): Name of the fallback model, e.g. "cpu".
+            load_fn (callable): Function loading the fallback model.
+            
+        Returns:
+            The fallback model returned by load_fn.
+            
+        Raises:
+            MemoryError: If the RSS exceeds the budget of the model manager after loading the model.
+        """
+        if name not in self.fallback_models:
+            logger.info("Loading %s fallback model of %s", name, self.codename)
+            self.fallback_models[name] = load_fn()
+            if self.model_manager is not None:
+                try:
+                    self.model_manager.check_budget("{} fallback model of {}".format(name, self.codename))
+                except MemoryError:
+                    del self.fallback_models[name]
+                    raise
+        return self.fallback_models[name]
+
+    def unload(self):
+        """Release the models of the ASR system. The cache stays readable.
+        
+        Buffered cache updates are written to disk and background decoding is stopped.
+        The memory is freed once the models are garbage-collected (see ModelManager.unload).
+        """
+        self.stop_audio_prefetch()
+        self.flush_cache()
+        self.fallback_models = {}
+        for attribute in self.MODEL_ATTRIBUTES:
+            model = getattr(self, attribute, None)
+            # e.g. ONNX Runtime sessions report their statistics on close
+            if hasattr(model, "close"):
+                model.close()
+            setattr(self, attribute, None)
+
+    def has_valid_cached_hyp(self, speech_file):
+        """Check if a valid hypothesis of the audio file is cached, without logging or querying the cache service.
+        
+        Args:
+            speech_file (str): Path to the audio file.
+            
+        Returns:
+            bool: True if the cached hypothesis is not missing, empty or invalid.
+        """
+        asr_hyp = self.get_hyp_from_cache(speech_file, self.version)
+        return asr_hyp is not None and asr_hyp != "" and asr_hyp not in INVALID_HYP_MARKERS
+
+    def get_valid_hyp_from_cache(self, speech_file):
+        """Get the cached hypothesis for the audio file unless it is missing, invalid or empty.
+        
+        Falls back to the cache service if it is configured.
+        
+        Args:
+            speech_file (str): Path to the audio file to transcribe.
+            
+        Returns:
+            str or None: The cached hypothesis, None if a new hypothesis must be generated.
+        """
+        # Load results from cache if possible
+        asr_hyp = self.get_hyp_from_cache(speech_file, self.version)
+
+        # Generate new hypothesis if cache is empty or None
+        if asr_hyp is None:
+            self.hyp_gen_stats.debug(speech_file, "hypothesis in cache not available")
+        elif asr_hyp == "INVALID":
+            self.hyp_gen_stats.debug(speech_file, "hypothesis in cache is invalid")
+        elif asr_hyp == "":
+            self.hyp_gen_stats.debug(speech_file, "hypothesis in cache is the empty string")
+        else:
+            self.hyp_gen_stats.debug(speech_file, "hypothesis in cache is valid: %s", asr_hyp)
+            self.hyp_gen_stats.count("hits")
+            return asr_hyp
 
-        asr_hyp = self.generate_asr_hyp(speech_file)
-        print("NEW ASR hypothesis: ", asr_hyp)
+        # Reuse the hypothesis generated on another machine if possible
+        if self.cache_service is not None and self.prefetch_from_cache_service([speech_file]) > 0:
+            asr_hyp = self.get_hyp_from_cache(speech_file, self.version)
+            self.hyp_gen_stats.debug(speech_file, "hypothesis retrieved from cache service: %s", asr_hyp)
+            self.hyp_gen_stats.count("hits")
+            return asr_hyp
+        self.hyp_gen_stats.count("misses")
+        return None
+
+    def handle_new_hyp(self, speech_file, asr_hyp):
+        """Save a newly generated hypothesis in the cache, retrying the generation once if it failed.
+        
+        Args:
+            speech_file (str): Path to the audio file.
+            asr_hyp (str or None): The generated hypothesis, None if the generation failed.
+            
+        Returns:
+            str: The transcription result, or "EMPTY"/"INVALID" for problematic cases.
+        """
+        self.hyp_gen_stats.debug(speech_file, "new hypothesis: %s", asr_hyp)
 
         # Handle newly generated hypothesis
         if asr_hyp == "":
-            print("ASR hypothesis is EMPTY AGAIN. Saving value EMPTY in cache.")
+            self.hyp_gen_stats.debug(speech_file, "hypothesis is empty, saving EMPTY in cache")
             self.update_cache(speech_file, "EMPTY")
+            self.hyp_gen_stats.count("failed")
             return "EMPTY"
         elif asr_hyp is None:
-            print("ASR hypothesis is None. Trying again.")
-            asr_hyp = self.generate_asr_hyp(speech_file)
-            print("NEW ASR hypothesis: ", asr_hyp)
+            self.hyp_gen_stats.debug(speech_file, "hypothesis is None, trying again")
+            asr_hyp = self.generate_hyp(speech_file)
+            self.hyp_gen_stats.debug(speech_file, "new hypothesis: %s", asr_hyp)
             if asr_hyp == "":
-                print("ASR hypothesis is EMPTY AGAIN. Saving value EMPTY in cache.")
+                self.hyp_gen_stats.debug(speech_file, "hypothesis is empty again, saving EMPTY in cache")
                 self.update_cache(speech_file, "EMPTY")
+                self.hyp_gen_stats.count("failed")
                 return "EMPTY"
             elif asr_hyp is None:
-                print("ASR hypothesis is None AGAIN. Saving value INVALID in cache.")
+                self.hyp_gen_stats.debug(speech_file, "hypothesis is None again, saving INVALID in cache")
                 self.update_cache(speech_file, "INVALID")
+                self.hyp_gen_stats.count("failed")
                 return "INVALID"
-        else:
-            print("Non empty hyp - saving in cache.")
-            self.update_cache(speech_file, asr_hyp)
-        
+        self.update_cache(speech_file, asr_hyp)
+        self.hyp_gen_stats.count("generated")
         return asr_hyp
         
     def get_name(self):
@@ -210,10 +551,28 @@ class BaseASRSystem:
         """
         return self.version
     
+    def get_cache_key(self, audio_path):
+        """Get the key under which hypotheses for the audio file are cached.
+        
+        Args:
+            audio_path (str): Path to the audio file.
+            
+        Returns:
+            str: Content-based key if HYP_CACHE_KEY_SCHEME is "digest" and the file exists,
+                 the audio path otherwise.
+        """
+        if self.audio_digest_index is not None:
+            digest_key = self.audio_digest_index.get_key(audio_path)
+            if digest_key is not None:
+                return digest_key
+        return audio_path
+
     def get_hyp_from_cache(self, audio_path, version):
         """Retrieve a cached hypothesis for the given audio file if available.
         
-        Attempts to find a cached hypothesis by exact audio path or by filename.
+        Attempts to find a cached hypothesis by the audio digest (if enabled), by exact
+        audio path or by filename. Hypotheses found by filename are stored in the cache
+        under the cache key of the audio file (its digest or the new audio path).
         
         Args:
             audio_path (str): Path to the audio file.
@@ -222,38 +581,40 @@ class BaseASRSystem:
         Returns:
             str or None: The cached hypothesis if found, None otherwise.
         """
+        with self.cache_lock:
+            return self._get_hyp_from_cache(audio_path, version)
+
+    def _get_hyp_from_cache(self, audio_path, version):
+        cache_key = self.get_cache_key(audio_path)
+        if cache_key != audio_path:
+            cached_entry = self.cache_store.get(cache_key)
+            if cached_entry is not None and version in cached_entry:
+                asr_hyp = cached_entry[version]['asr_hyp']
+                self.hyp_gen_stats.debug(audio_path, "read from cache based on audio digest: %s", asr_hyp)
+                return asr_hyp
+
         # check if audio sample is in cache
-        #print("Checking if audio path is in cache.")
-        if audio_path in self.cache:
+        cached_entry = self.cache_store.get(audio_path)
+        if cached_entry is not None:
             # check if version is in cache
-            if version in self.cache[audio_path]:
-                asr_hyp = self.cache[audio_path][version]['asr_hyp']
-                print("READ from cache based on audiopath.\nAudio sample: {}\nHypothesis: {} ".format(audio_path, asr_hyp))
+            if version in cached_entry:
+                asr_hyp = cached_entry[version]['asr_hyp']
+                self.hyp_gen_stats.debug(audio_path, "read from cache based on audio path: %s", asr_hyp)
+                if cache_key != audio_path:
+                    # migrate the path based entry to the digest key
+                    self.cache_store.put(cache_key, dict(cached_entry))
                 return asr_hyp
-        else:    
-            #print("Checking if audio filename is in cache.")
-            # get filename without path
+        else:
+            # the cache key contains full path, so look up the key of the same audio file by its filename
             audio_filename = os.path.basename(audio_path)
-            #print("Filename: ", audio_filename)
-            # the cache key contains full path, so we need to check if the filename is in the cache by iterating over all keys
-            for key in self.cache:
-                key_filename = os.path.basename(key)
-                #print("Key: ", key_filename)
-                if key_filename == audio_filename:
-                    # print("Filename {} found in cache".format(audio_filename))
-                    # print(self.cache[key])
-                    # print("Version input: ", version)
-                    # check if version is in cache
-                    if version in self.cache[key]:
-                        asr_hyp = self.cache[key][version]['asr_hyp']
-                        print("READ from cache based on filename.\nAudio sample: {}\nHypothesis: {} ".format(key, asr_hyp))
-                        # update cache with new key
-                        self.cache[audio_path] = asr_hyp
-                        return asr_hyp
-                    else:
-                        #print("Filename {} found in cache, but version {} not in cache".format(audio_filename, version))
-                        return None
-            #print("Audio filename {} not found in cache".format(audio_filename))
+            key = self.cache_store.find_by_filename(audio_filename)
+            cached_entry = self.cache_store.get(key) if key is not None else None
+            if cached_entry is not None and version in cached_entry:
+                asr_hyp = cached_entry[version]['asr_hyp']
+                self.hyp_gen_stats.debug(audio_path, "read from cache based on filename (cached as %s): %s", key, asr_hyp)
+                # persist the alias with the new key, so that later runs hit the cache directly
+                self.cache_store.put(cache_key, dict(cached_entry))
+                return asr_hyp
             return None
     
     def update_cache(self, audio_path, asr_hyp):
@@ -271,19 +632,110 @@ class BaseASRSystem:
             'codename': self.codename,
             'hyp_gen_date': datetime.now().strftime("%Y%m%d")
         }
-        self.cache[audio_path] = {self.version: metadata}
-        print("UPDATED cache.\nAudio sample: {}\nHypothesis: {} ".format(audio_path, asr_hyp))
-        self.save_cache()
+        with self.cache_lock:
+            cache_key = self.get_cache_key(audio_path)
+            self.cache_store.put(cache_key, {self.version: metadata})
+        self.hyp_gen_stats.debug(audio_path, "updated cache: %s", asr_hyp)
+
+        # share valid hypotheses with other machines, EMPTY/INVALID markers are kept local
+        if self.cache_service is not None and asr_hyp not in INVALID_HYP_MARKERS:
+            self.cache_service.put_many(self.codename, {cache_key: {self.version: metadata}})
+
+    def prefetch_from_cache_service(self, audio_paths):
+        """Copy valid hypotheses of the current version from the cache service to the local cache.
+        
+        Audio paths already cached locally for the current version or already requested
+        in this run are not requested.
+        
+        Args:
+            audio_paths (list): Paths to the audio files.
+            
+        Returns:
+            int: Number of hypotheses copied to the local cache.
+        """
+        if self.cache_service is None:
+            return 0
+        with self.cache_lock:
+            missing_audio_paths = [audio_path for audio_path in audio_paths
+                                   if audio_path not in self.cache_service_requested_paths
+                                   and self.version not in (self.cache_store.get(self.get_cache_key(audio_path)) or {})]
+            if not missing_audio_paths:
+                return 0
+            self.cache_service_requested_paths.update(missing_audio_paths)
+            missing_cache_keys = [self.get_cache_key(audio_path) for audio_path in missing_audio_paths]
+        nr_of_prefetched_hyps = 0
+        for cache_key, entry in self.cache_service.get_many(self.codename, missing_cache_keys).items():
+            metadata = entry.get(self.version)
+            if metadata is None or metadata.get("asr_hyp") in INVALID_HYP_MARKERS + ["", None]:
+                continue
+            with self.cache_lock:
+                local_entry = dict(self.cache_store.get(cache_key) or {})
+                local_entry[self.version] = metadata
+                self.cache_store.put(cache_key, local_entry)
+            nr_of_prefetched_hyps += 1
+        logger.info("Retrieved %d of %d missing hypotheses from cache service", nr_of_prefetched_hyps, len(missing_audio_paths))
+        return nr_of_prefetched_hyps
     
+    def flush_cache(self):
+        """Write cache updates buffered in memory (HYP_CACHE_FLUSH_EVERY > 1) and pending logits to disk."""
+        self.cache_store.flush()
+        if self.logits_cache is not None:
+            self.logits_cache.flush()
+
+    def init_logits_cache(self, vocabulary):
+        """Open the logits cache of the CTC model if CACHE_SETTINGS LOGITS_CACHE is enabled.
+        
+        Args:
+            vocabulary (dict): Tokens (list indexed by token id), blank_id, word_delimiter and skip_ids of the model.
+        """
+        cache_settings = get_cache_settings()
+        if not cache_settings["logits_cache"]:
+            return
+        # numpy is imported only by the CTC backends that cache logits
+        from .logits_cache import LogitsCache, get_logits_cache_dir
+        logits_cache_dir = get_logits_cache_dir(self.common_cache_dir, self.codename, self.version)
+        logger.info("Caching logits: %s", logits_cache_dir)
+        self.logits_cache = LogitsCache(logits_cache_dir, cache_settings["logits_cache_shard_size"])
+        self.logits_cache.set_vocabulary(vocabulary)
+
+    def store_logits(self, audio_path, logits):
+        """Store the logits of the audio file in the logits cache, if enabled.
+        
+        Args:
+            audio_path (str): Path to the audio file.
+            logits (numpy.ndarray or torch.Tensor): Logits of shape (frames, vocabulary size).
+        """
+        if self.logits_cache is None:
+            return
+        if hasattr(logits, "detach"):
+            logits = logits.detach().float().cpu().numpy()
+        with self.cache_lock:
+            cache_key = self.get_cache_key(audio_path)
+        self.logits_cache.put(cache_key, audio_path, logits)
+
     def save_cache(self):
-        """Save the current cache to disk in JSONL format."""
-        print("Saving cache")
-        with open(self.cache_file, "w") as f:
-            # save as JSONL file
-            for audio_path in self.cache:
-                # save JSONL using audio sample as key
-                json.dump({audio_path: self.cache[audio_path]}, f)
-                f.write("\n")
+        """Save a compacted snapshot of the current cache to disk."""
+        logger.info("Saving cache")
+        self.cache_store.compact()
+
+    def get_nr_of_cached_hyps(self):
+        """Get the number of cached audio samples.
+        
+        Returns:
+            int: Number of audio paths in the cache.
+        """
+        return self.cache_store.count()
+
+    def is_cached(self, audio_path):
+        """Check if the audio path is in the cache without retrieving its hypotheses.
+        
+        Args:
+            audio_path (str): Path to the audio file.
+            
+        Returns:
+            bool: True if the audio path is cached.
+        """
+        return self.cache_store.contains(self.get_cache_key(audio_path)) or self.cache_store.contains(audio_path)
 
     def get_cached_hyps(self):
         """Get all cached hypotheses.
@@ -291,13 +743,14 @@ class BaseASRSystem:
         Returns:
             dict: Dictionary of all cached hypotheses.
         """
-        return self.cache
+        return self.cache_store.as_dict()
 
     def generate_asr_hyp(self, speech_file):
         """Generate ASR hypothesis for a given audio file.
         
         This method must be implemented by all subclasses to provide
-        system-specific transcription logic.
+        system-specific transcription logic. Implementations return the hypothesis
+        without caching it, process_audio saves it with handle_new_hyp.
         
         Args:
             speech_file (str): Path to the audio file to transcribe.
@@ -308,4 +761,96 @@ class BaseASRSystem:
         Raises:
             NotImplementedError: If the subclass doesn't implement this method.
         """
-        raise NotImplementedError("Subclasses must implement generate_asr_hyp")
\ No newline at end of file
+        raise NotImplementedError("Subclasses must implement generate_asr_hyp")
+
+    def generate_asr_hyps_batch(self, speech_files):
+        """Generate ASR hypotheses for a batch of audio files.
+        
+        The default implementation calls generate_asr_hyp for each file, concurrently through
+        the request engine for cloud ASR systems. Local backends override it to run the model
+        on padded batches. Overrides return the hypotheses without caching them, process_audio_batch
+        saves them with handle_new_hyp.
+        
+        Args:
+            speech_files (list): Paths to the audio files to transcribe.
+            
+        Returns:
+            list: The transcription results in the order of speech_files (None for failed requests).
+        """
+        if self.request_engine is not None:
+            return self.request_engine.map(self.generate_asr_hyp, speech_files)
+        return [self.generate_asr_hyp(speech_file) for speech_file in speech_files]
+
+    async def agenerate_asr_hyp(self, speech_file):
+        """Generate ASR hypothesis for the given audio file without blocking the event loop.
+        
+        Cloud backends with asyncio clients override this method. The default implementation
+        runs generate_asr_hyp in a worker thread.
+        
+        Args:
+            speech_file (str): Path to the audio file to transcribe.
+            
+        Returns:
+            str: The transcription result.
+        """
+        return await asyncio.to_thread(self.generate_asr_hyp, speech_file)
+
+    async def agenerate_hyp(self, speech_file):
+        """Generate ASR hypothesis with agenerate_asr_hyp, through the request engine for cloud ASR systems.
+        
+        Args:
+            speech_file (str): Path to the audio file to transcribe.
+            
+        Returns:
+            str or None: The transcription result, None if the request failed (e.g. rate limited after all retries).
+        """
+        start_time = time.monotonic()
+        try:
+            if self.request_engine is not None:
+                return await self.request_engine.acall(self.agenerate_asr_hyp, speech_file)
+            return await self.agenerate_asr_hyp(speech_file)
+        except Exception as e:
+            logger.warning("Request for %s failed: %s", speech_file, e)
+            return None
+        finally:
+            self.hyp_gen_stats.add_generation_time(time.monotonic() - start_time)
+
+    def get_async_client(self, client_factory):
+        """Get the asyncio client of the provider SDK for the running event loop.
+        
+        Asyncio clients are bound to the event loop they were created in, and
+        process_audio_async runs a new event loop for every call.
+        
+        Args:
+            client_factory (callable): Function creating the client, e.g. speech.SpeechAsyncClient.
+            
+        Returns:
+            object: The client created by client_factory.
+        """
+        loop = asyncio.get_running_loop()
+        key = (client_factory, loop)
+        if key not in self.async_clients:
+            # drop clients of closed event loops
+            self.async_clients = {k: v for k, v in self.async_clients.items() if not k[1].is_closed()}
+            self.async_clients[key] = client_factory()
+        return self.async_clients[key]
+
+    def generate_hyp(self, speech_file):
+        """Generate ASR hypothesis, through the request engine for cloud ASR systems.
+        
+        Args:
+            speech_file (str): Path to the audio file to transcribe.
+            
+        Returns:
+            str or None: The transcription result, None if the request failed (e.g. rate limited after all retries).
+        """
+        start_time = time.monotonic()
+        try:
+            if self.request_engine is not None:
+                return self.request_engine.call(self.generate_asr_hyp, speech_file)
+            return self.generate_asr_hyp(speech_file)
+        except Exception as e:
+            logger.warning("Request for %s failed: %s", speech_file, e)
+            return None
+        finally:
+            self.hyp_gen_stats.add_generation_time(time.monotonic() - start_time)
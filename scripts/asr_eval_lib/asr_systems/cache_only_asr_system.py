@@ -0,0 +1,31 @@
+from .base_asr_system import BaseASRSystem
+
+class CacheOnlyASRSystem(BaseASRSystem):
+    """Read-only view of the cached hypotheses of an ASR system.
+
+    Built from the system, model and version alone, without loading the model or creating
+    the cloud client. Used by the flows that only read cached hypotheses (HYP_STATS, EVAL_PREP),
+    so that they start in seconds even for configs with multi-GB local models.
+    """
+
+    def __init__(self, system, model, version=None, language_code="pl-PL"):
+        """Initialize the cache reader.
+
+        Args:
+            system (str): Identifier for the ASR system type (e.g., 'google', 'azure').
+            model (str): The specific model of the ASR system.
+            version (str, optional): Version of the ASR system in YYQ format. Defaults to None (2024Q1).
+            language_code (str, optional): Language code. Defaults to "pl-PL".
+        """
+        super().__init__(system, model, language_code, version)
+
+    def generate_asr_hyp(self, speech_file):
+        """Cache-only systems can not generate hypotheses.
+
+        Args:
+            speech_file (str): Path to the audio file to transcribe.
+
+        Raises:
+            RuntimeError: Always, use initialize_asr_system to generate hypotheses.
+        """
+        raise RuntimeError("Hypothesis for {} is not cached and {} is initialized in cache-only mode".format(speech_file, self.get_name()))
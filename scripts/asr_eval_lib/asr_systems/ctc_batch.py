@@ -0,0 +1,191 @@
+"""
+Batched CTC Inference Module.
+
+This module contains helpers shared by the local CTC backends (FacebookWav2Vec, FacebookMMS)
+for transcribing several audio files in a single padded forward pass.
+
+Audio longer than the chunk length (HYP_GEN_SETTINGS CTC_CHUNK_SEC) is transcribed in chunks.
+Every chunk is extended with overlapping context (CTC_CHUNK_STRIDE_SEC) on both sides, the
+logits of the context frames are dropped and the logits of all chunks are concatenated before
+decoding, so memory is bounded by the chunk length and every part of the audio is decoded.
+"""
+
+import math
+import torch
+import logging
+
+logger = logging.getLogger(__name__)
+
+def get_ctc_chunk_settings(config_user):
+    """Get the chunking settings of long audio from the user-specific config.
+
+    Args:
+        config_user (configparser.ConfigParser): User-specific config.
+
+    Returns:
+        tuple: (chunk length in seconds, 0 - no chunking; context on each side of a chunk in seconds).
+    """
+    chunk_sec = config_user.getfloat("HYP_GEN_SETTINGS", "CTC_CHUNK_SEC", fallback=20)
+    stride_sec = config_user.getfloat("HYP_GEN_SETTINGS", "CTC_CHUNK_STRIDE_SEC", fallback=4)
+    return chunk_sec, stride_sec
+
+def get_ctc_chunks(nr_of_samples, chunk_samples, stride_samples):
+    """Split the audio into chunks of similar length with overlapping context.
+
+    Args:
+        nr_of_samples (int): Length of the audio in samples.
+        chunk_samples (int): Maximum length of a chunk in samples (without the context).
+        stride_samples (int): Length of the context on each side of a chunk in samples.
+
+    Returns:
+        list: (window_start, window_end, chunk_start, chunk_end) tuples in samples. The chunks
+              cover the audio without gaps or overlaps, the windows include the context.
+    """
+    nr_of_chunks = max(1, math.ceil(nr_of_samples / chunk_samples))
+    bounds = [nr_of_samples * i // nr_of_chunks for i in range(nr_of_chunks + 1)]
+    return [(max(0, chunk_start - stride_samples), min(nr_of_samples, chunk_end + stride_samples), chunk_start, chunk_end)
+            for chunk_start, chunk_end in zip(bounds[:-1], bounds[1:])]
+
+def get_ctc_vocabulary(tokenizer):
+    """Get the vocabulary of a Wav2Vec2CTCTokenizer, stored with cached logits for re-decoding.
+
+    Args:
+        tokenizer (Wav2Vec2CTCTokenizer): Tokenizer of the CTC model.
+
+    Returns:
+        dict: Tokens (list indexed by token id), blank_id, word_delimiter and skip_ids (special tokens).
+    """
+    return {"tokens": tokenizer.convert_ids_to_tokens(list(range(len(tokenizer)))),
+            "blank_id": tokenizer.pad_token_id,
+            "word_delimiter": tokenizer.word_delimiter_token,
+            "skip_ids": [token_id for token_id in tokenizer.all_special_ids if token_id != tokenizer.pad_token_id]}
+
+def ctc_chunked_logits(processor, model, speech_array, sampling_rate=16000, chunk_sec=20, stride_sec=4):
+    """Compute the logits of long audio with a CTC model in overlapping chunks.
+
+    Args:
+        processor: Processor of the model (feature extractor and tokenizer).
+        model (Wav2Vec2ForCTC): The CTC model.
+        speech_array (numpy.ndarray): Audio array sampled at sampling_rate.
+        sampling_rate (int, optional): Audio sampling rate. Defaults to 16000.
+        chunk_sec (float, optional): Maximum length of a chunk in seconds. Defaults to 20.
+        stride_sec (float, optional): Context on each side of a chunk in seconds. Defaults to 4.
+
+    Returns:
+        torch.Tensor: Logits of shape (frames, vocabulary size).
+    """
+    chunks = get_ctc_chunks(len(speech_array), int(chunk_sec * sampling_rate), int(stride_sec * sampling_rate))
+    logger.debug("Decoding %.1f s of audio in %d chunks", len(speech_array) / sampling_rate, len(chunks))
+    chunk_logits = []
+    for window_start, window_end, chunk_start, chunk_end in chunks:
+        inputs = processor(speech_array[window_start:window_end], sampling_rate=sampling_rate, return_tensors="pt")
+        with torch.no_grad():
+            logits = model(**inputs).logits[0]
+        # logits frames of the chunk without the context, proportionally to the samples
+        frames_per_sample = logits.shape[0] / (window_end - window_start)
+        first_frame = round((chunk_start - window_start) * frames_per_sample)
+        last_frame = round((chunk_end - window_start) * frames_per_sample)
+        chunk_logits.append(logits[first_frame:last_frame])
+    # repeated tokens and blanks at chunk boundaries are merged by CTC decoding of the concatenated logits
+    return torch.cat(chunk_logits)
+
+def ctc_decode_audio(asr_system, processor, model, speech_file, speech_array):
+    """Transcribe one audio array with a CTC model and greedy decoding, in chunks if it is long.
+
+    The logits are stored in the logits cache of the ASR system (if enabled).
+
+    Args:
+        asr_system (BaseASRSystem): The ASR system, with the chunking settings and the logits cache.
+        processor: Processor of the model (feature extractor and tokenizer).
+        model (Wav2Vec2ForCTC): The CTC model.
+        speech_file (str): Path to the audio file.
+        speech_array (numpy.ndarray): Audio array sampled at the sampling rate of the ASR system.
+
+    Returns:
+        str: The transcription result.
+    """
+    if asr_system.ctc_chunk_sec > 0 and len(speech_array) > asr_system.ctc_chunk_sec * asr_system.sampling_rate:
+        logits = ctc_chunked_logits(processor, model, speech_array, asr_system.sampling_rate,
+                                    asr_system.ctc_chunk_sec, asr_system.ctc_chunk_stride_sec)
+    else:
+        inputs = processor(speech_array, sampling_rate=asr_system.sampling_rate, return_tensors="pt")
+        with torch.no_grad():
+            logits = model(**inputs).logits[0]
+    asr_system.store_logits(speech_file, logits)
+    return processor.decode(torch.argmax(logits, dim=-1))
+
+def ctc_logits_batch(processor, model, speech_arrays, sampling_rate=16000):
+    """Compute the logits of a batch of audio arrays with a CTC model.
+
+    The arrays are padded to the longest one. The logits of each sample are cut to the
+    length of its own audio, so padding does not add tokens to the output.
+
+    Args:
+        processor: Processor of the model (feature extractor and tokenizer).
+        model (Wav2Vec2ForCTC): The CTC model.
+        speech_arrays (list): Audio arrays sampled at sampling_rate.
+        sampling_rate (int, optional): Audio sampling rate. Defaults to 16000.
+
+    Returns:
+        list: Logits of shape (frames, vocabulary size) in the order of speech_arrays.
+    """
+    inputs = processor(speech_arrays, sampling_rate=sampling_rate, return_tensors="pt", padding=True)
+    with torch.no_grad():
+        logits = model(**inputs).logits
+    output_lengths = model._get_feat_extract_output_lengths(torch.tensor([len(speech_array) for speech_array in speech_arrays]))
+    return [logits[i, :output_lengths[i]] for i in range(len(speech_arrays))]
+
+def generate_ctc_hyps_batch(asr_system, processor, model, speech_files):
+    """Generate hypotheses for a batch of audio files with a CTC backend.
+
+    Files that can not be loaded get an empty hypothesis. If the batched forward pass fails
+    (e.g. out of memory), the files are transcribed one by one with generate_asr_hyp.
+    Files longer than the chunk length of the ASR system (ctc_chunk_sec) are transcribed in chunks.
+
+    Args:
+        asr_system (BaseASRSystem): The ASR system, used for audio loading, logits caching and the single-file fallback.
+        processor: Processor of the model (feature extractor and tokenizer).
+        model (Wav2Vec2ForCTC): The CTC model.
+        speech_files (list): Paths to the audio files to transcribe.
+
+    Returns:
+        list: The transcription results in the order of speech_files.
+    """
+    hyps = [""] * len(speech_files)
+    chunk_samples = int(asr_system.ctc_chunk_sec * asr_system.sampling_rate)
+    loaded_files = []
+    speech_arrays = []
+    long_files = []
+    for i, speech_file in enumerate(speech_files):
+        try:
+            speech_array = asr_system.load_audio(speech_file)
+        except Exception as e:
+            logger.error("Error loading %s: %s", speech_file, e)
+            continue
+        if chunk_samples and len(speech_array) > chunk_samples:
+            # long audio is not padded into the batch
+            long_files.append(i)
+            continue
+        loaded_files.append(i)
+        speech_arrays.append(speech_array)
+
+    # long files are transcribed by generate_asr_hyp, which decodes them in chunks
+    for i in long_files:
+        hyps[i] = asr_system.generate_asr_hyp(speech_files[i])
+    if not speech_arrays:
+        return hyps
+
+    try:
+        batch_logits = ctc_logits_batch(processor, model, speech_arrays, asr_system.sampling_rate)
+    except Exception as e:
+        logger.warning("Error generating batch outputs: %s. Generating hypotheses one by one.", e)
+        for i in loaded_files:
+            hyps[i] = asr_system.generate_asr_hyp(speech_files[i])
+        return hyps
+
+    for i, logits in zip(loaded_files, batch_logits):
+        asr_system.store_logits(speech_files[i], logits)
+        hyp = processor.decode(torch.argmax(logits, dim=-1))
+        asr_system.hyp_gen_stats.debug(speech_files[i], "hypothesis: %s", hyp)
+        hyps[i] = hyp
+    return hyps
@@ -0,0 +1,219 @@
+"""
+ONNX Runtime CTC Inference Module.
+
+Optional inference engine for the local CTC backends (FacebookWav2Vec, FacebookMMS).
+The Wav2Vec2ForCTC model is exported to ONNX once, with dynamic batch and sequence
+length, and run in an onnxruntime session with configurable intra-/inter-op threads.
+Models with the "-int8" suffix are quantized with the dynamic int8 quantization of
+onnxruntime after the export.
+
+Exported graphs are cached on disk (<BIGOS_EVAL_DATA_REPO_PATH>/onnx_models/<codename>),
+together with the model config used to compute the output lengths of padded batches.
+
+The engine is selected in the runtime config, for the whole run or inside a system entry, e.g.:
+    "inference_engine": {"engine": "onnxruntime", "intra_op_threads": 8, "inter_op_threads": 1}
+Systems without the setting are run with PyTorch.
+"""
+
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+PYTORCH_ENGINE = "pytorch"
+ONNX_ENGINE = "onnxruntime"
+INFERENCE_ENGINES = [PYTORCH_ENGINE, ONNX_ENGINE]
+# systems supporting the onnxruntime engine
+ONNX_ASR_SYSTEMS = ["wav2vec2", "mms"]
+
+def get_inference_engine_settings(config_runtime, system):
+    """Get the inference engine settings of the ASR system from the runtime config.
+
+    Args:
+        config_runtime (dict): Runtime configuration.
+        system (str): Identifier for the ASR system type (e.g., 'mms', 'wav2vec2').
+
+    Returns:
+        dict or None: Settings of the onnxruntime engine, None if the system is run with PyTorch.
+
+    Raises:
+        ValueError: If an unknown inference engine is configured.
+    """
+    settings = dict(config_runtime.get("inference_engine", {}))
+    # per-system settings override the settings of the run
+    settings.update(config_runtime["systems"][system].get("inference_engine", {}))
+    engine = settings.get("engine", PYTORCH_ENGINE)
+    if engine not in INFERENCE_ENGINES:
+        raise ValueError(f"Unknown inference engine: {engine}. Supported engines: {INFERENCE_ENGINES}")
+    if engine == PYTORCH_ENGINE:
+        return None
+    if system not in ONNX_ASR_SYSTEMS:
+        logger.warning("The %s engine is supported only for %s. Running %s with PyTorch.", engine, ONNX_ASR_SYSTEMS, system)
+        return None
+    return settings
+
+def get_onnx_model_dir(bigos_eval_data_dir, codename):
+    """Get the directory of the exported ONNX model.
+
+    Args:
+        bigos_eval_data_dir (str): Directory path for storing evaluation data.
+        codename (str): Codename of the ASR system and model.
+
+    Returns:
+        str: Directory with the ONNX graph, its external weights and the model config.
+    """
+    return os.path.join(bigos_eval_data_dir, "onnx_models", codename)
+
+def export_ctc_model_to_onnx(model, onnx_file, opset_version=17):
+    """Export the CTC model to ONNX with dynamic batch size and sequence length.
+
+    Args:
+        model (Wav2Vec2ForCTC): The fp32 CTC model.
+        onnx_file (str): Path to the ONNX graph. Weights of large models are stored next to it.
+        opset_version (int, optional): ONNX opset version. Defaults to 17.
+    """
+    # torch is imported on use, so that the flows can read the engine settings without loading it
+    import torch
+
+    class CTCExportWrapper(torch.nn.Module):
+        """Wav2Vec2ForCTC returning only the logits, with a mandatory attention mask input."""
+
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_values, attention_mask):
+            return self.model(input_values, attention_mask=attention_mask).logits
+
+    model.eval()
+    dummy_input_values = torch.zeros(1, 16000, dtype=torch.float32)
+    dummy_attention_mask = torch.ones(1, 16000, dtype=torch.int64)
+    with torch.no_grad():
+        torch.onnx.export(CTCExportWrapper(model), (dummy_input_values, dummy_attention_mask), onnx_file,
+                          input_names=["input_values", "attention_mask"], output_names=["logits"],
+                          dynamic_axes={"input_values": {0: "batch", 1: "sequence"},
+                                        "attention_mask": {0: "batch", 1: "sequence"},
+                                        "logits": {0: "batch", 1: "frames"}},
+                          opset_version=opset_version, do_constant_folding=True)
+
+class OnnxCTCOutput:
+    """Output of OnnxCTCModel, with the logits attribute of the transformers model outputs."""
+
+    def __init__(self, logits):
+        self.logits = logits
+
+class OnnxCTCModel:
+    """onnxruntime session with the call interface of Wav2Vec2ForCTC used by the CTC backends.
+
+    Attributes:
+        session (onnxruntime.InferenceSession): Session running the exported graph.
+        config (Wav2Vec2Config): Config of the exported model.
+        inference_sec (float): Total time spent in the session.
+        audio_sec (float): Total seconds of audio (without padding) passed to the session.
+    """
+
+    def __init__(self, onnx_file, config, settings):
+        """Create the onnxruntime session.
+
+        Args:
+            onnx_file (str): Path to the ONNX graph.
+            config (Wav2Vec2Config): Config of the exported model.
+            settings (dict): Engine settings: intra_op_threads and inter_op_threads (optional,
+                default 0 - chosen by onnxruntime), providers (optional, default ["CPUExecutionProvider"]).
+        """
+        import onnxruntime
+        session_options = onnxruntime.SessionOptions()
+        session_options.intra_op_num_threads = settings.get("intra_op_threads", 0)
+        session_options.inter_op_num_threads = settings.get("inter_op_threads", 0)
+        session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        providers = settings.get("providers", ["CPUExecutionProvider"])
+        self.session = onnxruntime.InferenceSession(onnx_file, session_options, providers=providers)
+        self.config = config
+        self.inference_sec = 0.0
+        self.audio_sec = 0.0
+        logger.info("ONNX Runtime session: %s (intra-op threads: %d, inter-op threads: %d, providers: %s)",
+                    onnx_file, session_options.intra_op_num_threads, session_options.inter_op_num_threads, providers)
+
+    def __call__(self, input_values, attention_mask=None, **kwargs):
+        """Run the exported graph.
+
+        Args:
+            input_values (torch.Tensor): Padded audio of shape (batch, sequence).
+            attention_mask (torch.Tensor, optional): Mask of the audio without padding. Defaults to None (no padding).
+
+        Returns:
+            OnnxCTCOutput: Output with the logits as a torch tensor.
+        """
+        import torch
+        if attention_mask is None:
+            attention_mask = torch.ones(input_values.shape, dtype=torch.int64)
+        start_time = time.monotonic()
+        logits = self.session.run(["logits"], {"input_values": input_values.numpy().astype("float32"),
+                                               "attention_mask": attention_mask.numpy().astype("int64")})[0]
+        self.inference_sec += time.monotonic() - start_time
+        self.audio_sec += float(attention_mask.sum()) / 16000
+        return OnnxCTCOutput(torch.from_numpy(logits))
+
+    def _get_feat_extract_output_lengths(self, input_lengths):
+        """Compute the number of logits frames of audio inputs (same as Wav2Vec2ForCTC)."""
+        import torch
+        for kernel_size, stride in zip(self.config.conv_kernel, self.config.conv_stride):
+            input_lengths = torch.div(input_lengths - kernel_size, stride, rounding_mode="floor") + 1
+        return input_lengths
+
+    def get_latency_per_audio_sec(self):
+        """Get the inference time per second of audio.
+
+        Returns:
+            float: Seconds of inference per second of audio, 0.0 if no audio was processed.
+        """
+        return self.inference_sec / self.audio_sec if self.audio_sec else 0.0
+
+    def close(self):
+        """Log the latency per second of audio and release the session."""
+        logger.info("ONNX Runtime inference: %.1f s for %.1f s of audio (%.3f s per second of audio)",
+                    self.inference_sec, self.audio_sec, self.get_latency_per_audio_sec())
+        self.session = None
+
+def load_onnx_ctc_model(asr_system, load_fp32_model_fn, settings, quantize=False):
+    """Load the CTC model in an onnxruntime session, exporting it to ONNX on first use.
+
+    Args:
+        asr_system (BaseASRSystem): The ASR system, used for the codename and the data directory.
+        load_fp32_model_fn (callable): Function loading the fp32 PyTorch model (with adapters, if any).
+        settings (dict): Settings of the onnxruntime engine.
+        quantize (bool, optional): If True, quantize the exported graph to int8. Defaults to False.
+
+    Returns:
+        OnnxCTCModel: The model running in onnxruntime.
+
+    Raises:
+        ImportError: If onnxruntime is not installed.
+    """
+    try:
+        import onnxruntime
+    except ImportError as e:
+        raise ImportError("The onnxruntime inference engine requires the onnx and onnxruntime packages") from e
+    from transformers import Wav2Vec2Config
+
+    model_dir = get_onnx_model_dir(asr_system.bigos_eval_data_dir, asr_system.codename)
+    onnx_file = os.path.join(model_dir, "model.onnx")
+    config_file = os.path.join(model_dir, "config.json")
+    if not (os.path.exists(onnx_file) and os.path.exists(config_file)):
+        logger.info("Exporting %s to ONNX: %s", asr_system.codename, model_dir)
+        os.makedirs(model_dir, exist_ok=True)
+        model = load_fp32_model_fn()
+        config = model.config
+        if quantize:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+            fp32_onnx_file = os.path.join(model_dir, "model.fp32.onnx")
+            export_ctc_model_to_onnx(model, fp32_onnx_file)
+            del model
+            quantize_dynamic(fp32_onnx_file, onnx_file, weight_type=QuantType.QInt8, use_external_data_format=True)
+        else:
+            export_ctc_model_to_onnx(model, onnx_file)
+            del model
+        # the config is written last and marks a complete export
+        config.to_json_file(config_file)
+    return OnnxCTCModel(onnx_file, Wav2Vec2Config.from_json_file(config_file), settings)
@@ -0,0 +1,77 @@
+"""
+Quantized CTC Inference Module.
+
+Opt-in int8 CPU inference for the local CTC backends (FacebookWav2Vec, FacebookMMS).
+The linear layers of the model are converted with torch dynamic int8 quantization
+(weights stored as int8, activations quantized on the fly), which speeds up CPU
+inference of the 1B-parameter Wav2Vec2ForCTC models.
+
+The quantized variant is selected with the "-int8" suffix of the model name in the
+runtime config (e.g. "xls-r-1b-polish-int8"), so it has its own system codename and its
+hypotheses, cache and WER are tracked separately from the fp32 model.
+
+The converted model is cached on disk (<BIGOS_EVAL_DATA_REPO_PATH>/quantized_models),
+so the conversion runs only once per model and torch version.
+"""
+
+import os
+import logging
+import torch
+
+logger = logging.getLogger(__name__)
+
+INT8_MODEL_SUFFIX = "-int8"
+
+def split_quantized_model_name(model):
+    """Split the model name from the runtime config into the base model name and the quantization flag.
+
+    Args:
+        model (str): Model name, e.g. "xls-r-1b-polish" or "xls-r-1b-polish-int8".
+
+    Returns:
+        tuple: (base model name, True if the int8 quantized variant is requested).
+    """
+    if model.endswith(INT8_MODEL_SUFFIX):
+        return model[:-len(INT8_MODEL_SUFFIX)], True
+    return model, False
+
+def get_quantized_model_file(bigos_eval_data_dir, codename):
+    """Get the path to the cached quantized model.
+
+    Args:
+        bigos_eval_data_dir (str): Directory path for storing evaluation data.
+        codename (str): Codename of the ASR system and model.
+
+    Returns:
+        str: Path to the pickled quantized model, specific to the installed torch version.
+    """
+    return os.path.join(bigos_eval_data_dir, "quantized_models", "{}.torch-{}.pt".format(codename, torch.__version__))
+
+def load_int8_ctc_model(asr_system, load_fp32_model_fn):
+    """Load the int8 quantized CTC model from the disk cache or convert the fp32 model.
+
+    Args:
+        asr_system (BaseASRSystem): The ASR system, used for the codename and the data directory.
+        load_fp32_model_fn (callable): Function loading the fp32 model (with adapters, if any).
+
+    Returns:
+        Wav2Vec2ForCTC: The model with int8 quantized linear layers, in eval mode.
+    """
+    model_file = get_quantized_model_file(asr_system.bigos_eval_data_dir, asr_system.codename)
+    if os.path.exists(model_file):
+        logger.info("Loading int8 quantized model: %s", model_file)
+        # the file contains the pickled model written below, not only tensors
+        return torch.load(model_file, weights_only=False)
+
+    logger.info("Quantizing the linear layers of %s to int8", asr_system.codename)
+    model = load_fp32_model_fn()
+    model.eval()
+    quantized_model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    del model
+
+    os.makedirs(os.path.dirname(model_file), exist_ok=True)
+    tmp_file = model_file + ".tmp"
+    torch.save(quantized_model, tmp_file)
+    os.replace(tmp_file, model_file)
+    logger.info("Saved int8 quantized model: %s", model_file)
+    return quantized_model
@@ -0,0 +1,87 @@
+"""
+Duration-Bucketed Batching Module.
+
+Batches of audio samples in dataset order mix 0.5 s single words with 30 s spontaneous speech,
+so most of the compute of a padded batch is spent on padding. This module sorts the samples
+by duration and forms batches capped by the padded audio seconds (number of samples times
+the longest sample in the batch) instead of the number of samples.
+
+Durations are taken from the dataset metadata, so the audio is not decoded to plan the batches.
+"""
+
+# dataset columns with the duration of the audio samples, in order of preference
+DURATION_SEC_COLUMNS = ["audio_duration_seconds", "duration"]
+DURATION_SAMPLES_COLUMN = "audio_duration_samples"
+SAMPLING_RATE_COLUMNS = ["sampling_rate", "samplingrate_orig"]
+
+def get_audio_durations(hf_dataset):
+    """Get the durations of the audio samples from the dataset metadata.
+
+    Args:
+        hf_dataset (Dataset): Hugging Face dataset split in the BIGOS format.
+
+    Returns:
+        list or None: Durations in seconds in the order of the dataset, None if the dataset has no duration metadata.
+    """
+    column_names = hf_dataset.column_names
+    for column in DURATION_SEC_COLUMNS:
+        if column in column_names:
+            return [float(duration) for duration in hf_dataset[column]]
+    if DURATION_SAMPLES_COLUMN in column_names:
+        for sampling_rate_column in SAMPLING_RATE_COLUMNS:
+            if sampling_rate_column in column_names:
+                return [float(nr_of_samples) / float(sampling_rate) for nr_of_samples, sampling_rate
+                        in zip(hf_dataset[DURATION_SAMPLES_COLUMN], hf_dataset[sampling_rate_column])]
+    return None
+
+def make_duration_batches(durations, max_batch_sec, max_batch_size=None):
+    """Group samples with similar durations into batches capped by the padded audio seconds.
+
+    Samples are sorted by duration, so every batch contains samples of similar length.
+    A sample longer than max_batch_sec forms a batch of its own.
+
+    Args:
+        durations (list): Durations of the samples in seconds (None for unknown durations).
+        max_batch_sec (float): Maximum padded audio seconds of a batch
+            (number of samples times the longest sample).
+        max_batch_size (int, optional): Maximum number of samples in a batch. Defaults to None (no limit).
+
+    Returns:
+        list: Batches as lists of sample indexes. Every index is present in exactly one batch.
+    """
+    # samples of unknown duration are put at the end, one per batch
+    known = sorted((i for i, duration in enumerate(durations) if duration is not None), key=lambda i: durations[i])
+    unknown = [i for i, duration in enumerate(durations) if duration is None]
+
+    batches = []
+    batch = []
+    for i in known:
+        # sorted order, so the new sample is the longest one in the batch
+        padded_sec = (len(batch) + 1) * durations[i]
+        if batch and (padded_sec > max_batch_sec or (max_batch_size and len(batch) >= max_batch_size)):
+            batches.append(batch)
+            batch = []
+        batch.append(i)
+    if batch:
+        batches.append(batch)
+    batches.extend([i] for i in unknown)
+    return batches
+
+def get_padding_ratio(durations, batches):
+    """Get the fraction of the padded audio seconds spent on padding.
+
+    Args:
+        durations (list): Durations of the samples in seconds.
+        batches (list): Batches as lists of sample indexes.
+
+    Returns:
+        float: Padding seconds divided by padded seconds, 0.0 for empty input.
+    """
+    padded_sec = 0.0
+    audio_sec = 0.0
+    for batch in batches:
+        batch_durations = [durations[i] for i in batch if durations[i] is not None]
+        if batch_durations:
+            padded_sec += len(batch_durations) * max(batch_durations)
+            audio_sec += sum(batch_durations)
+    return (padded_sec - audio_sec) / padded_sec if padded_sec else 0.0
@@ -1,7 +1,13 @@
-from .base_asr_system import BaseASRSystem
+from .base_asr_system import BaseASRSystem, get_config_user
+from .ctc_batch import generate_ctc_hyps_batch, get_ctc_chunk_settings, get_ctc_vocabulary, ctc_decode_audio
+from .ctc_quantization import split_quantized_model_name, load_int8_ctc_model
+from .ctc_onnx import load_onnx_ctc_model
 from transformers import Wav2Vec2ForCTC, AutoProcessor
-import librosa
+import math
 import torch    
+import logging
+
+logger = logging.getLogger(__name__)
 
 #https://huggingface.co/docs/transformers/v4.36.1/model_doc/mms
 
@@ -16,30 +22,62 @@ class FacebookMMS(BaseASRSystem):
     
     Attributes:
         mms_lang (str): ISO-639-3 language code for MMS model.
-        mms_model (Wav2Vec2ForCTC): The loaded MMS model.
+        mms_model (Wav2Vec2ForCTC or OnnxCTCModel): The loaded MMS model (int8 quantized for "-int8" model names).
         processor (AutoProcessor): Processor for the MMS model.
         sampling_rate (int): Audio sampling rate.
+        ctc_chunk_sec (float): Audio longer than this is decoded in chunks (0 - no chunking).
+        ctc_chunk_stride_sec (float): Context on each side of a chunk in seconds.
+        quantized (bool): True if the linear layers of the model are int8 quantized.
     """
+
+    MODEL_ATTRIBUTES = ("mms_model", "processor")
     
-    def __init__(self, system, model, language_code="pl-PL", sampling_rate=16000):
+    def __init__(self, system, model, language_code="pl-PL", sampling_rate=16000, inference_engine=None):
         """Initialize the Facebook MMS ASR system.
         
         Args:
             system (str): Identifier for the ASR system type ('mms').
-            model (str): The specific MMS model to use.
+            model (str): The specific MMS model to use. The "-int8" suffix selects
+                the int8 quantized CPU variant of the model.
             language_code (str, optional): Language code. Defaults to "pl-PL".
             sampling_rate (int, optional): Audio sampling rate. Defaults to 16000.
+            inference_engine (dict, optional): Settings of the onnxruntime engine. Defaults to None (PyTorch).
         """
         super().__init__(system, model, language_code)
         # convert ISO-639-1 to ISO-639-3
         self.model = model
         self.mms_lang = lang_code_693_3[language_code]
-        self.mms_model = Wav2Vec2ForCTC.from_pretrained("facebook/mms-" + model)
-        self.mms_model.load_adapter(self.mms_lang)
+        base_model, self.quantized = split_quantized_model_name(model)
+        if inference_engine is not None:
+            # the language adapter is loaded before the export and exported with the model
+            self.mms_model = load_onnx_ctc_model(self, lambda: self.load_mms_model(base_model), inference_engine, self.quantized)
+        elif self.quantized:
+            # the language adapter is loaded before quantization and cached with the model
+            self.mms_model = load_int8_ctc_model(self, lambda: self.load_mms_model(base_model))
+        else:
+            self.mms_model = self.load_mms_model(base_model)
 
-        self.processor = AutoProcessor.from_pretrained("facebook/mms-" + model)
+        self.processor = AutoProcessor.from_pretrained("facebook/mms-" + base_model)
         self.processor.tokenizer.set_target_lang(self.mms_lang)
+        self.init_logits_cache(get_ctc_vocabulary(self.processor.tokenizer))
         self.sampling_rate = sampling_rate
+        # long audio is decoded in chunks, with memory bounded by the chunk length
+        self.ctc_chunk_sec, self.ctc_chunk_stride_sec = get_ctc_chunk_settings(get_config_user())
+        if self.ctc_chunk_sec > 0:
+            self.max_audio_length_to_process_sec = math.inf
+
+    def load_mms_model(self, base_model):
+        """Load the fp32 MMS model with the adapter of the language.
+        
+        Args:
+            base_model (str): The MMS model name without the quantization suffix.
+            
+        Returns:
+            Wav2Vec2ForCTC: The loaded MMS model.
+        """
+        mms_model = Wav2Vec2ForCTC.from_pretrained("facebook/mms-" + base_model)
+        mms_model.load_adapter(self.mms_lang)
+        return mms_model
 
     def generate_asr_hyp(self, speech_file):
         """Generate transcription for an audio file using Facebook MMS.
@@ -52,23 +90,26 @@ class FacebookMMS(BaseASRSystem):
         """
         #TODO add conversion to wav2vec supported input format
         try:
-            speech_array, sampling_rate = librosa.load(speech_file, sr=self.sampling_rate)
+            speech_array = self.load_audio(speech_file)
 
-            inputs = self.processor(speech_array, sampling_rate=16_000, return_tensors="pt")
-            
-            with torch.no_grad():
-                outputs = self.mms_model(**inputs).logits
-            
-            ids = torch.argmax(outputs, dim=-1)[0]
-            hyp = self.processor.decode(ids)
+            # long audio is decoded in chunks, logits are stored in the logits cache (if enabled)
+            hyp = ctc_decode_audio(self, self.processor, self.mms_model, speech_file, speech_array)
 
-            print(f"Hyp:   {hyp}")
+            self.hyp_gen_stats.debug(speech_file, "hypothesis: %s", hyp)
 
         except Exception as e:
-            print(f"Other error: {e}")
+            logger.error("Other error: %s", e)
             hyp=""
         
-        if hyp != "":
-            self.update_cache(speech_file, hyp)
+        return hyp
+
+    def generate_asr_hyps_batch(self, speech_files):
+        """Generate transcriptions for a batch of audio files in a single padded forward pass.
         
-        return hyp
\ No newline at end of file
+        Args:
+            speech_files (list): Paths to the audio files to transcribe.
+            
+        Returns:
+            list: The transcription results in the order of speech_files.
+        """
+        return generate_ctc_hyps_batch(self, self.processor, self.mms_model, speech_files)
@@ -1,7 +1,13 @@
-from .base_asr_system import BaseASRSystem
+from .base_asr_system import BaseASRSystem, get_config_user
+from .ctc_batch import generate_ctc_hyps_batch, get_ctc_chunk_settings, get_ctc_vocabulary, ctc_decode_audio
+from .ctc_quantization import split_quantized_model_name, load_int8_ctc_model
+from .ctc_onnx import load_onnx_ctc_model
 from transformers import Wav2Vec2Processor, Wav2Vec2ForCTC
+import math
 import torch
-import librosa
+import logging
+
+logger = logging.getLogger(__name__)
 
 class FacebookWav2Vec(BaseASRSystem):
     """Facebook Wav2Vec2 ASR system implementation for the BIGOS framework.
@@ -10,18 +16,25 @@ class FacebookWav2Vec(BaseASRSystem):
     
     Attributes:
         w2v_processor (Wav2Vec2Processor): Processor for the Wav2Vec2 model.
-        w2v_model (Wav2Vec2ForCTC): The loaded Wav2Vec2 model.
+        w2v_model (Wav2Vec2ForCTC or OnnxCTCModel): The loaded Wav2Vec2 model (int8 quantized for "-int8" model names).
+        quantized (bool): True if the linear layers of the model are int8 quantized.
         sampling_rate (int): Audio sampling rate.
+        ctc_chunk_sec (float): Audio longer than this is decoded in chunks (0 - no chunking).
+        ctc_chunk_stride_sec (float): Context on each side of a chunk in seconds.
     """
+
+    MODEL_ATTRIBUTES = ("w2v_model", "w2v_processor")
     
-    def __init__(self, system, model, language_code="pl-PL", sampling_rate=16000):
+    def __init__(self, system, model, language_code="pl-PL", sampling_rate=16000, inference_engine=None):
         """Initialize the Facebook Wav2Vec2 ASR system.
         
         Args:
             system (str): Identifier for the ASR system type ('wav2vec2').
-            model (str): The specific Wav2Vec2 model to use.
+            model (str): The specific Wav2Vec2 model to use. The "-int8" suffix selects
+                the int8 quantized CPU variant of the model.
             language_code (str, optional): Language code. Defaults to "pl-PL".
             sampling_rate (int, optional): Audio sampling rate. Defaults to 16000.
+            inference_engine (dict, optional): Settings of the onnxruntime engine. Defaults to None (PyTorch).
             
         Raises:
             ValueError: If an unsupported model is specified.
@@ -29,18 +42,29 @@ class FacebookWav2Vec(BaseASRSystem):
         super().__init__(system, model, language_code)
         # convert ISO-639-1 to ISO-639-3
         self.model = model
-        # TODO - move max audio length to process param to user-specific asr-system related config. Default value = 30
-        self.max_audio_length_to_process_sec = 25
+        # long audio is decoded in chunks, with memory bounded by the chunk length
+        self.ctc_chunk_sec, self.ctc_chunk_stride_sec = get_ctc_chunk_settings(get_config_user())
+        if self.ctc_chunk_sec > 0:
+            self.max_audio_length_to_process_sec = math.inf
+        else:
+            self.max_audio_length_to_process_sec = 25
+        base_model, self.quantized = split_quantized_model_name(model)
         #TODO - make customizable with system and model parameters
-        if (model == "xls-r-1b-polish"):
-            self.w2v_processor = Wav2Vec2Processor.from_pretrained("jonatasgrosman/wav2vec2-" + model)
-            self.w2v_model = Wav2Vec2ForCTC.from_pretrained("jonatasgrosman/wav2vec2-" + model)
-        elif (model == "large-xlsr-53-polish"):
-            self.w2v_processor = Wav2Vec2Processor.from_pretrained("facebook/wav2vec2-" + model)
-            self.w2v_model = Wav2Vec2ForCTC.from_pretrained("facebook/wav2vec2-" + model)
+        if (base_model == "xls-r-1b-polish"):
+            model_id = "jonatasgrosman/wav2vec2-" + base_model
+        elif (base_model == "large-xlsr-53-polish"):
+            model_id = "facebook/wav2vec2-" + base_model
         else:
             raise ValueError(f"Model {model} is not supported")
+        self.w2v_processor = Wav2Vec2Processor.from_pretrained(model_id)
+        if inference_engine is not None:
+            self.w2v_model = load_onnx_ctc_model(self, lambda: Wav2Vec2ForCTC.from_pretrained(model_id), inference_engine, self.quantized)
+        elif self.quantized:
+            self.w2v_model = load_int8_ctc_model(self, lambda: Wav2Vec2ForCTC.from_pretrained(model_id))
+        else:
+            self.w2v_model = Wav2Vec2ForCTC.from_pretrained(model_id)
         self.sampling_rate = sampling_rate
+        self.init_logits_cache(get_ctc_vocabulary(self.w2v_processor.tokenizer))
 
     def generate_asr_hyp(self, speech_file):
         """Generate transcription for an audio file using Facebook Wav2Vec2.
@@ -52,31 +76,29 @@ class FacebookWav2Vec(BaseASRSystem):
             str: The transcription result.
         """
         try:
-            speech_array, sampling_rate = librosa.load(speech_file, sr=self.sampling_rate)
+            speech_array = self.load_audio(speech_file)
             #print("Speech array length: ", len(speech_array))
-            inputs = self.w2v_processor(speech_array, sampling_rate=16_000, return_tensors="pt")
-            #print("Input read")
-            #print("Input type: ", type(inputs))
-            #outputs = self.w2v_model(inputs).logits
+            # long audio is decoded in chunks, logits are stored in the logits cache (if enabled)
             try:
-                outputs = self.w2v_model(**inputs).logits
+                hyp = ctc_decode_audio(self, self.w2v_processor, self.w2v_model, speech_file, speech_array)
             except Exception as e:
-                print(f"Error generating outputs: {e}. Skipping generation and returing empty hypothesis.")
+                logger.error("Error generating outputs: %s. Skipping generation and returing empty hypothesis.", e)
                 return ""
-            #print("Outputs generated")
-            ids = torch.argmax(outputs, dim=-1)[0]
-            #print("IDS generated")
-
-            # add error handling for decoding
-            hyp = self.w2v_processor.decode(ids)
-            print(f"Hyp:   {hyp}")
+            self.hyp_gen_stats.debug(speech_file, "hypothesis: %s", hyp)
         
         except Exception as e:
-            print(f"Other error: {e}")
+            logger.error("Other error: %s", e)
             hyp=""
 
-        #if hypothesis is not empty, update cache
-        if hyp != "":
-            self.update_cache(speech_file, hyp)
-                
-        return hyp
\ No newline at end of file
+        return hyp
+
+    def generate_asr_hyps_batch(self, speech_files):
+        """Generate transcriptions for a batch of audio files in a single padded forward pass.
+        
+        Args:
+            speech_files (list): Paths to the audio files to transcribe.
+            
+        Returns:
+            list: The transcription results in the order of speech_files.
+        """
+        return generate_ctc_hyps_batch(self, self.w2v_processor, self.w2v_model, speech_files)
@@ -58,25 +58,58 @@ class GoogleCloudASR(BaseASRSystem):
         Returns:
             str: The transcription result, or None if no results were returned.
         """
-        # if not available in cache, process audio
-        with open(speech_file, "rb") as audio_file:
-            audio_content = audio_file.read()
-        
-        # Create an audio object
-        audio = speech.RecognitionAudio(content=audio_content)
+        audio = self.get_recognition_audio(speech_file)
 
         # Call the Google Cloud Speech API
         response = self.client.recognize(config=self.config, audio=audio)
 
+        return self.get_hyp_from_response(speech_file, response)
+
+    async def agenerate_asr_hyp(self, speech_file:str) -> str:
+        """Generate transcription for an audio file using the asyncio client of Google Cloud Speech-to-Text.
+        
+        Args:
+            speech_file (str): Path to the audio file to transcribe.
+            
+        Returns:
+            str: The transcription result, or None if no results were returned.
+        """
+        audio = self.get_recognition_audio(speech_file)
+
+        # Call the Google Cloud Speech API
+        response = await self.get_async_client(speech.SpeechAsyncClient).recognize(config=self.config, audio=audio)
+        return self.get_hyp_from_response(speech_file, response)
+
+    def get_recognition_audio(self, speech_file):
+        """Read the audio file into the recognition audio object.
+        
+        Args:
+            speech_file (str): Path to the audio file to transcribe.
+            
+        Returns:
+            speech.RecognitionAudio: The audio for the Google Cloud Speech API.
+        """
+        with open(speech_file, "rb") as audio_file:
+            audio_content = audio_file.read()
+        
+        return speech.RecognitionAudio(content=audio_content)
+
+    def get_hyp_from_response(self, speech_file, response):
+        """Extract the hypothesis from the recognition response and save it in the cache.
+        
+        Args:
+            speech_file (str): Path to the transcribed audio file.
+            response (RecognizeResponse): Response of the Google Cloud Speech API.
+            
+        Returns:
+            str: The transcription result, or None if no results were returned.
+        """
         # Process and return the recognition result
         # For simplicity, we're returning the transcript of the first result.
         # In a real application, you might want to handle multiple segments.
         for result in response.results:
-            print("ASR hypothesis generated from audio sample")
             hyp=result.alternatives[0].transcript
-            print("Transcript: {}".format(hyp))
-            print("Confidence: {}".format(round(result.alternatives[0].confidence),-2))
-            self.update_cache(speech_file, hyp)
+            self.hyp_gen_stats.debug(speech_file, "transcript: %s, confidence: %.2f", hyp, result.alternatives[0].confidence)
             return hyp
 
         """
@@ -1,6 +1,6 @@
 import os
 from .base_asr_system import BaseASRSystem
-from google.cloud.speech_v2 import SpeechClient
+from google.cloud.speech_v2 import SpeechClient, SpeechAsyncClient
 from google.cloud.speech_v2.types import cloud_speech
 
 class GoogleCloudASRV2(BaseASRSystem):
@@ -56,29 +56,62 @@ class GoogleCloudASRV2(BaseASRSystem):
         Returns:
             str: The transcription result, or None if no results were returned.
         """
-        project_id = self.project_id
-        # if not available in cache, process audio
+        request = self.get_recognize_request(speech_file)
+
+        # Call the Google Cloud Speech API
+        response = self.client.recognize(request=request)
+
+        return self.get_hyp_from_response(speech_file, response)
+
+    async def agenerate_asr_hyp(self, speech_file:str) -> str:
+        """Generate transcription for an audio file using the asyncio client of Google Cloud Speech-to-Text V2.
+        
+        Args:
+            speech_file (str): Path to the audio file to transcribe.
+            
+        Returns:
+            str: The transcription result, or None if no results were returned.
+        """
+        request = self.get_recognize_request(speech_file)
+
+        # Call the Google Cloud Speech API
+        response = await self.get_async_client(SpeechAsyncClient).recognize(request=request)
+        return self.get_hyp_from_response(speech_file, response)
+
+    def get_recognize_request(self, speech_file):
+        """Build the recognition request with the audio file content.
+        
+        Args:
+            speech_file (str): Path to the audio file to transcribe.
+            
+        Returns:
+            cloud_speech.RecognizeRequest: The request for the Google Cloud Speech API.
+        """
         with open(speech_file, "rb") as audio_file:
             audio_content = audio_file.read()
         
-        request = cloud_speech.RecognizeRequest(
-            recognizer=f"projects/{project_id}/locations/global/recognizers/_",
+        return cloud_speech.RecognizeRequest(
+            recognizer=f"projects/{self.project_id}/locations/global/recognizers/_",
             config=self.config,
             content=audio_content,
         )
 
-        # Call the Google Cloud Speech API
-        response = self.client.recognize(request=request)
-
+    def get_hyp_from_response(self, speech_file, response):
+        """Extract the hypothesis from the recognition response and save it in the cache.
+        
+        Args:
+            speech_file (str): Path to the transcribed audio file.
+            response (RecognizeResponse): Response of the Google Cloud Speech API.
+            
+        Returns:
+            str: The transcription result, or None if no results were returned.
+        """
         # Process and return the recognition result
         # For simplicity, we're returning the transcript of the first result.
         # In a real application, you might want to handle multiple segments.
         for result in response.results:
-            print("ASR hypothesis generated from audio sample")
             hyp=result.alternatives[0].transcript
-            print("Transcript: {}".format(hyp))
-            print("Confidence: {}".format(round(result.alternatives[0].confidence),-2))
-            self.update_cache(speech_file, hyp)
+            self.hyp_gen_stats.debug(speech_file, "transcript: %s, confidence: %.2f", hyp, result.alternatives[0].confidence)
             return hyp
 
         """
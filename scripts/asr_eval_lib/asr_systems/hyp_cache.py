@@ -0,0 +1,1109 @@
+"""
+ASR Hypothesis Cache Storage Module.
+
+This module contains the storage layer for the per-system hypothesis cache
+(<BIGOS_EVAL_DATA_REPO_PATH>/asr_hyps_cache/<codename>.asr_cache.jsonl).
+
+The cache file is a JSONL log. Each line maps an audio path to a dictionary of
+versions and hypothesis metadata, e.g.:
+    {"/path/to/audio.wav": {"2024Q1": {"asr_hyp": "...", "system": "...", ...}}}
+
+Lines are replayed in order when the cache is loaded, so the last line for a given
+audio path wins. This allows new hypotheses to be appended to the file instead of
+rewriting the whole cache after every update. The log is periodically compacted
+into a snapshot with exactly one line per audio path.
+
+The "indexed" backend reads the same JSONL file through a sorted key index
+(<codename>.asr_cache.keys) and an offsets file (<codename>.asr_cache.offsets), both
+memory-mapped. Only the requested entries are decoded, so startup time and memory use do
+not depend on the size of the cache.
+
+Alternatively, hypotheses can be stored in a single SQLite database shared by all
+ASR systems (<BIGOS_EVAL_DATA_REPO_PATH>/asr_hyps_cache/asr_hyps_cache.sqlite),
+which can be safely written by several processes at the same time.
+"""
+
+import os
+import json
+import mmap
+import atexit
+import time
+import struct
+import sqlite3
+import logging
+import weakref
+
+logger = logging.getLogger(__name__)
+
+CACHE_BACKENDS = ["jsonl", "indexed", "sqlite"]
+CACHE_WRITE_MODES = ["append", "rewrite"]
+# markers stored in the cache instead of a hypothesis when the ASR system failed
+INVALID_HYP_MARKERS = ["EMPTY", "INVALID"]
+
+def get_cache_codename(system, model):
+    """Get the codename under which hypotheses of the ASR system and model are cached.
+
+    Args:
+        system (str): Identifier for the ASR system type (e.g., 'google', 'azure').
+        model (str): The specific model of the ASR system.
+
+    Returns:
+        str: The codename, e.g. "whisper_local_large-v2".
+    """
+    codename = "{}_{}".format(system.lower(), model.lower())
+    #remove "/" from codename
+    return codename.replace("/", "_")
+
+def init_hyp_cache_store(backend, common_cache_dir, codename, write_mode="append", compaction_interval=1000, sqlite_file=None,
+                         flush_every=1, flush_interval_sec=30):
+    """Create the hypothesis cache store for the ASR system codename.
+
+    Args:
+        backend (str): One of "jsonl", "indexed" or "sqlite".
+        common_cache_dir (str): Directory for storing cached hypotheses.
+        codename (str): Unique identifier of the ASR system and model combination.
+        write_mode (str, optional): Write mode of the JSONL store. Defaults to "append".
+        compaction_interval (int, optional): Compaction interval of the JSONL store. Defaults to 1000.
+        sqlite_file (str, optional): Path to the SQLite database. Defaults to
+            <common_cache_dir>/asr_hyps_cache.sqlite.
+        flush_every (int, optional): Number of updates buffered in memory before they are written
+            in a single batch. Defaults to 1 (every update is written immediately).
+        flush_interval_sec (float, optional): Number of seconds after which buffered updates are
+            written. Defaults to 30.
+
+    Returns:
+        JsonlHypCacheStore, IndexedJsonlHypCacheStore, SqliteHypCacheStore or WriteBehindHypCacheStore:
+            The cache store.
+
+    Raises:
+        ValueError: If an unsupported backend is specified.
+    """
+    cache_file = os.path.join(common_cache_dir, codename + ".asr_cache.jsonl")
+    if backend == "jsonl":
+        store = JsonlHypCacheStore(cache_file, write_mode, compaction_interval)
+    elif backend == "indexed":
+        store = IndexedJsonlHypCacheStore(cache_file, compaction_interval)
+    elif backend == "sqlite":
+        if not sqlite_file:
+            sqlite_file = os.path.join(common_cache_dir, "asr_hyps_cache.sqlite")
+        store = SqliteHypCacheStore(sqlite_file, codename)
+        # import the existing JSONL cache when the system is used with the SQLite backend for the first time
+        if store.count() == 0 and os.path.exists(cache_file):
+            store.import_jsonl(cache_file)
+    else:
+        raise ValueError(f"Unknown cache backend: {backend}. Supported backends: {CACHE_BACKENDS}")
+
+    if flush_every > 1:
+        return WriteBehindHypCacheStore(store, flush_every, flush_interval_sec)
+    return store
+
+def read_jsonl_cache(cache_file):
+    """Read a JSONL cache file by replaying all lines in order.
+
+    Args:
+        cache_file (str): Path to the <codename>.asr_cache.jsonl file.
+
+    Returns:
+        tuple: A tuple containing (dictionary mapping audio paths to {version: metadata}
+               dictionaries, number of valid lines in the file).
+    """
+    entries = {}
+    nr_of_lines = 0
+    nr_of_corrupted_lines = 0
+    with open(cache_file, "r") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            try:
+                entries.update(json.loads(line))
+            except json.JSONDecodeError:
+                # last line can be incomplete if the process was killed during append
+                nr_of_corrupted_lines += 1
+                continue
+            nr_of_lines += 1
+    if nr_of_corrupted_lines:
+        logger.warning("Skipped %d corrupted lines in cache file: %s", nr_of_corrupted_lines, cache_file)
+    return entries, nr_of_lines
+
+def append_jsonl_lines(cache_file, items, fsync=False):
+    """Append cache entries as JSON lines to the cache file in a single write.
+
+    If the process writing the previous line was killed mid-write, the incomplete line is
+    terminated first, so that only that line is lost when the log is replayed.
+
+    Args:
+        cache_file (str): Path to the <codename>.asr_cache.jsonl file.
+        items (list): List of (audio_path, {version: metadata}) tuples.
+        fsync (bool, optional): Flush the appended lines to the disk before returning. Defaults to False.
+    """
+    lines = "".join(json.dumps({audio_path: entry}) + "\n" for audio_path, entry in items)
+    with open(cache_file, "ab+") as f:
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                lines = "\n" + lines
+        f.write(lines.encode("utf-8"))
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+def append_jsonl_line(cache_file, audio_path, entry):
+    """Append a single cache entry as a JSON line to the cache file.
+
+    Args:
+        cache_file (str): Path to the <codename>.asr_cache.jsonl file.
+        audio_path (str): Path to the audio file (cache key).
+        entry (dict): Dictionary mapping versions to hypothesis metadata.
+    """
+    append_jsonl_lines(cache_file, [(audio_path, entry)])
+
+def write_jsonl_snapshot(cache_file, entries):
+    """Atomically write a JSONL cache file with one line per audio path.
+
+    The snapshot is written to a temporary file and renamed over the cache file,
+    so a crash during writing never leaves a truncated cache behind.
+
+    Args:
+        cache_file (str): Path to the <codename>.asr_cache.jsonl file.
+        entries (dict): Dictionary mapping audio paths to {version: metadata} dictionaries.
+    """
+    tmp_cache_file = cache_file + ".tmp"
+    with open(tmp_cache_file, "w") as f:
+        for audio_path in entries:
+            json.dump({audio_path: entries[audio_path]}, f)
+            f.write("\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_cache_file, cache_file)
+
+def prune_cache_entries(entries, keep_version=None, drop_invalid=False, dedup_aliases=False):
+    """Remove stale hypotheses from cache entries.
+
+    Args:
+        entries (dict): Dictionary mapping audio paths to {version: metadata} dictionaries.
+        keep_version (callable, optional): Predicate deciding if hypotheses of a version are kept.
+            Defaults to None (all versions are kept).
+        drop_invalid (bool, optional): Drop EMPTY and INVALID markers. Defaults to False.
+        dedup_aliases (bool, optional): Drop audio paths with the same filename and identical
+            hypotheses as a later audio path (aliases created when the data was moved between
+            machines). Defaults to False.
+
+    Returns:
+        tuple: A tuple containing (pruned dictionary mapping audio paths to {version: metadata}
+               dictionaries, number of dropped hypotheses).
+    """
+    pruned = {}
+    nr_of_dropped_hyps = 0
+    for audio_path, entry in entries.items():
+        kept_entry = {}
+        for version, metadata in entry.items():
+            if keep_version is not None and not keep_version(version):
+                continue
+            if drop_invalid and metadata.get("asr_hyp") in INVALID_HYP_MARKERS:
+                continue
+            kept_entry[version] = metadata
+        nr_of_dropped_hyps += len(entry) - len(kept_entry)
+        if kept_entry:
+            pruned[audio_path] = kept_entry
+
+    if dedup_aliases:
+        # the most recently added path of the audio file is kept
+        last_key_for_filename = {}
+        for audio_path in pruned:
+            last_key_for_filename[os.path.basename(audio_path)] = audio_path
+        for audio_path in list(pruned):
+            last_key = last_key_for_filename[os.path.basename(audio_path)]
+            if audio_path != last_key and pruned[audio_path] == pruned[last_key]:
+                nr_of_dropped_hyps += len(pruned.pop(audio_path))
+
+    return pruned, nr_of_dropped_hyps
+
+def gc_jsonl_cache(cache_file, keep_version=None, drop_invalid=False, dedup_aliases=False, dry_run=False):
+    """Compact a JSONL cache file to one line per audio path and drop stale hypotheses.
+
+    Args:
+        cache_file (str): Path to the <codename>.asr_cache.jsonl file.
+        keep_version (callable, optional): Predicate deciding if hypotheses of a version are kept.
+        drop_invalid (bool, optional): Drop EMPTY and INVALID markers. Defaults to False.
+        dedup_aliases (bool, optional): Drop duplicated audio path aliases. Defaults to False.
+        dry_run (bool, optional): Only report the savings without modifying the cache. Defaults to False.
+
+    Returns:
+        dict: Garbage collection statistics (lines, samples, dropped hypotheses,
+              bytes and load time before and after).
+    """
+    stats = {"bytes_before": os.path.getsize(cache_file)}
+    start = time.perf_counter()
+    entries, stats["lines_before"] = read_jsonl_cache(cache_file)
+    stats["load_sec_before"] = time.perf_counter() - start
+    stats["samples_before"] = len(entries)
+
+    pruned, stats["dropped_hyps"] = prune_cache_entries(entries, keep_version, drop_invalid, dedup_aliases)
+    stats["samples_after"] = len(pruned)
+
+    # write the snapshot next to the cache to measure the load time after compaction
+    gc_cache_file = cache_file + ".gc"
+    write_jsonl_snapshot(gc_cache_file, pruned)
+    stats["bytes_after"] = os.path.getsize(gc_cache_file)
+    start = time.perf_counter()
+    _, stats["lines_after"] = read_jsonl_cache(gc_cache_file)
+    stats["load_sec_after"] = time.perf_counter() - start
+
+    if dry_run:
+        os.remove(gc_cache_file)
+    else:
+        os.replace(gc_cache_file, cache_file)
+    return stats
+
+class JsonlHypCacheStore:
+    """JSONL based storage for cached ASR hypotheses.
+
+    Supports two write modes:
+        - "append": every update is appended as a single JSON line to the cache file.
+          The file is compacted into a snapshot after `compaction_interval` appended lines.
+        - "rewrite": the whole cache file is rewritten after every update (legacy behavior).
+
+    Snapshots are written to a temporary file and atomically renamed over the cache file,
+    so a crash during compaction never leaves a truncated cache behind.
+
+    Attributes:
+        cache_file (str): Path to the cache file on disk.
+        write_mode (str): Either "append" or "rewrite".
+        compaction_interval (int): Number of appended lines after which the log is compacted.
+        entries (dict): Dictionary mapping audio paths to {version: metadata} dictionaries.
+        filename_index (dict): Dictionary mapping audio filenames to cache keys (audio paths).
+        nr_of_log_lines (int): Number of lines currently stored in the cache file.
+    """
+
+    def __init__(self, cache_file, write_mode="append", compaction_interval=1000):
+        """Initialize the store and load the cache file if it exists.
+
+        Args:
+            cache_file (str): Path to the cache file on disk.
+            write_mode (str, optional): Either "append" or "rewrite". Defaults to "append".
+            compaction_interval (int, optional): Number of appended lines after which
+                the log is compacted into a snapshot. Defaults to 1000.
+
+        Raises:
+            ValueError: If an unsupported write mode is specified.
+        """
+        if write_mode not in CACHE_WRITE_MODES:
+            raise ValueError(f"Unknown cache write mode: {write_mode}. Supported modes: {CACHE_WRITE_MODES}")
+
+        self.cache_file = cache_file
+        self.write_mode = write_mode
+        self.compaction_interval = compaction_interval
+        self.entries = {}
+        self.filename_index = {}
+        self.nr_of_log_lines = 0
+        self.load()
+
+    def load(self):
+        """Load the cache file by replaying all JSONL lines in order.
+
+        If the log contains more redundant lines than the compaction interval allows,
+        the cache is compacted right after loading.
+        """
+        self.entries.clear()
+        self.filename_index = {}
+        self.nr_of_log_lines = 0
+        if not os.path.exists(self.cache_file):
+            logger.debug("Cache file does not exist: %s", self.cache_file)
+            return
+        entries, self.nr_of_log_lines = read_jsonl_cache(self.cache_file)
+        self.entries.update(entries)
+
+        for audio_path in self.entries:
+            self.filename_index.setdefault(os.path.basename(audio_path), audio_path)
+
+        if self.write_mode == "append" and self.nr_of_log_lines - len(self.entries) >= self.compaction_interval:
+            logger.info("Cache log %s contains %d redundant lines. Compacting.", self.cache_file, self.nr_of_log_lines - len(self.entries))
+            self.compact()
+
+    def get(self, audio_path):
+        """Get the cache entry for the audio path.
+
+        Args:
+            audio_path (str): Path to the audio file (cache key).
+
+        Returns:
+            dict or None: Dictionary mapping versions to hypothesis metadata, None if not cached.
+        """
+        return self.entries.get(audio_path)
+
+    def contains(self, audio_path):
+        """Check if the audio path is cached.
+
+        Args:
+            audio_path (str): Path to the audio file (cache key).
+
+        Returns:
+            bool: True if the audio path is cached.
+        """
+        return audio_path in self.entries
+
+    def count(self):
+        """Get the number of cached audio samples.
+
+        Returns:
+            int: Number of audio paths in the cache.
+        """
+        return len(self.entries)
+
+    def as_dict(self):
+        """Get all cache entries.
+
+        Returns:
+            dict: Dictionary mapping audio paths to {version: metadata} dictionaries.
+        """
+        return self.entries
+
+    def find_by_filename(self, audio_filename):
+        """Find the cache key of an audio file with the given filename.
+
+        Used when the audio data was moved between machines and the full path is not in the cache.
+
+        Args:
+            audio_filename (str): Audio filename without the directory part.
+
+        Returns:
+            str or None: The cache key (audio path) if found, None otherwise.
+        """
+        return self.filename_index.get(audio_filename)
+
+    def put(self, audio_path, entry):
+        """Store the cache entry for the audio path and persist it on disk.
+
+        Args:
+            audio_path (str): Path to the audio file (cache key).
+            entry (dict): Dictionary mapping versions to hypothesis metadata.
+        """
+        self.entries[audio_path] = entry
+        self.filename_index.setdefault(os.path.basename(audio_path), audio_path)
+        if self.write_mode == "rewrite":
+            self.compact()
+            return
+
+        append_jsonl_line(self.cache_file, audio_path, entry)
+        self.nr_of_log_lines += 1
+
+        if self.nr_of_log_lines - len(self.entries) >= self.compaction_interval:
+            self.compact()
+
+    def put_many(self, items):
+        """Store several cache entries and persist them with a single write.
+
+        Args:
+            items (list): List of (audio_path, {version: metadata}) tuples.
+        """
+        for audio_path, entry in items:
+            self.entries[audio_path] = entry
+            self.filename_index.setdefault(os.path.basename(audio_path), audio_path)
+        if self.write_mode == "rewrite":
+            self.compact()
+            return
+
+        append_jsonl_lines(self.cache_file, items, fsync=True)
+        self.nr_of_log_lines += len(items)
+
+        if self.nr_of_log_lines - len(self.entries) >= self.compaction_interval:
+            self.compact()
+
+    def flush(self):
+        """Entries are persisted on every update, so there is nothing to flush."""
+
+    def compact(self):
+        """Atomically write a snapshot of the cache with one line per audio path."""
+        write_jsonl_snapshot(self.cache_file, self.entries)
+        self.nr_of_log_lines = len(self.entries)
+
+
+class IndexedJsonlHypCacheStore:
+    """Read-optimized JSONL storage for cached ASR hypotheses.
+
+    Uses the same <codename>.asr_cache.jsonl log as JsonlHypCacheStore, but instead of
+    parsing the whole log at startup, it looks the entries up in two memory-mapped files:
+        - <codename>.asr_cache.keys: concatenated "<filename>\\0<audio path>" keys
+        - <codename>.asr_cache.offsets: header followed by fixed size records
+          (key offset, key length, line offset, line length) sorted by key
+
+    Sorting by "<filename>\\0<audio path>" allows binary search both by the audio path and
+    by the filename alone. The index covers the log up to `indexed_size` bytes. Lines appended
+    later (by this or other processes) are kept in memory and are merged into the index
+    once there are `compaction_interval` of them. The index is rebuilt when the log was
+    replaced, e.g. after compaction by JsonlHypCacheStore or hyp_cache_gc.py.
+
+    Attributes:
+        cache_file (str): Path to the cache file on disk.
+        keys_file (str): Path to the sorted keys file.
+        offsets_file (str): Path to the offsets file.
+        compaction_interval (int): Number of lines outside of the index after which it is rebuilt.
+        new_entries (dict): Entries appended to the log after the index was built.
+        new_filename_index (dict): Dictionary mapping filenames to keys of the new entries.
+    """
+
+    HEADER = struct.Struct("<8sQQQ")
+    RECORD = struct.Struct("<QIQI")
+    MAGIC = b"BIGOSIDX"
+
+    def __init__(self, cache_file, compaction_interval=1000):
+        """Initialize the store, building the index if it is missing or stale.
+
+        Args:
+            cache_file (str): Path to the cache file on disk.
+            compaction_interval (int, optional): Number of lines outside of the index after
+                which it is rebuilt. Defaults to 1000.
+        """
+        self.cache_file = cache_file
+        cache_file_prefix = cache_file[:-len(".jsonl")] if cache_file.endswith(".jsonl") else cache_file
+        self.keys_file = cache_file_prefix + ".keys"
+        self.offsets_file = cache_file_prefix + ".offsets"
+        self.compaction_interval = compaction_interval
+        self.new_entries = {}
+        self.new_filename_index = {}
+        self._nr_of_records = 0
+        self._indexed_size = 0
+        self._maps = []
+        self.load()
+
+    def load(self):
+        """Open the index and read the log lines appended after it was built."""
+        self._close()
+        self.new_entries = {}
+        self.new_filename_index = {}
+        if not os.path.exists(self.cache_file):
+            logger.debug("Cache file does not exist: %s", self.cache_file)
+            open(self.cache_file, "a").close()
+        if not self._open_index():
+            self.build_index()
+            self._open_index()
+        self._read_tail()
+        if len(self.new_entries) >= self.compaction_interval:
+            self.build_index()
+            self.load()
+
+    def _close(self):
+        for mapped in self._maps:
+            mapped.close()
+        self._maps = []
+        self._keys = self._offsets = self._data = None
+        self._nr_of_records = 0
+        self._indexed_size = 0
+
+    def _map_file(self, path):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return b""
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._maps.append(mapped)
+        return mapped
+
+    def _open_index(self):
+        """Memory-map the index files.
+
+        Returns:
+            bool: False if the index is missing or does not match the cache file.
+        """
+        if not os.path.exists(self.keys_file) or not os.path.exists(self.offsets_file):
+            return False
+        offsets = self._map_file(self.offsets_file)
+        if len(offsets) < self.HEADER.size:
+            self._close()
+            return False
+        magic, inode, indexed_size, nr_of_records = self.HEADER.unpack_from(offsets, 0)
+        cache_stat = os.stat(self.cache_file)
+        if magic != self.MAGIC or inode != cache_stat.st_ino or indexed_size > cache_stat.st_size:
+            logger.info("Cache index is stale: %s", self.offsets_file)
+            self._close()
+            return False
+        self._offsets = offsets
+        self._keys = self._map_file(self.keys_file)
+        self._data = self._map_file(self.cache_file)
+        self._indexed_size = indexed_size
+        self._nr_of_records = nr_of_records
+        return True
+
+    def _read_tail(self):
+        """Replay the log lines appended after the index was built."""
+        nr_of_corrupted_lines = 0
+        with open(self.cache_file, "rb") as f:
+            f.seek(self._indexed_size)
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    self._put_new_entries(json.loads(line))
+                except json.JSONDecodeError:
+                    nr_of_corrupted_lines += 1
+        if nr_of_corrupted_lines:
+            logger.warning("Skipped %d corrupted lines in cache file: %s", nr_of_corrupted_lines, self.cache_file)
+
+    def _put_new_entries(self, entries):
+        for audio_path, entry in entries.items():
+            self.new_entries[audio_path] = entry
+            self.new_filename_index.setdefault(os.path.basename(audio_path), audio_path)
+
+    def build_index(self):
+        """Scan the cache file and atomically write the sorted keys and offsets files."""
+        logger.info("Building cache index: %s", self.offsets_file)
+        last_line_for_key = {}
+        nr_of_corrupted_lines = 0
+        with open(self.cache_file, "rb") as f:
+            inode = os.fstat(f.fileno()).st_ino
+            line_offset = 0
+            for line in f:
+                if line.strip() and line.endswith(b"\n"):
+                    try:
+                        for audio_path in json.loads(line):
+                            last_line_for_key[audio_path] = (line_offset, len(line))
+                    except json.JSONDecodeError:
+                        nr_of_corrupted_lines += 1
+                elif line.strip():
+                    # incomplete last line is left for the tail of the log
+                    break
+                line_offset += len(line)
+            indexed_size = line_offset
+        if nr_of_corrupted_lines:
+            logger.warning("Skipped %d corrupted lines in cache file: %s", nr_of_corrupted_lines, self.cache_file)
+
+        index_keys = sorted((self._index_key(audio_path), line) for audio_path, line in last_line_for_key.items())
+        with open(self.keys_file + ".tmp", "wb") as keys_f, open(self.offsets_file + ".tmp", "wb") as offsets_f:
+            offsets_f.write(self.HEADER.pack(self.MAGIC, inode, indexed_size, len(index_keys)))
+            key_offset = 0
+            for index_key, (line_offset, line_length) in index_keys:
+                keys_f.write(index_key)
+                offsets_f.write(self.RECORD.pack(key_offset, len(index_key), line_offset, line_length))
+                key_offset += len(index_key)
+        os.replace(self.keys_file + ".tmp", self.keys_file)
+        os.replace(self.offsets_file + ".tmp", self.offsets_file)
+
+    @staticmethod
+    def _index_key(audio_path):
+        return (os.path.basename(audio_path) + "\0" + audio_path).encode("utf-8")
+
+    def _record(self, i):
+        key_offset, key_length, line_offset, line_length = self.RECORD.unpack_from(self._offsets, self.HEADER.size + i * self.RECORD.size)
+        return bytes(self._keys[key_offset:key_offset + key_length]), line_offset, line_length
+
+    def _lower_bound(self, index_key):
+        """Get the position of the first record with key not lower than index_key."""
+        low, high = 0, self._nr_of_records
+        while low < high:
+            middle = (low + high) // 2
+            if self._record(middle)[0] < index_key:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _read_indexed_entry(self, i):
+        index_key, line_offset, line_length = self._record(i)
+        audio_path = index_key.split(b"\0", 1)[1].decode("utf-8")
+        return audio_path, json.loads(self._data[line_offset:line_offset + line_length])[audio_path]
+
+    def _find_indexed(self, audio_path):
+        index_key = self._index_key(audio_path)
+        i = self._lower_bound(index_key)
+        if i < self._nr_of_records and self._record(i)[0] == index_key:
+            return i
+        return None
+
+    def get(self, audio_path):
+        """Get the cache entry for the audio path.
+
+        Args:
+            audio_path (str): Path to the audio file (cache key).
+
+        Returns:
+            dict or None: Dictionary mapping versions to hypothesis metadata, None if not cached.
+        """
+        if audio_path in self.new_entries:
+            return self.new_entries[audio_path]
+        i = self._find_indexed(audio_path)
+        return self._read_indexed_entry(i)[1] if i is not None else None
+
+    def contains(self, audio_path):
+        """Check if the audio path is cached without decoding its entry.
+
+        Args:
+            audio_path (str): Path to the audio file (cache key).
+
+        Returns:
+            bool: True if the audio path is cached.
+        """
+        return audio_path in self.new_entries or self._find_indexed(audio_path) is not None
+
+    def count(self):
+        """Get the number of cached audio samples.
+
+        Returns:
+            int: Number of audio paths in the cache.
+        """
+        nr_of_new_keys = sum(1 for audio_path in self.new_entries if self._find_indexed(audio_path) is None)
+        return self._nr_of_records + nr_of_new_keys
+
+    def as_dict(self):
+        """Get all cache entries. Decodes the whole cache, prefer `get` for lookups.
+
+        Returns:
+            dict: Dictionary mapping audio paths to {version: metadata} dictionaries.
+        """
+        entries = dict(self._read_indexed_entry(i) for i in range(self._nr_of_records))
+        entries.update(self.new_entries)
+        return entries
+
+    def find_by_filename(self, audio_filename):
+        """Find the cache key of an audio file with the given filename.
+
+        Args:
+            audio_filename (str): Audio filename without the directory part.
+
+        Returns:
+            str or None: The cache key (audio path) if found, None otherwise.
+        """
+        prefix = (audio_filename + "\0").encode("utf-8")
+        i = self._lower_bound(prefix)
+        if i < self._nr_of_records:
+            index_key = self._record(i)[0]
+            if index_key.startswith(prefix):
+                return index_key[len(prefix):].decode("utf-8")
+        return self.new_filename_index.get(audio_filename)
+
+    def put(self, audio_path, entry):
+        """Append the cache entry for the audio path to the log.
+
+        Args:
+            audio_path (str): Path to the audio file (cache key).
+            entry (dict): Dictionary mapping versions to hypothesis metadata.
+        """
+        append_jsonl_line(self.cache_file, audio_path, entry)
+        self._put_new_entries({audio_path: entry})
+        if len(self.new_entries) >= self.compaction_interval:
+            self.build_index()
+            self.load()
+
+    def put_many(self, items):
+        """Append several cache entries to the log with a single write.
+
+        Args:
+            items (list): List of (audio_path, {version: metadata}) tuples.
+        """
+        append_jsonl_lines(self.cache_file, items, fsync=True)
+        self._put_new_entries(dict(items))
+        if len(self.new_entries) >= self.compaction_interval:
+            self.build_index()
+            self.load()
+
+    def flush(self):
+        """Entries are persisted on every update, so there is nothing to flush."""
+
+    def compact(self):
+        """Atomically write a snapshot with one line per audio path and rebuild the index.
+
+        Lines of indexed entries are copied without decoding them.
+        """
+        tmp_cache_file = self.cache_file + ".tmp"
+        with open(tmp_cache_file, "wb") as f:
+            for i in range(self._nr_of_records):
+                index_key, line_offset, line_length = self._record(i)
+                if index_key.split(b"\0", 1)[1].decode("utf-8") not in self.new_entries:
+                    f.write(self._data[line_offset:line_offset + line_length])
+            for audio_path, entry in self.new_entries.items():
+                f.write((json.dumps({audio_path: entry}) + "\n").encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        self._close()
+        os.replace(tmp_cache_file, self.cache_file)
+        self.build_index()
+        self.load()
+
+
+class SqliteHypCacheStore:
+    """SQLite based storage for cached ASR hypotheses.
+
+    Hypotheses of all ASR systems are stored in a single table keyed by
+    (codename, version, audio_key). The database is opened in WAL mode, so several
+    processes (e.g. parallel HYP_GEN workers) can read and write the cache at the same
+    time without overwriting each other's hypotheses.
+
+    Unlike the JSONL store, putting an entry for an audio path only replaces the versions
+    present in the entry. Hypotheses of other versions are kept.
+
+    Attributes:
+        sqlite_file (str): Path to the SQLite database on disk.
+        codename (str): Unique identifier of the ASR system and model combination.
+        timeout (float): Number of seconds to wait for a lock held by another process.
+    """
+
+    def __init__(self, sqlite_file, codename, timeout=60):
+        """Initialize the store and create the database schema if needed.
+
+        Args:
+            sqlite_file (str): Path to the SQLite database on disk.
+            codename (str): Unique identifier of the ASR system and model combination.
+            timeout (float, optional): Number of seconds to wait for a lock held by
+                another process. Defaults to 60.
+        """
+        self.sqlite_file = sqlite_file
+        self.codename = codename
+        self.timeout = timeout
+        self._conn = None
+        self._conn_pid = None
+
+        conn = self._get_connection()
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS asr_hyps (
+                codename TEXT NOT NULL,
+                version TEXT NOT NULL,
+                audio_key TEXT NOT NULL,
+                audio_filename TEXT NOT NULL,
+                metadata TEXT NOT NULL,
+                PRIMARY KEY (codename, version, audio_key)
+            )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_asr_hyps_audio_key ON asr_hyps (codename, audio_key)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_asr_hyps_audio_filename ON asr_hyps (codename, audio_filename)")
+
+    def _get_connection(self):
+        """Get the database connection, reopening it in processes forked after it was created.
+
+        Returns:
+            sqlite3.Connection: Connection in autocommit mode with WAL journaling enabled.
+        """
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.sqlite_file, timeout=self.timeout, isolation_level=None, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def count(self):
+        """Get the number of cached audio samples for the codename.
+
+        Returns:
+            int: Number of distinct audio keys in the cache.
+        """
+        row = self._get_connection().execute(
+            "SELECT COUNT(DISTINCT audio_key) FROM asr_hyps WHERE codename = ?", (self.codename,)).fetchone()
+        return row[0]
+
+    def contains(self, audio_path):
+        """Check if the audio path is cached.
+
+        Args:
+            audio_path (str): Path to the audio file (cache key).
+
+        Returns:
+            bool: True if the audio path is cached.
+        """
+        row = self._get_connection().execute(
+            "SELECT 1 FROM asr_hyps WHERE codename = ? AND audio_key = ? LIMIT 1", (self.codename, audio_path)).fetchone()
+        return row is not None
+
+    def get(self, audio_path):
+        """Get the cache entry for the audio path.
+
+        Args:
+            audio_path (str): Path to the audio file (cache key).
+
+        Returns:
+            dict or None: Dictionary mapping versions to hypothesis metadata, None if not cached.
+        """
+        rows = self._get_connection().execute(
+            "SELECT version, metadata FROM asr_hyps WHERE codename = ? AND audio_key = ?",
+            (self.codename, audio_path)).fetchall()
+        if not rows:
+            return None
+        return {version: json.loads(metadata) for version, metadata in rows}
+
+    def as_dict(self):
+        """Get all cache entries for the codename.
+
+        Returns:
+            dict: Dictionary mapping audio paths to {version: metadata} dictionaries.
+        """
+        entries = {}
+        rows = self._get_connection().execute(
+            "SELECT audio_key, version, metadata FROM asr_hyps WHERE codename = ? ORDER BY rowid", (self.codename,))
+        for audio_key, version, metadata in rows:
+            entries.setdefault(audio_key, {})[version] = json.loads(metadata)
+        return entries
+
+    def find_by_filename(self, audio_filename):
+        """Find the cache key of an audio file with the given filename.
+
+        Args:
+            audio_filename (str): Audio filename without the directory part.
+
+        Returns:
+            str or None: The cache key (audio path) if found, None otherwise.
+        """
+        row = self._get_connection().execute(
+            "SELECT audio_key FROM asr_hyps WHERE codename = ? AND audio_filename = ? ORDER BY rowid LIMIT 1",
+            (self.codename, audio_filename)).fetchone()
+        return row[0] if row else None
+
+    def put(self, audio_path, entry):
+        """Store the cache entry for the audio path.
+
+        Args:
+            audio_path (str): Path to the audio file (cache key).
+            entry (dict): Dictionary mapping versions to hypothesis metadata.
+        """
+        self.put_many([(audio_path, entry)])
+
+    def put_many(self, items):
+        """Store several cache entries in a single transaction.
+
+        Args:
+            items (list): List of (audio_path, {version: metadata}) tuples.
+        """
+        rows = [(self.codename, version, audio_path, os.path.basename(audio_path), json.dumps(metadata))
+                for audio_path, entry in items for version, metadata in entry.items()]
+        conn = self._get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("INSERT OR REPLACE INTO asr_hyps (codename, version, audio_key, audio_filename, metadata) VALUES (?, ?, ?, ?, ?)", rows)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def delete_many(self, items):
+        """Delete several cached hypotheses in a single transaction.
+
+        Args:
+            items (list): List of (audio_path, version) tuples.
+        """
+        conn = self._get_connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("DELETE FROM asr_hyps WHERE codename = ? AND audio_key = ? AND version = ?",
+                             [(self.codename, audio_path, version) for audio_path, version in items])
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def gc(self, keep_version=None, drop_invalid=False, dedup_aliases=False, dry_run=False):
+        """Drop stale hypotheses of the codename from the database.
+
+        Space freed by the deleted rows is returned to the file system by `vacuum`.
+
+        Args:
+            keep_version (callable, optional): Predicate deciding if hypotheses of a version are kept.
+            drop_invalid (bool, optional): Drop EMPTY and INVALID markers. Defaults to False.
+            dedup_aliases (bool, optional): Drop duplicated audio path aliases. Defaults to False.
+            dry_run (bool, optional): Only report the savings without modifying the cache. Defaults to False.
+
+        Returns:
+            dict: Garbage collection statistics (samples, dropped hypotheses and load time before and
+                  after, the latter is None in dry run mode).
+        """
+        stats = {}
+        start = time.perf_counter()
+        entries = self.as_dict()
+        stats["load_sec_before"] = time.perf_counter() - start
+        stats["samples_before"] = len(entries)
+
+        pruned, stats["dropped_hyps"] = prune_cache_entries(entries, keep_version, drop_invalid, dedup_aliases)
+        stats["samples_after"] = len(pruned)
+        if dry_run:
+            # the load time after garbage collection is only known once the rows are deleted
+            stats["load_sec_after"] = None
+            return stats
+
+        self.delete_many([(audio_path, version) for audio_path, entry in entries.items()
+                          for version in entry if version not in pruned.get(audio_path, {})])
+        start = time.perf_counter()
+        self.as_dict()
+        stats["load_sec_after"] = time.perf_counter() - start
+        return stats
+
+    def vacuum(self):
+        """Checkpoint the WAL and rebuild the database file to release unused pages."""
+        conn = self._get_connection()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.execute("VACUUM")
+
+    def list_codenames(self):
+        """Get the codenames of all ASR systems stored in the database.
+
+        Returns:
+            list: Sorted list of codenames.
+        """
+        rows = self._get_connection().execute("SELECT DISTINCT codename FROM asr_hyps ORDER BY codename")
+        return [row[0] for row in rows]
+
+    def import_jsonl(self, cache_file):
+        """Import hypotheses from a JSONL cache file.
+
+        Args:
+            cache_file (str): Path to the <codename>.asr_cache.jsonl file.
+        """
+        logger.info("Importing JSONL cache %s into SQLite cache %s", cache_file, self.sqlite_file)
+        entries, _ = read_jsonl_cache(cache_file)
+        self.put_many(list(entries.items()))
+        logger.info("Imported %d cached audio samples", len(entries))
+
+    def flush(self):
+        """Entries are persisted on every update, so there is nothing to flush."""
+
+    def compact(self):
+        """Move the WAL content into the main database file."""
+        self._get_connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+
+# write-behind stores flushed at process exit, held weakly so that dropped stores are not kept alive
+_write_behind_stores = weakref.WeakSet()
+
+def close_write_behind_stores():
+    """Flush and close the write-behind stores that are still open (registered with atexit)."""
+    for store in list(_write_behind_stores):
+        store.close()
+
+atexit.register(close_write_behind_stores)
+
+class WriteBehindHypCacheStore:
+    """Write-behind buffer in front of a hypothesis cache store.
+
+    New entries are kept in memory and written to the wrapped store in a single batch every
+    `flush_every` entries, when `flush_interval_sec` seconds passed since the last flush
+    (checked on every update), when the store is closed or garbage-collected, and when the
+    process exits (including `exit()` calls in the ASR systems). JSONL batches are appended and fsynced in one write, and compaction writes
+    a temporary file that is atomically renamed over the cache, so a crash can lose at most
+    the buffered entries, never the hypotheses already on disk.
+
+    Attributes:
+        store (JsonlHypCacheStore, IndexedJsonlHypCacheStore or SqliteHypCacheStore): The wrapped store.
+        flush_every (int): Number of buffered entries after which they are flushed.
+        flush_interval_sec (float): Number of seconds after which buffered entries are flushed.
+        pending (dict): Buffered entries mapping audio paths to {version: metadata} dictionaries.
+        nr_of_flushes (int): Number of batches written to the wrapped store.
+        nr_of_flushed_entries (int): Number of entries written to the wrapped store.
+        closed (bool): True after close(), the store is no longer flushed at process exit.
+    """
+
+    def __init__(self, store, flush_every=100, flush_interval_sec=30):
+        """Initialize the buffer and register the store for the flush at process exit.
+
+        Args:
+            store (JsonlHypCacheStore, IndexedJsonlHypCacheStore or SqliteHypCacheStore): The wrapped store.
+            flush_every (int, optional): Number of buffered entries after which they are flushed. Defaults to 100.
+            flush_interval_sec (float, optional): Number of seconds after which buffered entries
+                are flushed. Defaults to 30.
+        """
+        self.store = store
+        self.flush_every = flush_every
+        self.flush_interval_sec = flush_interval_sec
+        self.pending = {}
+        self.pending_filename_index = {}
+        self.last_flush_time = time.monotonic()
+        self.nr_of_flushes = 0
+        self.nr_of_flushed_entries = 0
+        self.closed = False
+        _write_behind_stores.add(self)
+
+    def __del__(self):
+        # buffered entries of a store dropped without close() are not lost
+        if not self.closed:
+            self.close()
+
+    def close(self):
+        """Flush the buffered entries and unregister the store from the flush at process exit."""
+        if self.closed:
+            return
+        self.closed = True
+        _write_behind_stores.discard(self)
+        self.flush()
+
+    def get(self, audio_path):
+        """Get the cache entry for the audio path, including buffered entries.
+
+        Args:
+            audio_path (str): Path to the audio file (cache key).
+
+        Returns:
+            dict or None: Dictionary mapping versions to hypothesis metadata, None if not cached.
+        """
+        if audio_path in self.pending:
+            return self.pending[audio_path]
+        return self.store.get(audio_path)
+
+    def contains(self, audio_path):
+        """Check if the audio path is cached, including buffered entries.
+
+        Args:
+            audio_path (str): Path to the audio file (cache key).
+
+        Returns:
+            bool: True if the audio path is cached.
+        """
+        return audio_path in self.pending or self.store.contains(audio_path)
+
+    def count(self):
+        """Get the number of cached audio samples, including buffered entries.
+
+        Returns:
+            int: Number of audio paths in the cache.
+        """
+        return self.store.count() + sum(1 for audio_path in self.pending if not self.store.contains(audio_path))
+
+    def as_dict(self):
+        """Get all cache entries, including buffered entries.
+
+        Returns:
+            dict: Dictionary mapping audio paths to {version: metadata} dictionaries.
+        """
+        entries = dict(self.store.as_dict())
+        entries.update(self.pending)
+        return entries
+
+    def find_by_filename(self, audio_filename):
+        """Find the cache key of an audio file with the given filename, including buffered entries.
+
+        Args:
+            audio_filename (str): Audio filename without the directory part.
+
+        Returns:
+            str or None: The cache key (audio path) if found, None otherwise.
+        """
+        key = self.store.find_by_filename(audio_filename)
+        return key if key is not None else self.pending_filename_index.get(audio_filename)
+
+    def put(self, audio_path, entry):
+        """Buffer the cache entry and flush the buffer if it is full or old enough.
+
+        Args:
+            audio_path (str): Path to the audio file (cache key).
+            entry (dict): Dictionary mapping versions to hypothesis metadata.
+        """
+        self.pending[audio_path] = entry
+        self.pending_filename_index.setdefault(os.path.basename(audio_path), audio_path)
+        if len(self.pending) >= self.flush_every or time.monotonic() - self.last_flush_time >= self.flush_interval_sec:
+            self.flush()
+
+    def put_many(self, items):
+        """Buffer several cache entries.
+
+        Args:
+            items (list): List of (audio_path, {version: metadata}) tuples.
+        """
+        for audio_path, entry in items:
+            self.put(audio_path, entry)
+
+    def flush(self):
+        """Write the buffered entries to the wrapped store in a single batch."""
+        self.last_flush_time = time.monotonic()
+        if not self.pending:
+            return
+        logger.debug("Flushing %d buffered cache entries", len(self.pending))
+        self.store.put_many(list(self.pending.items()))
+        self.nr_of_flushes += 1
+        self.nr_of_flushed_entries += len(self.pending)
+        self.pending = {}
+        self.pending_filename_index = {}
+
+    def compact(self):
+        """Flush the buffered entries and compact the wrapped store."""
+        self.flush()
+        self.store.compact()
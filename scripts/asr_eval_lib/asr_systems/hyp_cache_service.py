@@ -0,0 +1,190 @@
+"""
+ASR Hypothesis Cache Service Module.
+
+This module contains a small HTTP service sharing cached ASR hypotheses between machines,
+and the client used by BaseASRSystem to query it before generating new hypotheses.
+Paid cloud transcriptions generated on one machine can then be reused by everyone
+running the same runtime config elsewhere.
+
+Endpoints (JSON request and response bodies):
+    GET  /health  -> {"status": "ok"}
+    POST /get     {"codename": ..., "audio_paths": [...]} -> {"entries": {audio_path: {version: metadata}}}
+    POST /put     {"codename": ..., "entries": {audio_path: {version: metadata}}} -> {"stored": <count>}
+
+Audio paths differ between machines, so entries not found by path are looked up by filename.
+Versions sent to /put are merged with the versions already stored for the audio path.
+"""
+
+import os
+import re
+import json
+import logging
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .hyp_cache import init_hyp_cache_store
+
+logger = logging.getLogger(__name__)
+
+# codenames are used in cache filenames, so path separators are rejected
+CODENAME_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
+
+class HypCacheServiceClient:
+    """Client of the shared hypothesis cache service.
+
+    The service is optional. Connection errors are reported and treated as cache misses,
+    so that hypothesis generation continues when the service is unavailable.
+
+    Attributes:
+        url (str): Base URL of the service, e.g. "http://localhost:8765".
+        token (str or None): Token sent in the Authorization header.
+        timeout (float): Request timeout in seconds.
+    """
+
+    def __init__(self, url, token=None, timeout=30):
+        """Initialize the client.
+
+        Args:
+            url (str): Base URL of the service.
+            token (str, optional): Token sent in the Authorization header. Defaults to None.
+            timeout (float, optional): Request timeout in seconds. Defaults to 30.
+        """
+        self.url = url.rstrip("/")
+        self.token = token
+        self.timeout = timeout
+
+    def _post(self, endpoint, payload):
+        """Send a JSON request to the service.
+
+        Args:
+            endpoint (str): Endpoint path, e.g. "/get".
+            payload (dict): Request body.
+
+        Returns:
+            dict or None: Response body, None if the request failed.
+        """
+        headers = {"Content-Type": "application/json"}
+        if self.token:
+            headers["Authorization"] = "Bearer " + self.token
+        request = urllib.request.Request(self.url + endpoint, data=json.dumps(payload).encode("utf-8"), headers=headers, method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return json.loads(response.read())
+        except (urllib.error.URLError, OSError, ValueError) as e:
+            logger.warning("Hypothesis cache service request %s failed: %s", self.url + endpoint, e)
+            return None
+
+    def get_many(self, codename, audio_paths):
+        """Get cache entries for several audio paths in a single request.
+
+        Args:
+            codename (str): Unique identifier of the ASR system and model combination.
+            audio_paths (list): Paths to the audio files.
+
+        Returns:
+            dict: Dictionary mapping the found audio paths to {version: metadata} dictionaries.
+        """
+        response = self._post("/get", {"codename": codename, "audio_paths": list(audio_paths)})
+        return response["entries"] if response else {}
+
+    def put_many(self, codename, entries):
+        """Store several cache entries in a single request.
+
+        Args:
+            codename (str): Unique identifier of the ASR system and model combination.
+            entries (dict): Dictionary mapping audio paths to {version: metadata} dictionaries.
+
+        Returns:
+            bool: True if the entries were stored by the service.
+        """
+        return self._post("/put", {"codename": codename, "entries": entries}) is not None
+
+
+class HypCacheRequestHandler(BaseHTTPRequestHandler):
+    """Request handler of the hypothesis cache service.
+
+    The server instance provides `get_store(codename)`, `lock` and `token` attributes.
+    """
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        if self.path == "/health":
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"error": "Unknown endpoint: {}".format(self.path)})
+
+    def do_POST(self):
+        if self.server.token and self.headers.get("Authorization") != "Bearer " + self.server.token:
+            self._send_json(401, {"error": "Invalid token"})
+            return
+        try:
+            payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            codename = payload["codename"]
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_json(400, {"error": "Invalid request: {}".format(e)})
+            return
+        if not CODENAME_PATTERN.match(codename):
+            self._send_json(400, {"error": "Invalid codename: {}".format(codename)})
+            return
+
+        with self.server.lock:
+            store = self.server.get_store(codename)
+            if self.path == "/get":
+                entries = {}
+                for audio_path in payload.get("audio_paths", []):
+                    entry = store.get(audio_path)
+                    if entry is None:
+                        key = store.find_by_filename(os.path.basename(audio_path))
+                        entry = store.get(key) if key is not None else None
+                    if entry is not None:
+                        entries[audio_path] = entry
+                self._send_json(200, {"entries": entries})
+            elif self.path == "/put":
+                entries = payload.get("entries", {})
+                for audio_path, entry in entries.items():
+                    merged_entry = dict(store.get(audio_path) or {})
+                    merged_entry.update(entry)
+                    store.put(audio_path, merged_entry)
+                self._send_json(200, {"stored": len(entries)})
+            else:
+                self._send_json(404, {"error": "Unknown endpoint: {}".format(self.path)})
+
+    def log_message(self, format, *args):
+        logger.debug("Hypothesis cache service: " + format, *args)
+
+
+def create_hyp_cache_server(cache_dir, host="127.0.0.1", port=8765, backend="sqlite", token=None):
+    """Create the hypothesis cache service.
+
+    Args:
+        cache_dir (str): Directory for storing the shared hypotheses.
+        host (str, optional): Address to listen on. Defaults to "127.0.0.1".
+        port (int, optional): Port to listen on. Defaults to 8765.
+        backend (str, optional): Cache backend of the service. Defaults to "sqlite".
+        token (str, optional): Token required in the Authorization header of POST requests.
+            Defaults to None (no authorization).
+
+    Returns:
+        ThreadingHTTPServer: The server. Call `serve_forever()` to start it.
+    """
+    server = ThreadingHTTPServer((host, port), HypCacheRequestHandler)
+    server.lock = threading.Lock()
+    server.token = token
+    stores = {}
+
+    def get_store(codename):
+        if codename not in stores:
+            stores[codename] = init_hyp_cache_store(backend, cache_dir, codename)
+        return stores[codename]
+
+    server.get_store = get_store
+    return server
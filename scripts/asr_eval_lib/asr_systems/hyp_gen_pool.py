@@ -0,0 +1,321 @@
+"""
+Sharded Hypothesis Generation Module.
+
+This module runs local ASR models in several worker processes, so that hypothesis generation
+scales across the cores of a multi-core CPU node. Each worker loads its own model replica once,
+with a pinned number of torch threads and optionally pinned to its own set of CPU cores, and
+pulls shards of audio paths from a shared queue.
+
+Workers do not write the hypothesis cache or the audio digest index. New cache entries and
+digests are sent back to the parent process with the hypotheses of every shard and merged
+into the cache and the digest index of the parent, which also reports the progress. Both are
+therefore written by a single process for every cache backend.
+
+Settings are read from the "hyp_gen_workers" section of the runtime config, e.g.:
+    "hyp_gen_workers": {"num_workers": 8, "threads_per_worker": 8, "cpu_affinity": true, "shard_size": 16}
+
+The memory budget of every worker ("max_rss_gb") defaults to an even share of HYP_GEN_SETTINGS MAX_RSS_GB.
+"""
+
+import os
+import time
+import queue
+import logging
+import multiprocessing
+
+from .request_engine import CLOUD_ASR_SYSTEMS
+from .hyp_cache import INVALID_HYP_MARKERS
+from .audio_digest import get_audio_digest_index, collect_new_digests, pop_new_digests
+
+logger = logging.getLogger(__name__)
+
+def get_worker_pool_settings(config_runtime, system):
+    """Get the worker pool settings of the ASR system from the runtime config.
+
+    Args:
+        config_runtime (dict): Runtime configuration.
+        system (str): Identifier for the ASR system type (e.g., 'mms', 'wav2vec2').
+
+    Returns:
+        dict or None: Settings of the worker pool, None if the system is generated in the main process.
+    """
+    settings = dict(config_runtime.get("hyp_gen_workers", {}))
+    # per-system settings override the settings of the run
+    settings.update(config_runtime["systems"][system].get("hyp_gen_workers", {}))
+    if settings.get("num_workers", 1) <= 1:
+        return None
+    if system in CLOUD_ASR_SYSTEMS:
+        logger.info("Worker processes are used only for local ASR systems. Generating %s hypotheses in the main process.", system)
+        return None
+    return settings
+
+def get_worker_cpus(worker_id, threads_per_worker):
+    """Get the CPU cores assigned to the worker.
+
+    Args:
+        worker_id (int): Index of the worker process.
+        threads_per_worker (int): Number of torch threads of every worker.
+
+    Returns:
+        list: Indices of the CPU cores, consecutive blocks of threads_per_worker cores per worker.
+    """
+    cpus = sorted(os.sched_getaffinity(0))
+    first = worker_id * threads_per_worker
+    return [cpus[i % len(cpus)] for i in range(first, first + threads_per_worker)]
+
+class WorkerHypCacheStore:
+    """Hypothesis cache store of a worker process.
+
+    Reads are served by the cache loaded when the worker started. Writes are collected in
+    memory and sent to the parent process, which merges them into the cache on disk.
+
+    Attributes:
+        store (JsonlHypCacheStore, IndexedJsonlHypCacheStore, SqliteHypCacheStore or WriteBehindHypCacheStore):
+            The cache loaded by the worker, never written.
+        pending (dict): New entries mapping audio paths to {version: metadata} dictionaries.
+    """
+
+    def __init__(self, store):
+        """Initialize the store.
+
+        Args:
+            store (JsonlHypCacheStore, IndexedJsonlHypCacheStore, SqliteHypCacheStore or WriteBehindHypCacheStore):
+                The cache loaded by the worker.
+        """
+        self.store = store
+        self.pending = {}
+
+    def get(self, audio_path):
+        """Get the cache entry for the audio path, including new entries."""
+        if audio_path in self.pending:
+            return self.pending[audio_path]
+        return self.store.get(audio_path)
+
+    def contains(self, audio_path):
+        """Check if the audio path is cached, including new entries."""
+        return audio_path in self.pending or self.store.contains(audio_path)
+
+    def count(self):
+        """Get the number of cached audio samples, including new entries."""
+        return self.store.count() + sum(1 for audio_path in self.pending if not self.store.contains(audio_path))
+
+    def as_dict(self):
+        """Get all cache entries, including new entries."""
+        entries = dict(self.store.as_dict())
+        entries.update(self.pending)
+        return entries
+
+    def find_by_filename(self, audio_filename):
+        """Find the cache key of an audio file with the given filename, including new entries."""
+        key = self.store.find_by_filename(audio_filename)
+        if key is not None:
+            return key
+        for audio_path in self.pending:
+            if os.path.basename(audio_path) == audio_filename:
+                return audio_path
+        return None
+
+    def put(self, audio_path, entry):
+        """Collect the cache entry for the parent process."""
+        self.pending[audio_path] = entry
+
+    def put_many(self, items):
+        """Collect several cache entries for the parent process."""
+        for audio_path, entry in items:
+            self.put(audio_path, entry)
+
+    def flush(self):
+        """Entries are flushed by the parent process."""
+
+    def compact(self):
+        """The cache is compacted by the parent process."""
+
+    def pop_pending(self):
+        """Take the new entries collected since the last call.
+
+        Returns:
+            list: List of (audio_path, {version: metadata}) tuples.
+        """
+        items = list(self.pending.items())
+        self.pending = {}
+        return items
+
+def run_worker(worker_id, system, model, settings, task_queue, result_queue):
+    """Main function of a worker process.
+
+    Args:
+        worker_id (int): Index of the worker process.
+        system (str): Identifier for the ASR system type.
+        model (str): The specific model of the ASR system.
+        settings (dict): Settings of the worker pool.
+        task_queue (multiprocessing.Queue): Queue of (shard_id, audio_paths, force_hyps) tasks, None to stop.
+        result_queue (multiprocessing.Queue): Queue of (worker_id, shard_id, hyps, cache_entries, new_digests, shard_sec) results.
+    """
+    threads_per_worker = settings.get("threads_per_worker")
+    if threads_per_worker:
+        # limit the OpenMP/MKL thread pools before torch is imported by the ASR system
+        os.environ["OMP_NUM_THREADS"] = str(threads_per_worker)
+        os.environ["MKL_NUM_THREADS"] = str(threads_per_worker)
+        if settings.get("cpu_affinity", False):
+            cpus = get_worker_cpus(worker_id, threads_per_worker)
+            os.sched_setaffinity(0, cpus)
+            logger.info("Worker %d pinned to CPUs %s", worker_id, cpus)
+        try:
+            import torch
+            torch.set_num_threads(threads_per_worker)
+        except ImportError:
+            pass
+
+    # new audio digests are appended to the index file by the parent process
+    collect_new_digests()
+
+    from .model_manager import ModelManager
+    from .base_asr_system import get_config_user
+    inference_engine = settings.get("inference_engine")
+    if inference_engine is not None and threads_per_worker:
+        inference_engine = dict(inference_engine, intra_op_threads=inference_engine.get("intra_op_threads", threads_per_worker))
+    asr_system = ModelManager(settings.get("max_rss_gb", 0)).load(system, model, get_config_user(), inference_engine)
+    asr_system.cache_store = WorkerHypCacheStore(asr_system.cache_store)
+    # progress is logged by the parent process, which counts the results of all workers
+    asr_system.hyp_gen_stats.progress_every = 0
+    batch_size = settings.get("batch_size", 1)
+    prefetch_depth = settings.get("prefetch_depth", 0)
+    logger.info("Worker %d initialized %s", worker_id, asr_system.get_name())
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+        shard_id, audio_paths, force_hyps = task
+        if prefetch_depth > 0:
+            asr_system.start_audio_prefetch(audio_paths, force_hyps, max(prefetch_depth, batch_size), settings.get("prefetch_workers", 2))
+        start_time = time.monotonic()
+        try:
+            if batch_size > 1:
+                hyps = asr_system.process_audio_batch(audio_paths, force_hyps)
+            else:
+                hyps = [asr_system.process_audio(audio_path, force_hyps) for audio_path in audio_paths]
+        except Exception as e:
+            logger.error("Worker %d failed to process shard %d: %s", worker_id, shard_id, e)
+            hyps = [None] * len(audio_paths)
+        asr_system.stop_audio_prefetch()
+        result_queue.put((worker_id, shard_id, hyps, asr_system.cache_store.pop_pending(), pop_new_digests(), time.monotonic() - start_time))
+
+class HypGenWorkerPool:
+    """Pool of worker processes generating hypotheses of a local ASR system.
+
+    Attributes:
+        system (str): Identifier for the ASR system type.
+        model (str): The specific model of the ASR system.
+        num_workers (int): Number of worker processes (model replicas).
+        shard_size (int): Number of audio paths sent to a worker at once.
+        settings (dict): Settings of the worker pool.
+        workers (list): Worker processes.
+    """
+
+    def __init__(self, system, model, settings):
+        """Start the worker processes. Every worker loads the model once.
+
+        Args:
+            system (str): Identifier for the ASR system type.
+            model (str): The specific model of the ASR system.
+            settings (dict): Settings from the "hyp_gen_workers" section of the runtime config:
+                num_workers, threads_per_worker (optional), cpu_affinity (optional, default false),
+                shard_size (optional, default 16), batch_size (optional, default 1),
+                prefetch_depth and prefetch_workers of the audio prefetching (optional, default 0 and 2),
+                max_rss_gb (optional, default 0 - no limit), inference_engine (optional, default None - PyTorch).
+        """
+        self.system = system
+        self.model = model
+        self.settings = settings
+        self.num_workers = settings["num_workers"]
+        self.shard_size = settings.get("shard_size", 16)
+
+        # spawned workers do not inherit CUDA or torch thread pool state of the parent
+        context = multiprocessing.get_context("spawn")
+        self.task_queue = context.Queue()
+        self.result_queue = context.Queue()
+        self.workers = []
+        for worker_id in range(self.num_workers):
+            worker = context.Process(target=run_worker, args=(worker_id, system, model, settings, self.task_queue, self.result_queue), daemon=True)
+            worker.start()
+            self.workers.append(worker)
+        logger.info("Started %d workers for %s %s", self.num_workers, system, model)
+
+    def generate(self, asr_system, audio_paths, force_hyps):
+        """Generate hypotheses for the audio paths with the worker processes.
+
+        Hypotheses already cached by asr_system are not sent to the workers. New cache entries
+        and audio digests of the workers are merged into the cache of asr_system and the digest
+        index as the shards are completed.
+
+        Args:
+            asr_system (BaseASRSystem): ASR system of the parent process owning the cache,
+                e.g. a CacheOnlyASRSystem which does not load the model.
+            audio_paths (list): Paths to the audio files.
+            force_hyps (bool): If True, ignore the cache and force regeneration of hypotheses.
+
+        Returns:
+            list: Generated ASR hypotheses in the order of audio_paths (None for failed shards).
+
+        Raises:
+            RuntimeError: If a worker process died.
+        """
+        asr_hyps = [None] * len(audio_paths)
+        pending_indexes = []
+        for i, audio_path in enumerate(audio_paths):
+            asr_hyp = None if force_hyps else asr_system.get_valid_hyp_from_cache(audio_path)
+            if asr_hyp is not None:
+                asr_hyps[i] = asr_hyp
+            else:
+                pending_indexes.append(i)
+        logger.info("Cached hypotheses: %d. Sending %d samples to %d workers", len(audio_paths) - len(pending_indexes), len(pending_indexes), self.num_workers)
+        # audio files are checked by the workers, durations of the sent files are counted from the sample catalog
+        pending_durations = asr_system.sample_catalog.get_durations([audio_paths[i] for i in pending_indexes])
+        asr_system.hyp_gen_stats.add_audio_time(sum(duration or 0 for duration in pending_durations))
+
+        shards = [pending_indexes[i:i + self.shard_size] for i in range(0, len(pending_indexes), self.shard_size)]
+        for shard_id, shard in enumerate(shards):
+            self.task_queue.put((shard_id, [audio_paths[i] for i in shard], force_hyps))
+
+        nr_of_done_samples = 0
+        for _ in range(len(shards)):
+            while True:
+                try:
+                    worker_id, shard_id, hyps, cache_entries, new_digests, shard_sec = self.result_queue.get(timeout=10)
+                    break
+                except queue.Empty:
+                    # the shard of a dead worker would never be completed
+                    if not all(worker.is_alive() for worker in self.workers):
+                        raise RuntimeError("Hypothesis generation worker of {} {} died".format(self.system, self.model))
+            for i, asr_hyp in zip(shards[shard_id], hyps):
+                asr_hyps[i] = asr_hyp
+            for index_file, digest_entries in new_digests.items():
+                get_audio_digest_index(index_file).add_entries(digest_entries)
+            if cache_entries:
+                with asr_system.cache_lock:
+                    asr_system.cache_store.put_many(cache_entries)
+            nr_of_done_samples += len(shards[shard_id])
+            logger.debug("Worker %d finished shard %d. Generated %d/%d hypotheses", worker_id, shard_id, nr_of_done_samples, len(pending_indexes))
+            # hypotheses of the workers are counted by the parent, "" for skipped audio files
+            asr_system.hyp_gen_stats.add_generation_time(shard_sec)
+            asr_system.hyp_gen_stats.count("generated", sum(1 for asr_hyp in hyps if asr_hyp not in INVALID_HYP_MARKERS + ["", None]))
+            asr_system.hyp_gen_stats.count("failed", sum(1 for asr_hyp in hyps if asr_hyp in INVALID_HYP_MARKERS or asr_hyp is None))
+            asr_system.hyp_gen_stats.count("skipped", sum(1 for asr_hyp in hyps if asr_hyp == ""))
+        asr_system.flush_cache()
+        return asr_hyps
+
+    def close(self):
+        """Stop the worker processes. Shards not taken by the workers yet (e.g. after an error) are dropped."""
+        try:
+            while True:
+                self.task_queue.get_nowait()
+        except queue.Empty:
+            pass
+        for _ in self.workers:
+            self.task_queue.put(None)
+        for worker in self.workers:
+            worker.join(timeout=60)
+            if worker.is_alive():
+                worker.terminate()
+        self.workers = []
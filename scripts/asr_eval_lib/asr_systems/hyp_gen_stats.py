@@ -0,0 +1,152 @@
+"""
+Hypothesis Generation Statistics Module.
+
+Per-sample output of hypothesis generation (cache lookups, audio checks, new hypotheses) is
+logged at DEBUG level for a deterministic sample of the audio files (1 of LOGGING
+LOG_DEBUG_SAMPLE_EVERY, chosen by the hash of the path, so all lines of a sampled file are
+logged). At the default INFO level every ASR system logs one progress line per
+LOG_PROGRESS_EVERY samples and a summary after every subset, with the counters:
+- hits: valid hypotheses read from the cache (or the cache service),
+- misses: cache lookups without a valid hypothesis,
+- generated: new non-empty hypotheses,
+- failed: new hypotheses saved as EMPTY or INVALID,
+- skipped: audio files not processed (missing, empty, unreadable or too long),
+- generation seconds: time spent in the ASR system generating new hypotheses,
+- audio seconds: duration of the audio files sent to the ASR system.
+"""
+
+import logging
+import threading
+import time
+import hashlib
+
+logger = logging.getLogger(__name__)
+
+COUNTERS = ["hits", "misses", "generated", "failed", "skipped"]
+
+class HypGenStats:
+    """Counters of hypothesis generation of an ASR system with periodic progress lines.
+
+    Attributes:
+        name (str): Name used in the log lines (codename of the ASR system).
+        progress_every (int): Number of processed samples per progress line (0 - no progress lines).
+        debug_sample_every (int): 1 of N audio files is logged at DEBUG level.
+        counts (dict): Counters of the current run (see COUNTERS).
+        generation_sec (float): Time spent generating new hypotheses in the current run.
+        audio_sec (float): Duration of the audio files sent to the ASR system in the current run.
+    """
+
+    def __init__(self, name, progress_every=1000, debug_sample_every=100):
+        """Initialize the counters.
+
+        Args:
+            name (str): Name used in the log lines (codename of the ASR system).
+            progress_every (int, optional): Number of processed samples per progress line. Defaults to 1000.
+            debug_sample_every (int, optional): 1 of N audio files is logged at DEBUG level. Defaults to 100.
+        """
+        self.name = name
+        self.progress_every = progress_every
+        self.debug_sample_every = max(1, debug_sample_every)
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self, nr_of_samples=None):
+        """Start a new run (e.g. a subset), resetting the counters.
+
+        Args:
+            nr_of_samples (int, optional): Number of samples of the run, shown in the progress lines. Defaults to None.
+        """
+        with self.lock:
+            self.counts = {counter: 0 for counter in COUNTERS}
+            self.generation_sec = 0.0
+            self.audio_sec = 0.0
+            self.nr_of_samples = nr_of_samples
+            self.start_time = time.monotonic()
+
+    def get_nr_of_processed_samples(self):
+        """Get the number of samples with a final result (hits, generated, failed and skipped samples).
+
+        Returns:
+            int: Number of processed samples.
+        """
+        return self.counts["hits"] + self.counts["generated"] + self.counts["failed"] + self.counts["skipped"]
+
+    def count(self, counter, n=1):
+        """Increase a counter, logging a progress line every progress_every processed samples.
+
+        Args:
+            counter (str): One of COUNTERS.
+            n (int, optional): Value added to the counter. Defaults to 1.
+        """
+        with self.lock:
+            before = self.get_nr_of_processed_samples()
+            self.counts[counter] += n
+            after = self.get_nr_of_processed_samples()
+        if self.progress_every > 0 and after // self.progress_every > before // self.progress_every:
+            self.log_progress("progress")
+
+    def add_generation_time(self, seconds):
+        """Add time spent generating new hypotheses.
+
+        Args:
+            seconds (float): Generation time in seconds.
+        """
+        with self.lock:
+            self.generation_sec += seconds
+
+    def add_audio_time(self, seconds):
+        """Add duration of audio files sent to the ASR system.
+
+        Args:
+            seconds (float): Audio duration in seconds.
+        """
+        with self.lock:
+            self.audio_sec += seconds
+
+    def format(self):
+        """Format the counters as a single log line.
+
+        Returns:
+            str: Counters, generation time and throughput of the current run.
+        """
+        nr_of_processed_samples = self.get_nr_of_processed_samples()
+        wall_sec = time.monotonic() - self.start_time
+        total = "/{}".format(self.nr_of_samples) if self.nr_of_samples is not None else ""
+        return "{}{} samples ({}), audio {:.1f} s, generation {:.1f} s, wall {:.1f} s, {:.1f} samples/s".format(
+            nr_of_processed_samples, total, ", ".join("{} {}".format(counter, self.counts[counter]) for counter in COUNTERS),
+            self.audio_sec, self.generation_sec, wall_sec, nr_of_processed_samples / wall_sec if wall_sec > 0 else 0.0)
+
+    def log_progress(self, stage):
+        """Log the counters at INFO level.
+
+        Args:
+            stage (str): Label of the line, e.g. "progress" or "summary".
+        """
+        logger.info("%s %s: %s", self.name, stage, self.format())
+
+    def is_debug_sample(self, audio_path):
+        """Check if the per-sample output of the audio file is logged.
+
+        Args:
+            audio_path (str): Path to the audio file.
+
+        Returns:
+            bool: True if DEBUG level is enabled and the file is in the logged sample.
+        """
+        if not logger.isEnabledFor(logging.DEBUG):
+            return False
+        if self.debug_sample_every == 1:
+            return True
+        digest = hashlib.blake2b(audio_path.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little") % self.debug_sample_every == 0
+
+    def debug(self, audio_path, msg, *args):
+        """Log a per-sample message at DEBUG level if the audio file is in the logged sample.
+
+        Args:
+            audio_path (str): Path to the audio file.
+            msg (str): Message with %-style placeholders.
+            *args: Values of the placeholders.
+        """
+        if self.is_debug_sample(audio_path):
+            logger.debug("%s %s: " + msg, self.name, audio_path, *args)
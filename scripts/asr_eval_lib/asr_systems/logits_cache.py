@@ -0,0 +1,255 @@
+"""
+CTC Logits Cache Module.
+
+For the local CTC models (wav2vec2, MMS, NeMo CTC models) the expensive part of hypothesis
+generation is the forward pass of the acoustic model, decoding is cheap. With the optional
+logits cache (CACHE_SETTINGS LOGITS_CACHE) the per-sample logits are stored on disk, so new
+decoding strategies (greedy vs. beam search, blank handling, vocabulary filters) can be run
+over a whole subset in seconds, without the acoustic model (see redecode_logits.py).
+
+Logits are stored as float16 in .npy shards of LOGITS_CACHE_SHARD_SIZE samples, read with
+memory mapping, in <BIGOS_EVAL_DATA_REPO_PATH>/asr_hyps_cache/logits/<codename>/<version>:
+- shard-<pid>-<timestamp>.npy: logits of several samples concatenated along the frames axis,
+- index.jsonl: one line per sample with the cache key (same as the hypothesis cache),
+  the audio path, the shard and the frame range,
+- vocabulary.json: tokens of the model, blank token and word delimiter used for decoding.
+"""
+
+import os
+import json
+import time
+import threading
+import logging
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# pyctcdecode decoders shared by all decoded samples, keyed by labels
+_beam_decoders = {}
+
+def get_logits_cache_dir(common_cache_dir, codename, version):
+    """Get the directory of the logits cache of the ASR system.
+
+    Args:
+        common_cache_dir (str): Directory for storing cached hypotheses.
+        codename (str): Codename of the ASR system and model.
+        version (str): Version of the ASR system in YYQ format.
+
+    Returns:
+        str: Directory with the logits shards, index and vocabulary.
+    """
+    return os.path.join(common_cache_dir, "logits", codename, version)
+
+class LogitsCache:
+    """On-disk cache of per-sample CTC logits.
+
+    Attributes:
+        cache_dir (str): Directory with the logits shards, index and vocabulary.
+        shard_size (int): Number of samples written to one shard.
+        index (dict): Dictionary mapping cache keys to index entries.
+        vocabulary (dict or None): Tokens, blank_id, word_delimiter and skip_ids of the model.
+        nr_of_written_shards (int): Number of shards written by this process.
+        nr_of_written_samples (int): Number of samples written by this process.
+    """
+
+    def __init__(self, cache_dir, shard_size=256):
+        """Open the cache and read its index.
+
+        Args:
+            cache_dir (str): Directory with the logits shards, index and vocabulary.
+            shard_size (int, optional): Number of samples written to one shard. Defaults to 256.
+        """
+        self.cache_dir = cache_dir
+        self.shard_size = max(1, shard_size)
+        self.index_file = os.path.join(cache_dir, "index.jsonl")
+        self.vocabulary_file = os.path.join(cache_dir, "vocabulary.json")
+        self.lock = threading.Lock()
+        self.pending = []
+        self.shards = {}
+        self.nr_of_written_shards = 0
+        self.nr_of_written_samples = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.index = {}
+        if os.path.exists(self.index_file):
+            with open(self.index_file, "r") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.index[entry["key"]] = entry
+        self.vocabulary = None
+        if os.path.exists(self.vocabulary_file):
+            with open(self.vocabulary_file, "r") as f:
+                self.vocabulary = json.load(f)
+
+    def set_vocabulary(self, vocabulary):
+        """Store the vocabulary of the model used to decode the logits.
+
+        Args:
+            vocabulary (dict): Tokens (list indexed by token id), blank_id, word_delimiter and skip_ids.
+        """
+        if vocabulary == self.vocabulary:
+            return
+        with open(self.vocabulary_file, "w") as f:
+            json.dump(vocabulary, f, ensure_ascii=False)
+        self.vocabulary = vocabulary
+
+    def contains(self, cache_key):
+        """Check if the logits of the sample are cached.
+
+        Args:
+            cache_key (str): Cache key of the audio file.
+
+        Returns:
+            bool: True if the logits are cached (possibly not flushed yet).
+        """
+        return cache_key in self.index or any(key == cache_key for key, _, _ in self.pending)
+
+    def put(self, cache_key, audio_path, logits):
+        """Add the logits of the sample, writing a shard every shard_size samples.
+
+        Args:
+            cache_key (str): Cache key of the audio file.
+            audio_path (str): Path to the audio file.
+            logits (numpy.ndarray): Logits of shape (frames, vocabulary size).
+        """
+        with self.lock:
+            self.pending.append((cache_key, audio_path, np.asarray(logits, dtype=np.float16)))
+            if len(self.pending) >= self.shard_size:
+                self._write_shard()
+
+    def flush(self):
+        """Write the pending logits to a shard."""
+        with self.lock:
+            self._write_shard()
+
+    def _write_shard(self):
+        """Write the pending logits to a new shard and append their index entries (lock held)."""
+        if not self.pending:
+            return
+        # unique name, several worker processes may write the same cache
+        shard = "shard-{}-{}.npy".format(os.getpid(), time.time_ns())
+        np.save(os.path.join(self.cache_dir, shard), np.concatenate([logits for _, _, logits in self.pending]))
+        entries = []
+        offset = 0
+        for cache_key, audio_path, logits in self.pending:
+            entries.append({"key": cache_key, "audio_path": audio_path, "shard": shard, "offset": offset, "frames": len(logits)})
+            offset += len(logits)
+        with open(self.index_file, "a") as f:
+            f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+        for entry in entries:
+            self.index[entry["key"]] = entry
+        self.nr_of_written_shards += 1
+        self.nr_of_written_samples += len(entries)
+        logger.debug("Wrote logits of %d samples to %s", len(entries), shard)
+        self.pending = []
+
+    def get(self, cache_key):
+        """Get the cached logits of the sample.
+
+        Args:
+            cache_key (str): Cache key of the audio file.
+
+        Returns:
+            numpy.ndarray or None: Memory-mapped float16 logits of shape (frames, vocabulary size), None if not cached.
+        """
+        entry = self.index.get(cache_key)
+        if entry is None:
+            return None
+        if entry["shard"] not in self.shards:
+            self.shards[entry["shard"]] = np.load(os.path.join(self.cache_dir, entry["shard"]), mmap_mode="r")
+        return self.shards[entry["shard"]][entry["offset"]:entry["offset"] + entry["frames"]]
+
+    def get_audio_paths(self):
+        """Get the audio paths of all cached samples.
+
+        Returns:
+            dict: Dictionary mapping cache keys to audio paths.
+        """
+        return {cache_key: entry["audio_path"] for cache_key, entry in self.index.items()}
+
+def log_softmax(logits):
+    """Normalize the logits to log probabilities over the vocabulary.
+
+    Args:
+        logits (numpy.ndarray): Logits of shape (frames, vocabulary size).
+
+    Returns:
+        numpy.ndarray: float32 log probabilities.
+    """
+    logits = np.asarray(logits, dtype=np.float32)
+    shifted = logits - logits.max(axis=-1, keepdims=True)
+    return shifted - np.log(np.exp(shifted).sum(axis=-1, keepdims=True))
+
+def ctc_greedy_decode(logits, vocabulary, blank_penalty=0.0, allowed_tokens=None):
+    """Decode the logits with greedy CTC decoding.
+
+    Args:
+        logits (numpy.ndarray): Logits of shape (frames, vocabulary size).
+        vocabulary (dict): Tokens, blank_id, word_delimiter and skip_ids of the model.
+        blank_penalty (float, optional): Value subtracted from the log probability of the blank token,
+            positive values emit more tokens. Defaults to 0.0.
+        allowed_tokens (set, optional): Tokens that can be emitted, other tokens are never predicted.
+            Defaults to None (all tokens).
+
+    Returns:
+        str: The transcription result.
+    """
+    log_probs = log_softmax(logits)
+    blank_id = vocabulary["blank_id"]
+    if blank_penalty:
+        log_probs[:, blank_id] -= blank_penalty
+    if allowed_tokens is not None:
+        for token_id, token in enumerate(vocabulary["tokens"]):
+            if token_id != blank_id and token not in allowed_tokens:
+                log_probs[:, token_id] = -np.inf
+    skip_ids = set(vocabulary.get("skip_ids", [])) | {blank_id}
+    tokens = []
+    previous_id = None
+    for token_id in log_probs.argmax(axis=-1).tolist():
+        # repeated tokens are merged unless separated by the blank token
+        if token_id != previous_id and token_id not in skip_ids:
+            tokens.append(vocabulary["tokens"][token_id])
+        previous_id = token_id
+    text = "".join(tokens)
+    word_delimiter = vocabulary.get("word_delimiter")
+    if word_delimiter and word_delimiter != " ":
+        text = text.replace(word_delimiter, " ")
+    return " ".join(text.split())
+
+def ctc_beam_search_decode(logits, vocabulary, beam_width=100, blank_penalty=0.0):
+    """Decode the logits with CTC beam search (requires the optional pyctcdecode package).
+
+    Args:
+        logits (numpy.ndarray): Logits of shape (frames, vocabulary size).
+        vocabulary (dict): Tokens, blank_id, word_delimiter and skip_ids of the model.
+        beam_width (int, optional): Number of beams. Defaults to 100.
+        blank_penalty (float, optional): Value subtracted from the log probability of the blank token. Defaults to 0.0.
+
+    Returns:
+        str: The transcription result.
+    """
+    from pyctcdecode import build_ctcdecoder
+    log_probs = log_softmax(logits)
+    if blank_penalty:
+        log_probs[:, vocabulary["blank_id"]] -= blank_penalty
+    # pyctcdecode expects "" for the blank token and " " for the word delimiter
+    skip_ids = set(vocabulary.get("skip_ids", []))
+    labels = []
+    for token_id, token in enumerate(vocabulary["tokens"]):
+        if token_id == vocabulary["blank_id"]:
+            labels.append("")
+        elif token == vocabulary.get("word_delimiter"):
+            labels.append(" ")
+        elif token_id in skip_ids:
+            # special tokens get unique labels which are removed from the output
+            labels.append("⁇{}".format(token_id))
+        else:
+            labels.append(token)
+    if tuple(labels) not in _beam_decoders:
+        _beam_decoders[tuple(labels)] = build_ctcdecoder(labels)
+    decoder = _beam_decoders[tuple(labels)]
+    text = decoder.decode(log_probs, beam_width=beam_width)
+    for token_id in skip_ids:
+        text = text.replace("⁇{}".format(token_id), "")
+    return " ".join(text.split())
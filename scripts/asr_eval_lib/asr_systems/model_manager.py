@@ -0,0 +1,115 @@
+"""
+Model Lifecycle Module.
+
+Local ASR models take several GB of memory. When ASR systems are initialized one after
+another, the previous system stays alive until the next one is initialized, so two models
+briefly coexist in memory. ModelManager owns the ASR system in use and explicitly unloads
+and garbage-collects it before the next one is loaded.
+
+The resident set size (RSS) of the process is checked against a configurable budget
+(HYP_GEN_SETTINGS MAX_RSS_GB) after loading models, including fallback models loaded
+lazily by the ASR systems (e.g. the CPU copy of a GPU model).
+"""
+
+import os
+import gc
+import sys
+import logging
+
+logger = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+
+def get_rss_bytes():
+    """Get the resident set size of the current process.
+
+    Returns:
+        int or None: RSS in bytes, None if it can not be read on this platform.
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+def release_memory():
+    """Run the garbage collector and release cached GPU memory of torch (if it is loaded)."""
+    gc.collect()
+    torch = sys.modules.get("torch")
+    if torch is not None and torch.cuda.is_available():
+        torch.cuda.empty_cache()
+
+class ModelManager:
+    """Owner of the ASR system in use, enforcing the memory budget of the process.
+
+    Attributes:
+        max_rss_bytes (int): Memory budget of the process in bytes, 0 for no limit.
+        asr_system (BaseASRSystem or None): The loaded ASR system.
+    """
+
+    def __init__(self, max_rss_gb=0):
+        """Initialize the manager.
+
+        Args:
+            max_rss_gb (float, optional): Memory budget of the process in GB. Defaults to 0 (no limit).
+        """
+        self.max_rss_bytes = int(max_rss_gb * GB)
+        self.asr_system = None
+
+    def check_budget(self, what):
+        """Check the RSS of the process against the budget.
+
+        Args:
+            what (str): Description of the loaded model, used in messages.
+
+        Raises:
+            MemoryError: If the RSS exceeds the budget.
+        """
+        rss_bytes = get_rss_bytes()
+        if rss_bytes is None:
+            return
+        logger.info("RSS after loading %s: %.2f GB", what, rss_bytes / GB)
+        if self.max_rss_bytes and rss_bytes > self.max_rss_bytes:
+            raise MemoryError("RSS of {:.2f} GB after loading {} exceeds the budget of {:.2f} GB (HYP_GEN_SETTINGS MAX_RSS_GB)".format(
+                rss_bytes / GB, what, self.max_rss_bytes / GB))
+
+    def load(self, system, model, config_user, inference_engine=None):
+        """Unload the ASR system in use and initialize the next one.
+
+        Args:
+            system (str): Identifier for the ASR system type.
+            model (str): The specific model of the ASR system.
+            config_user (configparser.ConfigParser): User-specific config.
+            inference_engine (dict, optional): Settings of the onnxruntime engine of CTC backends. Defaults to None (PyTorch).
+
+        Returns:
+            BaseASRSystem: The initialized ASR system.
+
+        Raises:
+            MemoryError: If the RSS exceeds the budget after loading the model.
+        """
+        from . import initialize_asr_system
+        self.unload()
+        asr_system = initialize_asr_system(system, model, config_user, inference_engine)
+        asr_system.model_manager = self
+        self.asr_system = asr_system
+        self.check_budget(asr_system.get_codename())
+        return asr_system
+
+    def unload(self):
+        """Release the models of the ASR system in use and garbage-collect them."""
+        if self.asr_system is None:
+            return
+        logger.info("Unloading ASR system: %s", self.asr_system.get_codename())
+        self.asr_system.unload()
+        self.asr_system.model_manager = None
+        self.asr_system = None
+        release_memory()
+        rss_bytes = get_rss_bytes()
+        if rss_bytes is not None:
+            logger.info("RSS after unloading: %.2f GB", rss_bytes / GB)
@@ -1,9 +1,11 @@
 from .base_asr_system import BaseASRSystem
+from .logits_cache import ctc_greedy_decode
 import nemo.collections.asr as nemo_asr
 
 import torch
+import logging
 
-torch.cuda.empty_cache()
+logger = logging.getLogger(__name__)
 
 
 class NvidiaNemoASR(BaseASRSystem):
@@ -14,6 +16,8 @@ class NvidiaNemoASR(BaseASRSystem):
     Attributes:
         nemo_asr_model: The loaded NeMo ASR model (can be EncDecHybridRNNTCTCBPEModel or EncDecCTCModel).
     """
+
+    MODEL_ATTRIBUTES = ("nemo_asr_model",)
     
     def __init__(self, system, model, language_code="pl-PL", sampling_rate=16000):
         """Initialize the NVIDIA NeMo ASR system.
@@ -28,13 +32,36 @@ class NvidiaNemoASR(BaseASRSystem):
             ValueError: If an unsupported model type is specified.
         """
         super().__init__(system, model, language_code)
+        # release cached GPU memory before loading the model (not at import time)
+        torch.cuda.empty_cache()
         # check if model name contains "fastconformer" in its name to determine model loading method
         if "fastconformer" in model:
             self.nemo_asr_model = nemo_asr.models.EncDecHybridRNNTCTCBPEModel.from_pretrained(model_name=model)
         elif "quartznet" in model:
             self.nemo_asr_model = nemo_asr.models.EncDecCTCModel.from_pretrained(model_name=model)
+            # character vocabulary with the blank token after the last character
+            vocabulary = list(self.nemo_asr_model.decoder.vocabulary)
+            self.init_logits_cache({"tokens": vocabulary + ["<blank>"], "blank_id": len(vocabulary), "word_delimiter": " ", "skip_ids": []})
         else:
             raise ValueError(f"Unknown model type: {model}")
+
+    def transcribe_with_logits(self, speech_files):
+        """Transcribe the audio files with the CTC model, storing the log probabilities in the logits cache.
+        
+        Args:
+            speech_files (list): Paths to the audio files to transcribe.
+            
+        Returns:
+            list: The transcription results in the order of speech_files.
+        """
+        hyps = []
+        all_logprobs = self.nemo_asr_model.transcribe(paths2audio_files=list(speech_files), batch_size=len(speech_files), logprobs=True)
+        for speech_file, logprobs in zip(speech_files, all_logprobs):
+            if hasattr(logprobs, "detach"):
+                logprobs = logprobs.detach().float().cpu().numpy()
+            self.store_logits(speech_file, logprobs)
+            hyps.append(ctc_greedy_decode(logprobs, self.logits_cache.vocabulary))
+        return hyps
         
     def generate_asr_hyp(self, speech_file):
         """Generate transcription for an audio file using NVIDIA NeMo.
@@ -46,14 +73,40 @@ class NvidiaNemoASR(BaseASRSystem):
             str: The transcription result.
         """
         try:
-            asr_output = self.nemo_asr_model.transcribe(paths2audio_files=[speech_file])
-            if "fastconformer" in self.model:
-                hyp = asr_output[0][0]
-            elif "quartznet" in self.model:
-                hyp = asr_output[0]
-            print("Hyp:", hyp)
+            if self.logits_cache is not None:
+                hyp = self.transcribe_with_logits([speech_file])[0]
+            else:
+                asr_output = self.nemo_asr_model.transcribe(paths2audio_files=[speech_file])
+                if "fastconformer" in self.model:
+                    hyp = asr_output[0][0]
+                elif "quartznet" in self.model:
+                    hyp = asr_output[0]
+            self.hyp_gen_stats.debug(speech_file, "hypothesis: %s", hyp)
         except Exception as e:
-            print(f"Other error: {e}")
+            logger.error("Other error: %s", e)
+        
+        return hyp
+
+    def generate_asr_hyps_batch(self, speech_files):
+        """Generate transcriptions for a batch of audio files with a single NeMo transcribe call.
         
-        self.update_cache(speech_file, hyp)
-        return hyp
\ No newline at end of file
+        Args:
+            speech_files (list): Paths to the audio files to transcribe.
+            
+        Returns:
+            list: The transcription results in the order of speech_files.
+        """
+        try:
+            if self.logits_cache is not None:
+                hyps = self.transcribe_with_logits(speech_files)
+            else:
+                asr_output = self.nemo_asr_model.transcribe(paths2audio_files=list(speech_files), batch_size=len(speech_files))
+                # hybrid RNNT-CTC models return a tuple of (best hypotheses, all hypotheses)
+                hyps = asr_output[0] if "fastconformer" in self.model else asr_output
+        except Exception as e:
+            logger.warning("Error generating batch outputs: %s. Generating hypotheses one by one.", e)
+            return [self.generate_asr_hyp(speech_file) for speech_file in speech_files]
+
+        for speech_file, hyp in zip(speech_files, hyps):
+            self.hyp_gen_stats.debug(speech_file, "hypothesis: %s", hyp)
+        return list(hyps)
@@ -1,9 +1,11 @@
 from .base_asr_system import BaseASRSystem
 import torch
-torch.cuda.empty_cache()
 import librosa
 import soundfile
 from espnet2.bin.s2t_inference import Speech2Text
+import logging
+
+logger = logging.getLogger(__name__)
 
 class OWSMLocalASR(BaseASRSystem):
     """Open Whisper-style Speech Models (OWSM) ASR system implementation.
@@ -12,8 +14,9 @@ class OWSMLocalASR(BaseASRSystem):
     
     Attributes:
         s2t (Speech2Text): Primary OWSM model instance.
-        s2t_cpu (Speech2Text): Fallback CPU OWSM model instance.
     """
+
+    MODEL_ATTRIBUTES = ("s2t",)
     
     def __init__(self, system, model, language_code="pl-PL", sampling_rate=16000):
         """Initialize the OWSM ASR system.
@@ -28,6 +31,8 @@ class OWSMLocalASR(BaseASRSystem):
             Warning: If GPU is not available for better inference speed.
         """
         super().__init__(system, model, language_code)
+        # release cached GPU memory before loading the model (not at import time)
+        torch.cuda.empty_cache()
     
         device = "cuda" if torch.cuda.is_available() else "cpu"
         # temporary solution to avoid crashing the GPU on local machine
@@ -38,7 +43,7 @@ class OWSMLocalASR(BaseASRSystem):
 
         #change to CPU for large models which crushes the GPU
         self.language_code = self.map_language_code(language_code)
-        print("Language code: ", self.language_code)
+        logger.debug("Language code: %s", self.language_code)
 
         #default decoder for default device
         s2t = Speech2Text.from_pretrained(
@@ -49,13 +54,17 @@ class OWSMLocalASR(BaseASRSystem):
         
         self.s2t = s2t
 
-        # fallback CPU
-        s2t_cpu = Speech2Text.from_pretrained(
-            model,
+    def get_cpu_model(self):
+        """Get the fallback CPU OWSM model instance, loading it on the first failure of the default device.
+        
+        Returns:
+            Speech2Text: Fallback CPU OWSM model instance.
+        """
+        return self.get_fallback_model("cpu", lambda: Speech2Text.from_pretrained(
+            self.model,
             device="cpu",
             lang_sym=self.language_code
-        )
-        self.s2t_cpu = s2t_cpu
+        ))
 
     def map_language_code(self, language_code):
         """Map standard language codes to OWSM-specific language codes.
@@ -89,58 +98,55 @@ class OWSMLocalASR(BaseASRSystem):
         # check audio duration
         duration = librosa.get_duration(filename=speech_file)
         if duration < 30:
-            print("Audio duration is less than 30s. Normal decoding")
+            self.hyp_gen_stats.debug(speech_file, "audio duration is less than 30s, normal decoding")
             
             try:
-                print ("Generate ASR hyp function for ASR system: {} .\n Generating hypothesis for: {}".format(self.codename, speech_file))
-
                 speech, rate = soundfile.read(speech_file)
                 result = self.s2t(speech)
                 text = result[0][-2]
-                print("text:", text)
+                self.hyp_gen_stats.debug(speech_file, "text: %s", text)
                 
                 # remove token with language code from the hypothesis
                 hyp = text[4:]
 
-                print("Hyp:", hyp)
+                self.hyp_gen_stats.debug(speech_file, "hypothesis: %s", hyp)
             except Exception as e:
-                print("Default device generation fail. Using CPU")
+                logger.warning("Default device generation fail: %s. Using CPU", e)
                 try:
                     speech, rate = soundfile.read(speech_file)
-                    result = self.s2t_cpu(speech)
+                    result = self.get_cpu_model()(speech)
                     text = result[0][-2]
-                    print("text:", text)
+                    self.hyp_gen_stats.debug(speech_file, "text: %s", text)
                     hyp = text[4:]
-                    print("Hyp:", hyp)
+                    self.hyp_gen_stats.debug(speech_file, "hypothesis: %s", hyp)
 
                 except Exception as e:
-                    print(f"Other error: {e}")
+                    logger.error("Other error: %s", e)
                     exit()
         else:
-            print("Audio duration is more than 30s. Using decode_long function.")
+            self.hyp_gen_stats.debug(speech_file, "audio duration is more than 30s, using decode_long")
             try:
                 speech, rate = soundfile.read(speech_file)
                 result = self.s2t.decode_long(speech)
                 # given the list of tuples (start_time, end_time, text) in result, extract all text_fields and join them as single string
                 text = " ".join([x[2] for x in result])
 
-                print("text:", text)
+                self.hyp_gen_stats.debug(speech_file, "text: %s", text)
                 hyp = text[4:]
-                print("Hyp:", hyp)
+                self.hyp_gen_stats.debug(speech_file, "hypothesis: %s", hyp)
 
             except Exception as e:
-                print("Default device generation fail for long audio. Using CPU")
+                logger.warning("Default device generation fail for long audio: %s. Using CPU", e)
                 try:
                     speech, rate = soundfile.read(speech_file)
-                    result = self.s2t_cpu.decode_long(speech)
+                    result = self.get_cpu_model().decode_long(speech)
                     text = " ".join([x[2] for x in result])
-                    print("text:", text)
+                    self.hyp_gen_stats.debug(speech_file, "text: %s", text)
                     hyp = text[4:]
-                    print("Hyp:", hyp)
+                    self.hyp_gen_stats.debug(speech_file, "hypothesis: %s", hyp)
 
                 except Exception as e:
-                    print(f"Other error: {e}")
+                    logger.error("Other error: %s", e)
                     exit()
                 
-        self.update_cache(speech_file, hyp)
         return hyp
@@ -0,0 +1,268 @@
+"""
+Cloud ASR Request Engine Module.
+
+This module dispatches requests to cloud ASR providers (google, google_v2, azure, whisper_cloud,
+assembly_ai) from a thread pool, so that hypothesis generation is not bound by the network
+round-trip time of a single request. Each provider has its own concurrency limit, token-bucket
+rate limit and exponential backoff for rate limit (HTTP 429) errors.
+
+ASR systems with asyncio clients can instead keep hundreds of requests in flight from a single
+thread (acall/amap), limited by <SYSTEM>_ASYNC_MAX_IN_FLIGHT.
+
+Settings are read from the [CLOUD_ASR_SETTINGS] section of the user-specific config, e.g.:
+    GOOGLE_MAX_CONCURRENCY = 8
+    GOOGLE_REQUESTS_PER_SEC = 5
+    GOOGLE_MAX_RETRIES = 5
+    GOOGLE_ASYNC_MAX_IN_FLIGHT = 200
+"""
+
+import re
+import time
+import random
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+CLOUD_ASR_SYSTEMS = ["google", "google_v2", "azure", "whisper_cloud", "assembly_ai"]
+RATE_LIMIT_ERROR_NAMES = ["ResourceExhausted", "TooManyRequests", "RateLimitError", "RateLimitExceededError"]
+
+class RateLimitExceededError(Exception):
+    """Raised by ASR systems whose SDK reports rate limit errors without raising an exception."""
+
+def is_rate_limit_error(e):
+    """Check if the exception was caused by exceeding the rate limit of the provider.
+
+    Args:
+        e (Exception): Exception raised by the provider SDK.
+
+    Returns:
+        bool: True for HTTP 429 and rate limit errors.
+    """
+    if type(e).__name__ in RATE_LIMIT_ERROR_NAMES:
+        return True
+    for attribute in ["status_code", "code", "status"]:
+        if getattr(e, attribute, None) == 429:
+            return True
+    message = str(e).lower()
+    return re.search(r"\b429\b", message) is not None or "too many requests" in message or "rate limit" in message
+
+def get_retry_after_sec(e):
+    """Get the delay requested by the provider in the Retry-After header of the response.
+
+    Args:
+        e (Exception): Exception raised by the provider SDK.
+
+    Returns:
+        float or None: Number of seconds to wait, None if not provided.
+    """
+    headers = getattr(getattr(e, "response", None), "headers", None) or {}
+    try:
+        return float(headers.get("retry-after") or headers.get("Retry-After"))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the number of requests per second.
+
+    Attributes:
+        rate (float): Number of tokens added per second.
+        capacity (float): Maximum number of tokens (size of bursts).
+    """
+
+    def __init__(self, rate, capacity=None):
+        """Initialize a full bucket.
+
+        Args:
+            rate (float): Number of tokens added per second.
+            capacity (float, optional): Maximum number of tokens. Defaults to max(1, rate).
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.last_refill_time = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, waiting until one is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill_time) * self.rate)
+                self.last_refill_time = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_sec = (1 - self.tokens) / self.rate
+            time.sleep(wait_sec)
+
+    async def aacquire(self):
+        """Take a token, waiting in the event loop until one is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.last_refill_time) * self.rate)
+                self.last_refill_time = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_sec = (1 - self.tokens) / self.rate
+            await asyncio.sleep(wait_sec)
+
+class RequestEngine:
+    """Concurrent dispatcher of requests to a single cloud ASR provider.
+
+    Attributes:
+        max_concurrency (int): Maximum number of requests in flight.
+        rate_limiter (TokenBucket or None): Limit of requests per second, None if unlimited.
+        max_retries (int): Number of retries of requests failing with rate limit errors.
+        backoff_base_sec (float): Delay before the first retry, doubled for every next retry.
+        backoff_max_sec (float): Maximum delay between retries.
+        async_max_in_flight (int): Maximum number of asyncio requests in flight, 0 if the asyncio path is disabled.
+    """
+
+    def __init__(self, max_concurrency=1, requests_per_sec=None, max_retries=5, backoff_base_sec=1.0, backoff_max_sec=60.0, async_max_in_flight=0):
+        """Initialize the engine.
+
+        Args:
+            max_concurrency (int, optional): Maximum number of requests in flight. Defaults to 1.
+            requests_per_sec (float, optional): Limit of requests per second. Defaults to None (unlimited).
+            max_retries (int, optional): Number of retries of rate limited requests. Defaults to 5.
+            backoff_base_sec (float, optional): Delay before the first retry. Defaults to 1.0.
+            backoff_max_sec (float, optional): Maximum delay between retries. Defaults to 60.0.
+            async_max_in_flight (int, optional): Maximum number of asyncio requests in flight.
+                Defaults to 0 (asyncio path disabled).
+        """
+        self.max_concurrency = max(1, max_concurrency)
+        self.rate_limiter = TokenBucket(requests_per_sec) if requests_per_sec else None
+        self.max_retries = max_retries
+        self.backoff_base_sec = backoff_base_sec
+        self.backoff_max_sec = backoff_max_sec
+        self.async_max_in_flight = max(0, async_max_in_flight)
+
+    def call(self, fn, *args):
+        """Call the function, respecting the rate limit and retrying rate limited calls with backoff.
+
+        Args:
+            fn (callable): Function sending the request, e.g. generate_asr_hyp.
+            *args: Arguments of the function.
+
+        Returns:
+            The result of the function.
+
+        Raises:
+            Exception: Errors other than rate limit errors, and rate limit errors after max_retries retries.
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            try:
+                return fn(*args)
+            except Exception as e:
+                if attempt == self.max_retries or not is_rate_limit_error(e):
+                    raise
+                delay_sec = self.get_retry_delay_sec(e, attempt)
+                time.sleep(delay_sec)
+
+    def get_retry_delay_sec(self, e, attempt):
+        """Get the delay before retrying a rate limited request.
+
+        Args:
+            e (Exception): Rate limit error raised by the provider SDK.
+            attempt (int): Number of the failed attempt, starting from 0.
+
+        Returns:
+            float: Delay in seconds.
+        """
+        delay_sec = get_retry_after_sec(e)
+        if delay_sec is None:
+            # full jitter spreads the retries of concurrent requests
+            delay_sec = random.uniform(0.5, 1.0) * min(self.backoff_max_sec, self.backoff_base_sec * 2 ** attempt)
+        logger.warning("Rate limit exceeded: %s. Retrying in %.1f s (%d/%d)", e, delay_sec, attempt + 1, self.max_retries)
+        return delay_sec
+
+    async def acall(self, fn, *args):
+        """Await the coroutine function, respecting the rate limit and retrying rate limited calls with backoff.
+
+        Args:
+            fn (callable): Coroutine function sending the request, e.g. agenerate_asr_hyp.
+            *args: Arguments of the function.
+
+        Returns:
+            The result of the function.
+
+        Raises:
+            Exception: Errors other than rate limit errors, and rate limit errors after max_retries retries.
+        """
+        for attempt in range(self.max_retries + 1):
+            if self.rate_limiter is not None:
+                await self.rate_limiter.aacquire()
+            try:
+                return await fn(*args)
+            except Exception as e:
+                if attempt == self.max_retries or not is_rate_limit_error(e):
+                    raise
+                await asyncio.sleep(self.get_retry_delay_sec(e, attempt))
+
+    def map(self, fn, items):
+        """Call the function for every item, with up to max_concurrency calls in flight.
+
+        Args:
+            fn (callable): Function sending the request, e.g. generate_asr_hyp.
+            items (list): Arguments of the function calls.
+
+        Returns:
+            list: Results in the order of items. None for calls that failed.
+        """
+        def call_safely(item):
+            try:
+                return self.call(fn, item)
+            except Exception as e:
+                logger.warning("Request for %s failed: %s", item, e)
+                return None
+
+        if self.max_concurrency == 1 or len(items) <= 1:
+            return [call_safely(item) for item in items]
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            return list(executor.map(call_safely, items))
+
+    async def amap(self, fn, items):
+        """Await the coroutine function for every item, with up to async_max_in_flight calls in flight.
+
+        Args:
+            fn (callable): Coroutine function, e.g. aprocess_audio. Rate limiting is up to the function.
+            items (list): Arguments of the function calls.
+
+        Returns:
+            list: Results in the order of items. None for calls that failed.
+        """
+        semaphore = asyncio.Semaphore(max(1, self.async_max_in_flight))
+
+        async def call_safely(item):
+            async with semaphore:
+                try:
+                    return await fn(item)
+                except Exception as e:
+                    logger.warning("Request for %s failed: %s", item, e)
+                    return None
+
+        return await asyncio.gather(*[call_safely(item) for item in items])
+
+def create_request_engine(config, system):
+    """Create the request engine of the cloud ASR provider from the user-specific config.
+
+    Args:
+        config (configparser.ConfigParser): User-specific config.
+        system (str): Identifier for the ASR system type (e.g., 'google', 'azure').
+
+    Returns:
+        RequestEngine: Engine with the provider settings from [CLOUD_ASR_SETTINGS].
+    """
+    prefix = system.upper()
+    return RequestEngine(
+        max_concurrency=config.getint("CLOUD_ASR_SETTINGS", prefix + "_MAX_CONCURRENCY", fallback=1),
+        requests_per_sec=config.getfloat("CLOUD_ASR_SETTINGS", prefix + "_REQUESTS_PER_SEC", fallback=0) or None,
+        max_retries=config.getint("CLOUD_ASR_SETTINGS", prefix + "_MAX_RETRIES", fallback=5),
+        async_max_in_flight=config.getint("CLOUD_ASR_SETTINGS", prefix + "_ASYNC_MAX_IN_FLIGHT", fallback=0))
@@ -1,6 +1,9 @@
 from .base_asr_system import BaseASRSystem
+import logging
 # Modify the import statements 
 
+logger = logging.getLogger(__name__)
+
 # Modify the class name
 class YourSystemName(BaseASRSystem):
     """
@@ -50,10 +53,9 @@ class YourSystemName(BaseASRSystem):
         try:
             # modify the way you generate the hypothesis
             hyp="This is a template hypothesis."
-            print("Hyp:", hyp)
+            self.hyp_gen_stats.debug(speech_file, "hypothesis: %s", hyp)
         except Exception as e:
-            print(f"Other error: {e}")
+            logger.error("Other error: %s", e)
             exit()
         
-        self.update_cache(speech_file, hyp)
         return hyp
\ No newline at end of file
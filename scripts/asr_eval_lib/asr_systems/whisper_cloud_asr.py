@@ -1,6 +1,10 @@
 from .base_asr_system import BaseASRSystem
+from .request_engine import is_rate_limit_error
 import openai
 from pathlib import Path
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class WhisperCloudASR(BaseASRSystem):
@@ -37,17 +41,55 @@ class WhisperCloudASR(BaseASRSystem):
             transcription = openai.audio.transcriptions.create(
                 model=self.model,
                 file=Path(speech_file))
-            print(transcription)       
+            self.hyp_gen_stats.debug(speech_file, "transcription: %s", transcription)
             hyp = transcription.text
             #time.sleep(1)
         except IndexError:
-            print("Index error")
+            logger.warning("Index error for %s", speech_file)
         except openai.BadRequestError as e:
             if "Audio file is too short" in str(e):
-                print(f"Error: {e}")
+                logger.warning("Whisper error for %s: %s", speech_file, e)
         except Exception as e:
-            print(f"Other error: {e}")
+            # rate limit errors are retried by the request engine
+            if is_rate_limit_error(e):
+                raise
+            logger.warning("Whisper error for %s: %s", speech_file, e)
         
-        self.update_cache(speech_file, hyp)
         return hyp
 
+    async def agenerate_asr_hyp(self, speech_file):
+        """Generate transcription for an audio file using the asyncio client of OpenAI Whisper API.
+        
+        Args:
+            speech_file (str): Path to the audio file to transcribe.
+            
+        Returns:
+            str: The transcription result.
+        """
+        hyp = None
+        try:
+            client = self.get_async_client(self.create_async_client)
+            transcription = await client.audio.transcriptions.create(
+                model=self.model,
+                file=Path(speech_file))
+            self.hyp_gen_stats.debug(speech_file, "transcription: %s", transcription)
+            hyp = transcription.text
+        except openai.BadRequestError as e:
+            if "Audio file is too short" in str(e):
+                logger.warning("Whisper error for %s: %s", speech_file, e)
+        except Exception as e:
+            # rate limit errors are retried by the request engine
+            if is_rate_limit_error(e):
+                raise
+            logger.warning("Whisper error for %s: %s", speech_file, e)
+
+        return hyp
+
+    def create_async_client(self):
+        """Create the asyncio client of OpenAI API.
+        
+        Returns:
+            openai.AsyncOpenAI: The client authenticated with the API key of the system.
+        """
+        return openai.AsyncOpenAI(api_key=openai.api_key)
+
@@ -1,12 +1,17 @@
 from .base_asr_system import BaseASRSystem
 import whisper
 import torch
+import logging
 
-torch.cuda.empty_cache()
+logger = logging.getLogger(__name__)
 
 class WhisperLocalASR(BaseASRSystem):
+    MODEL_ATTRIBUTES = ("whisper_local_model_default",)
+
     def __init__(self, system, model, language_code:str = "pl-PL",sampling_rate:int = 16000) -> None:
         super().__init__(system, model, language_code)
+        # release cached GPU memory before loading the model (not at import time)
+        torch.cuda.empty_cache()
         self.whisper_local_language = self.language_code.split("-")[0]
         
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -19,30 +24,32 @@ class WhisperLocalASR(BaseASRSystem):
         try:
             self.whisper_local_model_default = whisper.load_model(model, device=self.device)  # You can choose different model sizes
         except Exception as e:
-            print(f"Default device model loading fail: {e}")
-            print("Using CPU model")
+            logger.warning("Default device model loading fail: %s. Using CPU model", e)
             self.device = "cpu" 
             self.whisper_local_model_default = whisper.load_model(model, device="cpu")  # You can choose different model sizes
-        if (self.device == "cuda"):
-            self.whisper_local_model_cpu = whisper.load_model(model, device="cpu")  # backup CPU model
+        # backup CPU model is loaded on first use (see get_cpu_model)
+
+    def get_cpu_model(self):
+        """Get the backup CPU model, loading it on the first GPU failure."""
+        if self.device == "cpu":
+            return self.whisper_local_model_default
+        return self.get_fallback_model("cpu", lambda: whisper.load_model(self.model, device="cpu"))
         
     def generate_asr_hyp(self, speech_file):
         try:
-            print("Using default device for decoding: ", self.device)
+            self.hyp_gen_stats.debug(speech_file, "decoding on %s", self.device)
 
             result = self.whisper_local_model_default.transcribe(speech_file, language=self.whisper_local_language)
             hyp=result["text"]
-            print("Hyp:", hyp)
+            self.hyp_gen_stats.debug(speech_file, "hypothesis: %s", hyp)
         except Exception as e:
-                print("Default device generation fail. Using CPU")
+                logger.warning("Default device generation fail: %s. Using CPU", e)
                 try:
-                    result = self.whisper_local_model_cpu.transcribe(speech_file, language=self.whisper_local_language)
+                    result = self.get_cpu_model().transcribe(speech_file, language=self.whisper_local_language)
                     hyp=result["text"]
-                    print("Hyp:", hyp)
+                    self.hyp_gen_stats.debug(speech_file, "hypothesis: %s", hyp)
                 except Exception as e:
-                    print(f"Other error: {e}")
+                    logger.error("Other error: %s", e)
                     exit()
 
-        
-        self.update_cache(speech_file, hyp)
         return hyp
\ No newline at end of file
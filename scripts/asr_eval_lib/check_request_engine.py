@@ -0,0 +1,205 @@
+"""
+BIGOS ASR Evaluation Framework - Request Engine Check
+
+This script checks the request engine of cloud ASR systems against a local fake backend,
+without credentials or network access. The fake backend sleeps for a fixed latency per
+request and rejects a configured number of requests with rate limit (HTTP 429) errors.
+
+It checks that:
+- concurrent requests (map) and asyncio requests (amap) stay within the concurrency limits
+  and are faster than sequential requests,
+- the token bucket limits the number of requests per second,
+- rate limited requests are retried with backoff (or after the Retry-After delay) and fail
+  after max_retries retries, with None returned by map.
+
+Usage:
+    python check_request_engine.py [--latency_sec=<float>] [--nr_of_requests=<int>]
+
+Example:
+    python check_request_engine.py --latency_sec=0.1
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.realpath(__file__)))
+
+from asr_systems.request_engine import RequestEngine
+
+class FakeRateLimitError(Exception):
+    """Rate limit error of the fake backend, with the HTTP status code and headers of the response."""
+
+    def __init__(self, retry_after_sec=None):
+        """Initialize the error.
+
+        Args:
+            retry_after_sec (float, optional): Retry-After delay of the response. Defaults to None (no header).
+        """
+        super().__init__("429 Too Many Requests")
+        self.status_code = 429
+        self.response = type("Response", (), {"headers": {"retry-after": str(retry_after_sec)} if retry_after_sec else {}})()
+
+class FakeCloudBackend:
+    """Fake cloud ASR backend sleeping for a fixed latency per request.
+
+    Attributes:
+        latency_sec (float): Duration of a request.
+        nr_of_rate_limited_calls (int): Number of the first calls rejected with a rate limit error.
+        retry_after_sec (float or None): Retry-After delay of the rate limit errors.
+        nr_of_calls (int): Number of calls, including rejected ones.
+        max_in_flight (int): Maximum number of calls in flight at the same time.
+        call_times (list): Start times of the accepted calls.
+    """
+
+    def __init__(self, latency_sec, nr_of_rate_limited_calls=0, retry_after_sec=None):
+        """Initialize the backend.
+
+        Args:
+            latency_sec (float): Duration of a request.
+            nr_of_rate_limited_calls (int, optional): Number of the first calls rejected with a rate limit error. Defaults to 0.
+            retry_after_sec (float, optional): Retry-After delay of the rate limit errors. Defaults to None.
+        """
+        self.latency_sec = latency_sec
+        self.nr_of_rate_limited_calls = nr_of_rate_limited_calls
+        self.retry_after_sec = retry_after_sec
+        self.nr_of_calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.call_times = []
+        self.lock = threading.Lock()
+
+    def start_call(self):
+        """Count the call and reject it with a rate limit error if it is one of the first nr_of_rate_limited_calls calls."""
+        with self.lock:
+            self.nr_of_calls += 1
+            if self.nr_of_calls <= self.nr_of_rate_limited_calls:
+                raise FakeRateLimitError(self.retry_after_sec)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.call_times.append(time.monotonic())
+
+    def end_call(self):
+        """Count the end of an accepted call."""
+        with self.lock:
+            self.in_flight -= 1
+
+    def generate_asr_hyp(self, speech_file):
+        """Sleep for the latency and return a hypothesis (same signature as generate_asr_hyp of ASR systems)."""
+        self.start_call()
+        time.sleep(self.latency_sec)
+        self.end_call()
+        return "hypothesis of " + speech_file
+
+    async def agenerate_asr_hyp(self, speech_file):
+        """Asyncio version of generate_asr_hyp."""
+        self.start_call()
+        await asyncio.sleep(self.latency_sec)
+        self.end_call()
+        return "hypothesis of " + speech_file
+
+def check_map(latency_sec, nr_of_requests, max_concurrency=8):
+    """Check that map sends up to max_concurrency requests at the same time."""
+    errors = []
+    backend = FakeCloudBackend(latency_sec)
+    speech_files = ["{}.wav".format(i) for i in range(nr_of_requests)]
+    start_time = time.monotonic()
+    hyps = RequestEngine(max_concurrency=max_concurrency).map(backend.generate_asr_hyp, speech_files)
+    wall_sec = time.monotonic() - start_time
+    print("map: {} requests of {:.2f} s in {:.2f} s, {} in flight (limit {})".format(
+        nr_of_requests, latency_sec, wall_sec, backend.max_in_flight, max_concurrency))
+    if hyps != ["hypothesis of " + speech_file for speech_file in speech_files]:
+        errors.append("map returned the hypotheses in a wrong order or with failures")
+    if backend.max_in_flight > max_concurrency:
+        errors.append("map exceeded the concurrency limit: {} > {}".format(backend.max_in_flight, max_concurrency))
+    if wall_sec > nr_of_requests * latency_sec / 2:
+        errors.append("map is not faster than sequential requests: {:.2f} s".format(wall_sec))
+    return errors
+
+def check_amap(latency_sec, nr_of_requests, async_max_in_flight=50):
+    """Check that amap keeps up to async_max_in_flight asyncio requests in flight."""
+    errors = []
+    backend = FakeCloudBackend(latency_sec)
+    engine = RequestEngine(async_max_in_flight=async_max_in_flight)
+    speech_files = ["{}.wav".format(i) for i in range(nr_of_requests)]
+    start_time = time.monotonic()
+    hyps = asyncio.run(engine.amap(lambda speech_file: engine.acall(backend.agenerate_asr_hyp, speech_file), speech_files))
+    wall_sec = time.monotonic() - start_time
+    print("amap: {} requests of {:.2f} s in {:.2f} s, {} in flight (limit {})".format(
+        nr_of_requests, latency_sec, wall_sec, backend.max_in_flight, async_max_in_flight))
+    if hyps != ["hypothesis of " + speech_file for speech_file in speech_files]:
+        errors.append("amap returned the hypotheses in a wrong order or with failures")
+    if backend.max_in_flight > async_max_in_flight:
+        errors.append("amap exceeded the in-flight limit: {} > {}".format(backend.max_in_flight, async_max_in_flight))
+    if wall_sec > nr_of_requests * latency_sec / 2:
+        errors.append("amap is not faster than sequential requests: {:.2f} s".format(wall_sec))
+    return errors
+
+def check_rate_limit(nr_of_requests, requests_per_sec=20.0, max_concurrency=8):
+    """Check that the token bucket limits the number of requests per second after the initial burst."""
+    errors = []
+    backend = FakeCloudBackend(0.0)
+    engine = RequestEngine(max_concurrency=max_concurrency, requests_per_sec=requests_per_sec)
+    engine.map(backend.generate_asr_hyp, ["{}.wav".format(i) for i in range(nr_of_requests)])
+    # the bucket starts full, so the first capacity requests are sent at once
+    burst = int(engine.rate_limiter.capacity)
+    call_times = sorted(backend.call_times)
+    if len(call_times) <= burst + 1:
+        return ["too few requests to measure the rate limit, use more than {}".format(burst + 1)]
+    measured_rate = (len(call_times) - burst - 1) / (call_times[-1] - call_times[burst])
+    print("rate limit: {:.1f} requests per second after a burst of {} (limit {:.1f})".format(measured_rate, burst, requests_per_sec))
+    if measured_rate > requests_per_sec * 1.1:
+        errors.append("token bucket exceeded the rate limit: {:.1f} > {:.1f} requests per second".format(measured_rate, requests_per_sec))
+    return errors
+
+def check_retries(latency_sec, nr_of_rate_limited_calls=3, max_retries=5, backoff_base_sec=0.02):
+    """Check that rate limited requests are retried and fail after max_retries retries."""
+    errors = []
+    backend = FakeCloudBackend(latency_sec, nr_of_rate_limited_calls)
+    engine = RequestEngine(max_retries=max_retries, backoff_base_sec=backoff_base_sec)
+    hyp = engine.call(backend.generate_asr_hyp, "0.wav")
+    print("retries: request accepted after {} rate limited calls ({} calls)".format(nr_of_rate_limited_calls, backend.nr_of_calls))
+    if hyp != "hypothesis of 0.wav" or backend.nr_of_calls != nr_of_rate_limited_calls + 1:
+        errors.append("rate limited request not retried: {} calls, expected {}".format(backend.nr_of_calls, nr_of_rate_limited_calls + 1))
+
+    # rejected more times than retried
+    backend = FakeCloudBackend(latency_sec, max_retries + 10)
+    hyps = engine.map(backend.generate_asr_hyp, ["0.wav"])
+    print("retries: request failed after {} calls (max_retries {})".format(backend.nr_of_calls, max_retries))
+    if hyps != [None] or backend.nr_of_calls != max_retries + 1:
+        errors.append("exhausted request: {} calls and {}, expected {} calls and [None]".format(backend.nr_of_calls, hyps, max_retries + 1))
+
+    # Retry-After delay of the provider instead of the exponential backoff
+    retry_after_sec = 0.3
+    backend = FakeCloudBackend(latency_sec, 1, retry_after_sec)
+    start_time = time.monotonic()
+    engine.call(backend.generate_asr_hyp, "0.wav")
+    wall_sec = time.monotonic() - start_time
+    print("retries: Retry-After of {:.2f} s, request accepted after {:.2f} s".format(retry_after_sec, wall_sec))
+    if wall_sec < retry_after_sec:
+        errors.append("Retry-After delay not respected: {:.2f} s < {:.2f} s".format(wall_sec, retry_after_sec))
+    return errors
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='BIGOS check of the request engine of cloud ASR systems with a fake backend')
+    parser.add_argument('--latency_sec', type=float,
+                        help='Duration of a request of the fake backend in seconds',
+                        default=0.05)
+    parser.add_argument('--nr_of_requests', type=int,
+                        help='Number of requests sent by every check',
+                        default=200)
+    args = parser.parse_args()
+
+    errors = []
+    errors += check_map(args.latency_sec, args.nr_of_requests)
+    errors += check_amap(args.latency_sec, args.nr_of_requests)
+    errors += check_rate_limit(min(args.nr_of_requests, 60))
+    errors += check_retries(args.latency_sec)
+    if errors:
+        for error in errors:
+            print("FAILED: {}".format(error))
+        sys.exit(1)
+    print("OK")
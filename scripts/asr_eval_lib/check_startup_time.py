@@ -0,0 +1,135 @@
+"""
+BIGOS ASR Evaluation Framework - Startup Time Check
+
+This script checks that importing the ASR systems package stays fast: backends are imported
+on demand by asr_system_factory and no work (reading the config, loading models, CUDA calls)
+is done at import time. It fails if the import is slower than the limit, if it loads heavy
+dependencies of the backends or if it reads the user-specific config.
+
+The import is timed in fresh interpreters, so modules cached by the current process do not
+affect the result. The entry points (main.py and the maintenance scripts) are also started with
+--help from outside the repository, which fails if a module of the repository can not be
+imported (e.g. scripts.* imported before the repository root is added to sys.path). Missing
+third-party dependencies of the entry points are reported without failing the check.
+
+Usage:
+    python check_startup_time.py [--max_sec=<float>] [--runs=<int>]
+
+Example:
+    python check_startup_time.py --max_sec=0.5
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+# modules which must not be loaded by importing the asr_systems package
+HEAVY_MODULES = ["torch", "transformers", "nemo", "whisper", "espnet2", "librosa", "numpy",
+                 "onnxruntime", "google.cloud", "azure", "openai", "assemblyai", "pyctcdecode"]
+
+# scripts started with --help, relative to the asr_eval_lib directory
+ENTRY_POINTS = ["main.py", "redecode_logits.py", "hyp_cache_gc.py", "hyp_cache_server.py"]
+
+# top-level modules of the repository, an import error of these is a failure of the entry point
+REPO_MODULES = ["scripts", "prefect_flows", "asr_systems", "eval_utils", "config_utils"]
+
+IMPORT_SCRIPT = """
+import json, sys, time
+# the entry points add the repository root to sys.path
+sys.path.insert(0, {repo_root_dir!r})
+sys.path.insert(0, {lib_dir!r})
+start_time = time.perf_counter()
+import asr_systems
+import asr_systems.base_asr_system
+import asr_systems.ctc_onnx
+import asr_systems.model_manager
+import asr_systems.hyp_gen_pool
+import_sec = time.perf_counter() - start_time
+print(json.dumps({{"import_sec": import_sec,
+                  "loaded": sorted(name for name in {heavy_modules!r} if name in sys.modules),
+                  "config_read": asr_systems.base_asr_system._config_user is not None}}))
+"""
+
+def time_import(lib_dir):
+    """Import the asr_systems package in a fresh interpreter.
+
+    Args:
+        lib_dir (str): Directory containing the asr_systems package.
+
+    Returns:
+        dict: import_sec (import time in seconds), loaded (heavy modules loaded by the import)
+              and config_read (True if the user-specific config was read).
+
+    Raises:
+        RuntimeError: If the import fails (e.g. a missing dependency imported at import time).
+    """
+    repo_root_dir = os.path.abspath(os.path.join(lib_dir, '../../'))
+    script = IMPORT_SCRIPT.format(repo_root_dir=repo_root_dir, lib_dir=lib_dir, heavy_modules=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def check_entry_point(lib_dir, entry_point):
+    """Start the entry point with --help in a fresh interpreter outside the repository.
+
+    Args:
+        lib_dir (str): Directory containing the entry points.
+        entry_point (str): File name of the entry point.
+
+    Returns:
+        tuple: (error, missing_dependency), error is None if the entry point started or only
+               a third-party dependency is missing (returned as missing_dependency).
+    """
+    with tempfile.TemporaryDirectory() as cwd:
+        result = subprocess.run([sys.executable, os.path.join(lib_dir, entry_point), "--help"],
+                                capture_output=True, text=True, cwd=cwd)
+    if result.returncode == 0:
+        return None, None
+    last_line = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "exit code {}".format(result.returncode)
+    missing_module = re.search(r"No module named '([^']+)'", last_line)
+    if missing_module and missing_module.group(1).split(".")[0] not in REPO_MODULES:
+        return None, missing_module.group(1)
+    return last_line, None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='BIGOS check of the import time of the ASR systems package')
+    parser.add_argument('--max_sec', type=float,
+                        help='Maximum import time in seconds (best of the runs)',
+                        default=1.0)
+    parser.add_argument('--runs', type=int,
+                        help='Number of timed imports',
+                        default=5)
+    args = parser.parse_args()
+
+    lib_dir = os.path.dirname(os.path.realpath(__file__))
+    try:
+        results = [time_import(lib_dir) for _ in range(max(1, args.runs))]
+    except RuntimeError as e:
+        print("FAILED: import of asr_systems failed: {}".format(e))
+        sys.exit(1)
+    best_sec = min(result["import_sec"] for result in results)
+    print("Import time of asr_systems: {:.3f} s (best of {} runs, limit {:.3f} s)".format(best_sec, len(results), args.max_sec))
+
+    errors = []
+    if best_sec > args.max_sec:
+        errors.append("import time {:.3f} s exceeds the limit of {:.3f} s".format(best_sec, args.max_sec))
+    if results[0]["loaded"]:
+        errors.append("heavy modules loaded at import time: {}".format(", ".join(results[0]["loaded"])))
+    if results[0]["config_read"]:
+        errors.append("user-specific config read at import time")
+    for entry_point in ENTRY_POINTS:
+        error, missing_dependency = check_entry_point(lib_dir, entry_point)
+        if error is not None:
+            errors.append("{} --help failed: {}".format(entry_point, error))
+        elif missing_dependency is not None:
+            print("Skipped {}: dependency {} is not installed".format(entry_point, missing_dependency))
+    if errors:
+        for error in errors:
+            print("FAILED: {}".format(error))
+        sys.exit(1)
+    print("OK")
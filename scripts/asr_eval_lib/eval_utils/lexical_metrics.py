@@ -2,8 +2,11 @@ from jiwer import wer, mer, wil, cer, process_words, process_characters
 import jiwer
 import pandas as pd
 import librosa
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 # Define transformations for text normalization
 transf_all = jiwer.Compose([
     jiwer.ToLowerCase(),
@@ -42,12 +45,12 @@ def replace_words(sentence, replacement_dict):
     Returns:
         str: Sentence with words replaced according to the dictionary.
     """
-    print("Lexicon - Words in: ", sentence)
+    logger.debug("Lexicon - Words in: %s", sentence)
   
     words = sentence.split()
     
     replaced_sentence = ' '.join([replacement_dict.get(word, word) for word in words])
-    print("Lexicon - Words out: ", replaced_sentence)
+    logger.debug("Lexicon - Words out: %s", replaced_sentence)
 
     return replaced_sentence
 
@@ -63,7 +66,7 @@ def remove_tags(sentence, tags=["<unk>", "<silence>", "trunc"]):
     Returns:
         str: Sentence with all tags removed.
     """
-    print("Tags - Words in: ", sentence)
+    logger.debug("Tags - Words in: %s", sentence)
     words = sentence.split()
     
     # remove stand alone tags
@@ -75,7 +78,7 @@ def remove_tags(sentence, tags=["<unk>", "<silence>", "trunc"]):
     # e.g. "trunc_this is the example" becomes "is the example"
     # e.g. "this is the example of <unk>" becomes "this is the example of"
     without_glued_tags = ' '.join([word for word in without_stand_alone_tags if not any(tag.lower() in word.lower() for tag in tags)])
-    print("Tags - Words out: ", without_glued_tags)
+    logger.debug("Tags - Words out: %s", without_glued_tags)
 
     return without_glued_tags
 
@@ -100,23 +103,20 @@ def prepare_refs_hyps(df_eval_input, ref_col, hyp_col, norm, norm_lexicon=None):
     non_empty_hyps = df_eval_input[hyp_col].notnull()
     # filter out non-empty hypotheses from dataframe
     df_eval_input = df_eval_input[non_empty_hyps]
-    print("Number of non-empty hypotheses: ", len(df_eval_input))
+    nr_of_non_empty_hyps = len(df_eval_input)
     
     # remove hypothesis with values EMPTY or INVALID
     # TODO - move filtering logic to config
     df_eval_input = df_eval_input[df_eval_input[hyp_col] != "EMPTY"]
     df_eval_input = df_eval_input[df_eval_input[hyp_col] != "INVALID"]
-    print("Number of non-empty hypotheses after filtering out EMPTY and INVALID: ", len(df_eval_input))
+    nr_of_valid_hyps = len(df_eval_input)
 
     # retrieve non-empty hypotheses and references    
     ref = df_eval_input[ref_col].tolist()
     hyp = df_eval_input[hyp_col].tolist()
-    print ("refs len: ", len(ref))
-    print ("hyps len: ", len(hyp))
-    
+
     if len(ref) != len(hyp):
-        print("Warning: number of references and hypotheses does not match")
-        print("Generating metrics for common subset of references and hypotheses")
+        logger.warning("Number of references (%d) and hypotheses (%d) does not match. Generating metrics for common subset of references and hypotheses", len(ref), len(hyp))
         # TODO consider returning None or raising an exception
         # Naive approach: cut the longer list to the length of the shorter one
         #ref = ref[:min(len(ref), len(hyp))]
@@ -159,8 +159,7 @@ def prepare_refs_hyps(df_eval_input, ref_col, hyp_col, norm, norm_lexicon=None):
         # TODO - add dictionary based normalization
         # Apply the function to both lists
         if (norm_lexicon is not None):
-            print("Normalizing using lexicon")
-            print("Lexicon: ", norm_lexicon)
+            logger.debug("Normalizing using lexicon: %s", norm_lexicon)
             ref = transf_blanks([replace_words(str(sentence), norm_lexicon) for sentence in ref])
             hyp = transf_blanks([replace_words(str(sentence), norm_lexicon) for sentence in hyp])
     elif norm == "all":
@@ -173,12 +172,9 @@ def prepare_refs_hyps(df_eval_input, ref_col, hyp_col, norm, norm_lexicon=None):
             ref = transf_blanks([replace_words(str(sentence), norm_lexicon) for sentence in ref])
             hyp = transf_blanks([replace_words(str(sentence), norm_lexicon) for sentence in hyp])
     else:
-        print("Normalization type not recognized. Please choose one of the following: none, lowercase, blanks, punct, dict, all.")
+        logger.error("Normalization type not recognized. Please choose one of the following: none, lowercase, blanks, punct, dict, all.")
         exit(1)
         
-    print ("refs len after normalization: ", len(ref))
-    print ("hyps len after normalization: ", len(hyp))
-
     # combine into dataframe
     df_eval_input[ref_col] = ref
     df_eval_input[hyp_col] = hyp
@@ -192,8 +188,9 @@ def prepare_refs_hyps(df_eval_input, ref_col, hyp_col, norm, norm_lexicon=None):
     
     assert(len(ref) == len(hyp))
    
-    print("Number of non-empty references: ", len(ref))
-    print("Number of non-empty hypotheses: ", len(hyp))
+    # one summary line per call instead of a line per filtering step
+    logger.info("%s / %s (%s): %d non-empty hypotheses, %d without EMPTY and INVALID, %d pairs after normalization",
+                ref_col, hyp_col, norm, nr_of_non_empty_hyps, nr_of_valid_hyps, len(ref))
 
     audio_paths = df_eval_input['audiopath_local'].tolist()
     ids = []
@@ -204,7 +201,7 @@ def prepare_refs_hyps(df_eval_input, ref_col, hyp_col, norm, norm_lexicon=None):
     # Calculate metrics for the whole dataset
     return ref, hyp, ids, audio_paths
 
-def get_lexical_metrics_per_sample(df_eval_input, dataset, subset, split, system_codename, ref_type, norm, norm_lexicon = None)->pd.DataFrame:
+def get_lexical_metrics_per_sample(df_eval_input, dataset, subset, split, system_codename, ref_type, norm, norm_lexicon = None, audio_durations = None)->pd.DataFrame:
     """
     Calculate speech recognition metrics for each individual sample.
     
@@ -217,17 +214,20 @@ def get_lexical_metrics_per_sample(df_eval_input, dataset, subset, split, system
         ref_type (str): Type of reference (e.g., 'original', 'normalized').
         norm (str): Normalization type applied.
         norm_lexicon (dict, optional): Dictionary for lexicon-based normalization. Default is None.
+        audio_durations (dict, optional): Dictionary mapping audio paths to durations in seconds
+                                          from the sample catalog. Default is None (read from the audio files).
         
     Returns:
         pandas.DataFrame: DataFrame with speech metrics for each sample, including
                          Word Information Lost (WIL), Match Error Rate (MER), 
                          Word Error Rate (WER), and Character Error Rate (CER).
     """
-    print("Calculating metrics for individual sentences for dataset:\nDataset: {}\nSubset: {}\nSplit: {}\nSystem: {}\nRef_type: {}\nNormalization: {}\n".format(dataset, subset, split, system_codename, ref_type, norm))
+    logger.info("Calculating metrics for individual sentences: dataset %s, subset %s, split %s, system %s, ref_type %s, normalization %s",
+                dataset, subset, split, system_codename, ref_type, norm)
     # assume that the input dataframe   
     # a. was prefiltered accordingly to the proper business logic e.g. only test set, only specific subset, etc.
     # b. has the following columns: ref_col, hyp_col
-    print("Norm lexicon: ", norm_lexicon)
+    logger.debug("Norm lexicon: %s", norm_lexicon)
 
     ref_col = "ref_" + ref_type
     hyp_col = "hyp_" + system_codename
@@ -248,7 +248,9 @@ def get_lexical_metrics_per_sample(df_eval_input, dataset, subset, split, system
         # TODO consider adding more metadata e.g. audio duration, etc.
         # calculate audio_duration
         audio_path = audio_paths[index]
-        if librosa.__version__ < "0.10.0":
+        if audio_durations is not None and audio_durations.get(audio_path) is not None:
+            audio_duration = round(audio_durations[audio_path],2)
+        elif librosa.__version__ < "0.10.0":
             audio_duration = round(librosa.get_duration(path=audio_path),2)
         else:
             audio_duration = round(librosa.get_duration(filename=audio_path),2)
@@ -305,11 +307,12 @@ def get_lexical_metrics_per_dataset(df_eval_input, dataset, subset, split, syste
     # https://jitsi.github.io/jiwer/reference/transformations/
 
 
-    print("Calculating metrics for whole dataset:\nDataset: {}\nSubset: {}\nSplit: {}\nSystem: {}\nRef_type: {}\nNormalization: {}\n".format(dataset, subset, split, system_codename, ref_type, norm))
+    logger.info("Calculating metrics for whole dataset: dataset %s, subset %s, split %s, system %s, ref_type %s, normalization %s",
+                dataset, subset, split, system_codename, ref_type, norm)
     # assume that the input dataframe   
     # a. was prefiltered accordingly to the proper business logic e.g. only test set, only specific subset, etc.
     # b. has the following columns: ref_col, hyp_col
-    print("Norm lexicon: ", norm_lexicon)
+    logger.debug("Norm lexicon: %s", norm_lexicon)
 
     ref_col = "ref_" + ref_type
     hyp_col = "hyp_" + system_codename
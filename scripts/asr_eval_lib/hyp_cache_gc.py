@@ -0,0 +1,190 @@
+"""
+BIGOS ASR Evaluation Framework - Hypothesis Cache Maintenance
+
+This script compacts the hypothesis caches stored in <BIGOS_EVAL_DATA_REPO_PATH>/asr_hyps_cache
+and removes stale hypotheses, so that the time needed to load the caches at the start of
+every flow stays bounded as the benchmark ages.
+
+For every cache it:
+1. Compacts the cache to one entry per audio sample
+2. Drops hypotheses of versions older than --min_version
+3. Drops hypotheses of versions not referenced by any config/eval-run-specific/*.json (--referenced_only)
+4. Drops EMPTY/INVALID markers (--drop_invalid) and duplicated audio path aliases (--dedup_aliases)
+5. Reports the bytes and load time saved
+
+Caches of ASR systems not referenced by any runtime config are only compacted when
+--referenced_only is used. Do not run this script while other flows are writing to the cache.
+
+Usage:
+    python hyp_cache_gc.py [--codename=<codename>] [--min_version=<YYYYQn>] [--referenced_only=True]
+                           [--drop_invalid=True] [--dedup_aliases=True] [--dry_run=True]
+
+Example:
+    python hyp_cache_gc.py --min_version=2024Q1 --referenced_only=True --dry_run=True
+"""
+
+# Add the repository root to sys.path before importing the scripts.* modules of the repository
+import os
+import sys
+repo_root_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../../'))
+sys.path.insert(0, repo_root_dir)
+
+from asr_systems.hyp_cache import SqliteHypCacheStore, gc_jsonl_cache, get_cache_codename
+from scripts.utils.utils import read_config_ini, read_config_json, configure_logging
+import argparse
+import glob
+
+def get_referenced_versions(config_runtime_dir):
+    """Collect the versions of ASR systems referenced by the runtime configs.
+
+    Args:
+        config_runtime_dir (str): Directory with the eval-run-specific JSON configs.
+
+    Returns:
+        dict: Dictionary mapping cache codenames to sets of referenced versions.
+    """
+    referenced_versions = {}
+    for config_runtime_file in sorted(glob.glob(os.path.join(config_runtime_dir, "*.json"))):
+        config_runtime = read_config_json(config_runtime_file)
+        for system, system_config in config_runtime.get("systems", {}).items():
+            for model in system_config["models"]:
+                versions = referenced_versions.setdefault(get_cache_codename(system, model), set())
+                versions.update(version.strip() for version in system_config.get("versions", []))
+    return referenced_versions
+
+def get_version_filter(codename, min_version, referenced_versions):
+    """Build the predicate deciding which versions of the codename are kept.
+
+    Args:
+        codename (str): Cache codename of the ASR system and model.
+        min_version (str or None): Oldest version to keep (YYYYQn format).
+        referenced_versions (dict or None): Versions referenced by the runtime configs per codename.
+
+    Returns:
+        callable or None: Predicate returning True for versions to keep, None if all versions are kept.
+    """
+    keep_referenced = referenced_versions is not None and codename in referenced_versions
+    if referenced_versions is not None and not keep_referenced:
+        print("Codename {} is not referenced by any runtime config. Keeping all versions.".format(codename))
+    if min_version is None and not keep_referenced:
+        return None
+
+    def keep_version(version):
+        if min_version is not None and version < min_version:
+            return False
+        if keep_referenced and version not in referenced_versions[codename]:
+            return False
+        return True
+
+    return keep_version
+
+def print_gc_stats(codename, stats):
+    """Print garbage collection statistics of a single cache.
+
+    Args:
+        codename (str): Cache codename of the ASR system and model.
+        stats (dict): Statistics returned by the garbage collection.
+    """
+    print("Cache: {}".format(codename))
+    print("Cached samples: {} -> {}".format(stats["samples_before"], stats["samples_after"]))
+    print("Dropped hypotheses: ", stats["dropped_hyps"])
+    if "bytes_before" in stats:
+        print("Lines: {} -> {}".format(stats["lines_before"], stats["lines_after"]))
+        print("Size [bytes]: {} -> {}".format(stats["bytes_before"], stats["bytes_after"]))
+    if stats["load_sec_after"] is not None:
+        print("Load time [s]: {:.3f} -> {:.3f}".format(stats["load_sec_before"], stats["load_sec_after"]))
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+
+    parser = argparse.ArgumentParser(
+        description='BIGOS ASR hypothesis cache compaction and garbage collection',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Report how much would be saved by dropping versions not used by any runtime config
+  python hyp_cache_gc.py --referenced_only=True --dry_run=True
+
+  # Compact the cache of a single ASR system and drop EMPTY/INVALID markers
+  python hyp_cache_gc.py --codename=whisper_local_large-v2 --drop_invalid=True
+        """
+    )
+    parser.add_argument('--codename', type=str,
+                        help='Codename of the ASR system cache to process (default: all caches)',
+                        default=None)
+    parser.add_argument('--min_version', type=str,
+                        help='Drop hypotheses of versions older than this version (YYYYQn format)',
+                        default=None)
+    parser.add_argument('--referenced_only', type=bool,
+                        help='Drop hypotheses of versions not referenced by any eval-run-specific config',
+                        default=False)
+    parser.add_argument('--drop_invalid', type=bool,
+                        help='Drop EMPTY and INVALID markers, so that the hypotheses are regenerated',
+                        default=False)
+    parser.add_argument('--dedup_aliases', type=bool,
+                        help='Drop audio paths with the same filename and hypotheses as a later audio path',
+                        default=False)
+    parser.add_argument('--dry_run', type=bool,
+                        help='Only report the savings without modifying the caches',
+                        default=False)
+    args = parser.parse_args()
+
+    config_user_path = os.path.join(script_dir, '../../config/user-specific/config.ini')
+    if not os.path.exists(config_user_path):
+        print(f"User config file does not exist: {config_user_path}")
+        sys.exit(1)
+    config_user = read_config_ini(config_user_path)
+    configure_logging(config_user)
+
+    cache_dir = os.path.join(config_user["PATHS"]["BIGOS_EVAL_DATA_REPO_PATH"], "asr_hyps_cache")
+    backend = config_user.get("CACHE_SETTINGS", "HYP_CACHE_BACKEND", fallback="jsonl")
+    print("Hypothesis cache directory ({} backend): {}".format(backend, cache_dir))
+
+    referenced_versions = None
+    if args.referenced_only:
+        referenced_versions = get_referenced_versions(os.path.join(script_dir, '../../config/eval-run-specific'))
+
+    gc_options = dict(drop_invalid=args.drop_invalid, dedup_aliases=args.dedup_aliases, dry_run=args.dry_run)
+    total_stats = {"dropped_hyps": 0, "load_sec_before": 0.0, "load_sec_after": 0.0}
+
+    if backend == "sqlite":
+        sqlite_file = config_user.get("CACHE_SETTINGS", "HYP_CACHE_SQLITE_FILE", fallback=None) or os.path.join(cache_dir, "asr_hyps_cache.sqlite")
+        if not os.path.exists(sqlite_file):
+            print(f"SQLite cache does not exist: {sqlite_file}")
+            sys.exit(1)
+        bytes_before = os.path.getsize(sqlite_file)
+        codenames = SqliteHypCacheStore(sqlite_file, "").list_codenames()
+        if args.codename:
+            codenames = [codename for codename in codenames if codename == args.codename]
+        for codename in codenames:
+            store = SqliteHypCacheStore(sqlite_file, codename)
+            stats = store.gc(get_version_filter(codename, args.min_version, referenced_versions), **gc_options)
+            print_gc_stats(codename, stats)
+            total_stats["dropped_hyps"] += stats["dropped_hyps"]
+            total_stats["load_sec_before"] += stats["load_sec_before"]
+            total_stats["load_sec_after"] += stats["load_sec_after"] or 0.0
+        if not args.dry_run:
+            SqliteHypCacheStore(sqlite_file, "").vacuum()
+        total_stats["bytes_before"] = bytes_before
+        total_stats["bytes_after"] = os.path.getsize(sqlite_file)
+    else:
+        cache_files = sorted(glob.glob(os.path.join(cache_dir, "*.asr_cache.jsonl")))
+        if args.codename:
+            cache_files = [cache_file for cache_file in cache_files if os.path.basename(cache_file) == args.codename + ".asr_cache.jsonl"]
+        total_stats["bytes_before"] = 0
+        total_stats["bytes_after"] = 0
+        for cache_file in cache_files:
+            codename = os.path.basename(cache_file)[:-len(".asr_cache.jsonl")]
+            stats = gc_jsonl_cache(cache_file, get_version_filter(codename, args.min_version, referenced_versions), **gc_options)
+            print_gc_stats(codename, stats)
+            for key in total_stats:
+                total_stats[key] += stats[key]
+
+    print("\nTotal dropped hypotheses: ", total_stats["dropped_hyps"])
+    if args.dry_run and backend == "sqlite":
+        print("Bytes and load time saved are reported only when the SQLite cache is modified (dry run)")
+    else:
+        print("Bytes saved: ", total_stats["bytes_before"] - total_stats["bytes_after"])
+        print("Load time saved [s]: {:.3f}".format(total_stats["load_sec_before"] - total_stats["load_sec_after"]))
+    if args.dry_run:
+        print("Dry run - caches were not modified")
@@ -0,0 +1,67 @@
+"""
+BIGOS ASR Evaluation Framework - Hypothesis Cache Service
+
+This script runs the HTTP service sharing cached ASR hypotheses between team machines.
+Set HYP_CACHE_SERVICE_URL in the [CACHE_SETTINGS] section of the user-specific config to make
+HYP_GEN check the service before calling the ASR system and upload newly generated hypotheses.
+
+The service stores hypotheses in <BIGOS_EVAL_DATA_REPO_PATH>/asr_hyps_cache_service by default.
+
+Usage:
+    python hyp_cache_server.py [--host=<address>] [--port=<port>] [--cache_dir=<dir>] [--token=<token>]
+
+Example:
+    python hyp_cache_server.py --host=0.0.0.0 --port=8765 --token=team-secret
+"""
+
+# Add the repository root to sys.path before importing the scripts.* modules of the repository
+import os
+import sys
+repo_root_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../../'))
+sys.path.insert(0, repo_root_dir)
+
+from asr_systems.hyp_cache_service import create_hyp_cache_server
+from scripts.utils.utils import read_config_ini, configure_logging
+import argparse
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+
+    parser = argparse.ArgumentParser(description='BIGOS ASR hypothesis cache service')
+    parser.add_argument('--host', type=str,
+                        help='Address to listen on (use 0.0.0.0 to share the cache with other machines)',
+                        default="127.0.0.1")
+    parser.add_argument('--port', type=int,
+                        help='Port to listen on',
+                        default=8765)
+    parser.add_argument('--cache_dir', type=str,
+                        help='Directory for storing the shared hypotheses (default: <BIGOS_EVAL_DATA_REPO_PATH>/asr_hyps_cache_service)',
+                        default=None)
+    parser.add_argument('--backend', type=str,
+                        help='Cache backend of the service: sqlite, jsonl or indexed',
+                        default="sqlite")
+    parser.add_argument('--token', type=str,
+                        help='Token required from clients (HYP_CACHE_SERVICE_TOKEN in their user-specific config)',
+                        default=None)
+    args = parser.parse_args()
+
+    cache_dir = args.cache_dir
+    if cache_dir is None:
+        config_user_path = os.path.join(script_dir, '../../config/user-specific/config.ini')
+        if not os.path.exists(config_user_path):
+            print(f"User config file does not exist: {config_user_path}")
+            sys.exit(1)
+        config_user = read_config_ini(config_user_path)
+        # per-request lines of the service are logged at DEBUG level (LOGGING section of the user-specific config)
+        configure_logging(config_user)
+        cache_dir = os.path.join(config_user["PATHS"]["BIGOS_EVAL_DATA_REPO_PATH"], "asr_hyps_cache_service")
+    os.makedirs(cache_dir, exist_ok=True)
+
+    server = create_hyp_cache_server(cache_dir, args.host, args.port, args.backend, args.token)
+    print("Serving hypothesis cache from {} on http://{}:{}".format(cache_dir, args.host, args.port))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("Stopping hypothesis cache service")
+    finally:
+        server.server_close()
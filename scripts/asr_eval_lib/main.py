@@ -9,6 +9,7 @@ It orchestrates the different flows of the evaluation process:
 3. Evaluation Execution (EVAL_RUN): Run evaluation metrics calculation
 4. Hypothesis Statistics (HYP_STATS): Calculate statistics about cached hypotheses
 5. Manual Inspection Preparation (PREP_EVAL_RESULTS_INSPECTION): Prepare data for manual inspection
+6. Hypothesis Generation Plan (PLAN): Estimate cache coverage, wall time and cloud cost of HYP_GEN
 
 Each flow can be run independently or together as part of a complete evaluation pipeline.
 The script uses configuration files to determine which datasets, ASR systems, and evaluation
@@ -22,29 +23,28 @@ Example:
 
 Args:
     --eval_config: Name of the runtime configuration file (without .json extension)
-    --flow: Name of the flow to execute (ALL, HYP_GEN, EVAL_PREP, EVAL_RUN, HYP_STATS, PREP_EVAL_RESULTS_INSPECTION)
+    --flow: Name of the flow to execute (ALL, HYP_GEN, EVAL_PREP, EVAL_RUN, HYP_STATS, PREP_EVAL_RESULTS_INSPECTION, PLAN)
     --force: Whether to force execution of evaluation flows
     --force_hyps: Whether to force regeneration of hypotheses
 """
 
+# Add the repository root to sys.path before importing the scripts.* modules of the repository
+import os
+import sys
+repo_root_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../../'))
+print("repo_root_dir", repo_root_dir)
+sys.path.insert(0, repo_root_dir)
+
 from prefect_flows.asr_hyp_gen import asr_hyp_gen
+from prefect_flows.asr_hyp_gen_plan import asr_hyp_gen_plan
 from prefect_flows.asr_eval_prep import asr_eval_prep
 from prefect_flows.asr_eval_run import asr_eval_run
 from prefect_flows.asr_hyp_stats import asr_hyp_stats
 from prefect_flows.asr_eval_man_inspect_prep import asr_eval_man_inspect_prep
-from scripts.utils.utils import read_config_ini, read_config_json
+from scripts.utils.utils import read_config_ini, read_config_json, configure_logging
 from typing import List
 import argparse
-import os
 import json
-import sys
-
-# Get the parent directory
-repo_root_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../../'))
-print("repo_root_dir", repo_root_dir)
-
-# Add the parent directory to sys.path
-sys.path.insert(0, repo_root_dir)
 
 # Example execution (you can also run this flow from CLI or Prefect UI)
 if __name__ == "__main__":
@@ -62,6 +62,9 @@ Examples:
   # Generate ASR hypotheses only
   python main.py --flow=HYP_GEN --eval_config=bigos
 
+  # Estimate cache coverage, wall time and cloud cost before generating hypotheses
+  python main.py --flow=PLAN --eval_config=bigos
+
   # Calculate statistics for cached hypotheses
   python main.py --flow=HYP_STATS --eval_config=bigos
         """
@@ -70,7 +73,7 @@ Examples:
                         help='Name of the runtime config file', 
                         default="TEST")
     parser.add_argument('--flow', type=str, 
-                        help='Flow to execute: ALL, HYP_GEN, EVAL_PREP, EVAL_RUN, HYP_STATS, PREP_EVAL_RESULTS_INSPECTION', 
+                        help='Flow to execute: ALL, HYP_GEN, EVAL_PREP, EVAL_RUN, HYP_STATS, PREP_EVAL_RESULTS_INSPECTION, PLAN', 
                         default="ALL")
     parser.add_argument('--force', type=bool, 
                         help='Force execution of the eval results calculation flows (except hypothesis generation)', 
@@ -118,6 +121,8 @@ Examples:
     # Load configuration data
     config_user = read_config_ini(config_user_path)
     config_common = read_config_json(config_common_path)
+    # level of the per-sample and progress output (LOGGING section of the user-specific config)
+    configure_logging(config_user)
 
     with open(config_runtime_file, "r") as f:
         config_runtime = json.load(f)
@@ -143,7 +148,10 @@ Examples:
     elif args.flow == "PREP_EVAL_RESULTS_INSPECTION":
         print(f"Executing manual inspection preparation flow for config: {args.eval_config}")
         asr_eval_man_inspect_prep(config_user, config_common, config_runtime, force)
+    elif args.flow == "PLAN":
+        print(f"Executing hypothesis generation plan flow for config: {args.eval_config}")
+        asr_hyp_gen_plan(config_user, config_common, config_runtime, force_hyps)
     else:
         print(f"Unknown flow name: {args.flow}")
-        print("Available flows: ALL, HYP_GEN, EVAL_PREP, EVAL_RUN, HYP_STATS, PREP_EVAL_RESULTS_INSPECTION")
+        print("Available flows: ALL, HYP_GEN, EVAL_PREP, EVAL_RUN, HYP_STATS, PREP_EVAL_RESULTS_INSPECTION, PLAN")
         sys.exit(1)
\ No newline at end of file
@@ -13,7 +13,6 @@ from prefect import flow
 from prefect_flows.tasks import load_hf_dataset_split
 import pandas as pd
 from datetime import datetime
-from asr_systems import initialize_asr_system
 from pathlib import Path
 from config_utils import get_config_run
 from eval_utils.manual_inspection_utils import init_rg_client, init_rg_dataset_settings, create_rg_dataset, prepare_subset_for_inspection_random, prepare_subset_for_inspection_sorted, prepare_rg_dataset_for_inspection, upload_rg_dataset_records
@@ -2,7 +2,7 @@ from prefect import flow
 from prefect_flows.tasks import load_hf_dataset, select_split_of_dataset, prepare_eval_input_from_hyps_cache
 import pandas as pd
 from datetime import datetime
-from asr_systems import initialize_asr_system
+from asr_systems import initialize_cache_only_asr_system
 from pathlib import Path
 from config_utils import get_config_run 
 
@@ -50,8 +50,8 @@ def generate_eval_input(config_user, config_common, config_runtime, force=False)
     for system in systems:
         for model in config_runtime["systems"][system]["models"]:
             for version in config_runtime["systems"][system]["versions"]:
-                # TODO add version as input argument to control ASR version somehow
-                asr_system = initialize_asr_system(system, model, config_user) 
+                # only cached hypotheses are needed, so the model is not loaded
+                asr_system = initialize_cache_only_asr_system(system, model, version)
                 for dataset in datasets:
                     for subset in subsets:
                         hf_dataset = load_hf_dataset(dataset, subset)
@@ -8,6 +8,7 @@ data loading, metrics calculation, and results persistence.
 from prefect import flow
 from prefect_flows.tasks import calculate_eval_metrics_per_dataset, calculate_eval_metrics_per_sample, save_metrics_tsv, save_metrics_json, load_hf_dataset_split
 from config_utils import get_config_run 
+from scripts.utils.sample_catalog import get_sample_catalog, get_sample_catalog_file
 import pandas as pd
 from datetime import datetime
 import os
@@ -75,6 +76,10 @@ def generate_sample_eval_metrics_subsets(config_user, config_common, config_runt
     leaderboard_in_dir = os.path.join(bigos_eval_data_dir, "leaderboard_input")
     os.makedirs(leaderboard_in_dir, exist_ok=True)
     os.makedirs(eval_out_dir_common, exist_ok=True)
+    sample_catalog = get_sample_catalog(get_sample_catalog_file(config_user))
+    catalog_workers = config_user.getint("HYP_GEN_SETTINGS", "CATALOG_WORKERS", fallback=8)
+    # only the first samples of every subset are evaluated, as in HYP_GEN
+    max_samples_per_subset = config_runtime["max_samples_per_subset"]
 
     # initialize empty dataframe for storing all evaluation metrics
     df_eval_results_all = pd.DataFrame([])
@@ -87,6 +92,10 @@ def generate_sample_eval_metrics_subsets(config_user, config_common, config_runt
         for split in splits:
             for subset in subsets:
                 hf_dataset = load_hf_dataset_split(dataset, subset, split)
+                # durations of the evaluated samples from the catalog, audio files are opened only if they are not cataloged yet
+                audio_paths = hf_dataset["audiopath_local"][:max_samples_per_subset]
+                sample_catalog.build(audio_paths, dataset, subset, split, catalog_workers)
+                audio_durations = dict(zip(audio_paths, sample_catalog.get_durations(audio_paths)))
                 
                 # convert HF dataset to pandas dataframe
                 df_hf_dataset = pd.DataFrame(hf_dataset)
@@ -106,7 +115,6 @@ def generate_sample_eval_metrics_subsets(config_user, config_common, config_runt
                 for system in systems:
                     for model in config_runtime["systems"][system]["models"]:
                         for version in config_runtime["systems"][system]["versions"]:
-                            # TODO add flag to skipping initializing model, if asr system is needed just to read cache or name (read_model=False)
                             #TODO move to utils
                             system_codename = str.join("_", [system, model])
                             # TODO move eval input dir root to config
@@ -117,7 +125,7 @@ def generate_sample_eval_metrics_subsets(config_user, config_common, config_runt
                             fn_eval_results_system = os.path.join(eval_out_dir, "eval_results-per_sample-" + system_codename + ".tsv")
                             if not os.path.exists(fn_eval_results_system) or force:
                                 #asr_system = initialize_asr_system(system, model, config_user)
-                                df_eval_result_no_meta = calculate_eval_metrics_per_sample(df_eval_input, dataset, subset, split, system_codename, ref_types, norm_types)
+                                df_eval_result_no_meta = calculate_eval_metrics_per_sample(df_eval_input, dataset, subset, split, system_codename, ref_types, norm_types, audio_durations=audio_durations)
                                 # get columns names not available in df_eval_results but available in hf_dataset_column_names
                                 # extend df_eval_results with metadata for specific dataset sample based on the content of hf_dataset
                                 # join on column "audiopath_bigos"
@@ -219,7 +227,6 @@ def generate_agg_eval_metrics_subsets(config_user, config_common, config_runtime
                 for system in systems:
                     for model in config_runtime["systems"][system]["models"]:
                         for version in config_runtime["systems"][system]["versions"]:
-                            # TODO add flag to skipping initializing model, if asr system is needed just to read cache or name (read_model=False)
                             #TODO move to utils
                             system_codename = str.join("_", [system, model])
                             # TODO move eval input dir root to config
@@ -6,22 +6,35 @@ using specified ASR systems and models on various datasets.
 """
 
 from prefect import flow
-from prefect_flows.tasks import load_hf_dataset_split, gen_hyps_from_audio_samples
-from asr_systems import initialize_asr_system
+import time
+from prefect_flows.tasks import load_hf_dataset_split, gen_hyps_from_audio_samples, gen_hyps_with_worker_pool
+from asr_systems import initialize_cache_only_asr_system
+from asr_systems.model_manager import ModelManager, GB
+from asr_systems.hyp_gen_pool import HypGenWorkerPool, get_worker_pool_settings
+from asr_systems.ctc_onnx import get_inference_engine_settings
+from asr_systems.duration_batching import get_audio_durations
+from asr_systems.hyp_cache import INVALID_HYP_MARKERS
+from scripts.utils.sample_catalog import get_sample_catalog, get_sample_catalog_file
+from prefect_flows.hyp_gen_manifest import HypGenManifest, get_manifest_file
+from prefect_flows.asr_hyp_gen_plan import RealTimeFactorStore, get_real_time_factor_file, get_parallelism
 
 @flow(name="ASR Hypothesis Generation Flow")
 def asr_hyp_gen(config_user, config_common, config_runtime, force_hyps=False):
     """
     Prefect flow that generates ASR hypotheses for audio samples.
     
-    This flow initializes ASR systems for each specified model, loads datasets,
-    and either generates new hypotheses or retrieves existing ones for each audio sample.
+    This flow expands the config into a persisted job manifest (loading only datasets not stored
+    in the manifest yet), then initializes ASR systems for each specified model with pending jobs
+    and either generates new hypotheses or retrieves existing ones for each pending audio sample.
+    Progress is checkpointed in the manifest, so a restarted run resumes at the first pending sample.
     
     Args:
         config_user (dict): User-specific configuration settings.
         config_common (dict): Common configuration settings shared across runs.
         config_runtime (dict): Runtime configuration containing datasets, subsets, 
-                               splits, systems, and sample limits.
+                               splits, systems, and sample limits. The optional "hyp_gen_workers"
+                               section (global or per system) enables worker processes for local models,
+                               the optional "inference_engine" section selects the onnxruntime engine of CTC models.
         force_hyps (bool, optional): If True, force regeneration of hypotheses 
                                     even if they already exist. Defaults to False.
     
@@ -34,27 +47,121 @@ def asr_hyp_gen(config_user, config_common, config_runtime, force_hyps=False):
     splits = config_runtime["splits"]
     systems = config_runtime["systems"]
     max_samples_per_subset = config_runtime["max_samples_per_subset"]
+    # number of audio files transcribed together by local backends (user-specific, depends on the machine)
+    batch_size = config_user.getint("HYP_GEN_SETTINGS", "BATCH_SIZE", fallback=1)
+    # maximum padded audio seconds of batches of samples with similar durations (0 - batches of BATCH_SIZE samples)
+    max_batch_sec = config_user.getfloat("HYP_GEN_SETTINGS", "MAX_BATCH_AUDIO_SEC", fallback=0)
+    # number of audio files decoded in the background ahead of local models (0 - decoding in generate_asr_hyp)
+    prefetch_depth = config_user.getint("HYP_GEN_SETTINGS", "AUDIO_PREFETCH_DEPTH", fallback=0)
+    prefetch_workers = config_user.getint("HYP_GEN_SETTINGS", "AUDIO_PREFETCH_WORKERS", fallback=2)
+    sample_catalog = get_sample_catalog(get_sample_catalog_file(config_user))
+    catalog_workers = config_user.getint("HYP_GEN_SETTINGS", "CATALOG_WORKERS", fallback=8)
+
+    # memory budget of the process, the previous ASR system is unloaded before the next one is loaded
+    model_manager = ModelManager(config_user.getfloat("HYP_GEN_SETTINGS", "MAX_RSS_GB", fallback=0))
+
+    checkpoint_every = config_user.getint("HYP_GEN_SETTINGS", "CHECKPOINT_EVERY", fallback=500)
+    manifest = HypGenManifest(get_manifest_file(config_user, config_runtime["eval_run_codename"]))
+    print("HYP_GEN job manifest: ", manifest.manifest_file)
+    # real-time factors of the ASR systems measured in this run, used by the PLAN flow
+    rtf_store = RealTimeFactorStore(get_real_time_factor_file(config_user))
+
+    # expand the config into jobs, datasets already stored in the manifest are not loaded again
+    job_ids = {}
+    for dataset_name in datasets:
+        for subset in subsets:
+            for split in splits:
+                if not manifest.has_subset(dataset_name, subset, split):
+                    print("Loading dataset: {} \nsplit: {}\n subset: {}".format(dataset_name, split, subset))
+                    try:
+                        hf_dataset = load_hf_dataset_split(dataset_name, subset, split)
+                    except Exception as e:
+                        print("Failed to load dataset {} \nsplit: {}\n subset: {}\n with error: {}".format(dataset_name, split, subset, e))
+                        print("Trying force download")
+                        hf_dataset = load_hf_dataset_split(dataset_name, subset,  split, force_download=True)
+                        exit(1)
+                    print("Loaded dataset {} \nsplit: {}\n subset: {}".format(dataset_name, split, subset))
+                    print("Number of samples in dataset: ", len(hf_dataset))
+                    audio_paths = hf_dataset["audiopath_local"]
+                    manifest.add_subset(dataset_name, subset, split, audio_paths, get_audio_durations(hf_dataset))
+                    # catalog the subset once, later runs and flows read sizes and durations from the catalog
+                    sample_catalog.build(audio_paths[:max_samples_per_subset], dataset_name, subset, split, catalog_workers)
+                for system in systems:
+                    for model in config_runtime["systems"][system]["models"]:
+                        job_ids[(system, model, dataset_name, subset, split)] = manifest.add_job(system, model, dataset_name, subset, split, max_samples_per_subset)
+
+    if force_hyps:
+        manifest.restart_jobs(list(job_ids.values()))
+    else:
+        forced_job_ids = [job_id for job_id in job_ids.values() if manifest.is_forced(job_id)]
+        for job_id in forced_job_ids:
+            # forced pass interrupted after its last sample
+            if manifest.get_nr_of_pending_samples([job_id]) == 0:
+                manifest.end_forced_pass(job_id)
+        forced_job_ids = [job_id for job_id in forced_job_ids if manifest.is_forced(job_id)]
+        if forced_job_ids:
+            print("Resuming the unfinished forced run ({} jobs)".format(len(forced_job_ids)))
+    print("Pending samples: {}".format(manifest.get_nr_of_pending_samples(list(job_ids.values()))))
 
     for system in systems:
         for model in config_runtime["systems"][system]["models"]:
-            asr_system = initialize_asr_system(system, model, config_user)  # Assume this is defined
+            system_job_ids = [job_id for (job_system, job_model, *_), job_id in job_ids.items() if (job_system, job_model) == (system, model)]
+            if manifest.get_nr_of_pending_samples(system_job_ids) == 0:
+                print("All jobs of {} {} are finished. Skipping".format(system, model))
+                continue
+            worker_pool = None
+            inference_engine = get_inference_engine_settings(config_runtime, system)
+            worker_pool_settings = get_worker_pool_settings(config_runtime, system)
+            if worker_pool_settings is not None:
+                # models are loaded by the workers, the main process only owns the cache
+                worker_pool_settings.setdefault("batch_size", batch_size)
+                worker_pool_settings.setdefault("prefetch_depth", prefetch_depth)
+                worker_pool_settings.setdefault("prefetch_workers", prefetch_workers)
+                worker_pool_settings.setdefault("max_rss_gb", model_manager.max_rss_bytes / GB / worker_pool_settings["num_workers"])
+                worker_pool_settings.setdefault("inference_engine", inference_engine)
+                model_manager.unload()
+                worker_pool = HypGenWorkerPool(system, model, worker_pool_settings)
+                asr_system = initialize_cache_only_asr_system(system, model)
+            else:
+                asr_system = model_manager.load(system, model, config_user, inference_engine)
             print("ASR system initialized")
-            for dataset_name in datasets:
-                for subset in subsets:
-                    for split in splits:
-                        print("Loading dataset: {} \nsplit: {}\n subset: {}".format(dataset_name, split, subset))
-                        try:
-                            hf_dataset = load_hf_dataset_split(dataset_name, subset, split)
-                        except Exception as e:
-                            print("Failed to load dataset {} \nsplit: {}\n subset: {}\n with error: {}".format(dataset_name, split, subset, e))
-                            print("Trying force download")
-                            hf_dataset = load_hf_dataset_split(dataset_name, subset,  split, force_download=True)
-                            exit(1)
-                        print("Loaded dataset {} \nsplit: {}\n subset: {}".format(dataset_name, split, subset))
-                        print("Number of samples in dataset: ", len(hf_dataset))
-                        
-                        audio_paths = hf_dataset["audiopath_local"]
-                        # limit the number of audio paths for testing
-                        audio_paths = audio_paths[:max_samples_per_subset]
-                        gen_hyps = gen_hyps_from_audio_samples(audio_paths, asr_system, force_hyps)
-                        print("Generated or retrieved hypotheses for {} samples for subset: {}\n and split: {}\n".format(len(gen_hyps), subset, split) )
\ No newline at end of file
+            parallelism = get_parallelism(config_user, config_runtime, system)
+            try:
+                for (job_system, job_model, dataset_name, subset, split), job_id in job_ids.items():
+                    if (job_system, job_model) != (system, model):
+                        continue
+                    pending_samples = manifest.get_pending_samples(job_id)
+                    if not pending_samples:
+                        continue
+                    job_force_hyps = manifest.is_forced(job_id)
+                    print("Processing {} pending samples of dataset: {} \nsplit: {}\n subset: {}".format(len(pending_samples), dataset_name, split, subset))
+                    # progress is checkpointed in the manifest after every chunk
+                    for i in range(0, len(pending_samples), checkpoint_every):
+                        chunk = pending_samples[i:i + checkpoint_every]
+                        audio_paths = [audio_path for _, audio_path, _ in chunk]
+                        durations = [duration for _, _, duration in chunk]
+                        if None in durations:
+                            durations = sample_catalog.get_durations(audio_paths)
+                        start_time = time.monotonic()
+                        if worker_pool is not None:
+                            gen_hyps = gen_hyps_with_worker_pool(audio_paths, asr_system, worker_pool, job_force_hyps)
+                        else:
+                            gen_hyps = gen_hyps_from_audio_samples(audio_paths, asr_system, job_force_hyps, batch_size, durations, max_batch_sec,
+                                                                   prefetch_depth, prefetch_workers)
+                        # wall time of the chunk per second of audio sent to the ASR system, with cache hits of the chunk
+                        rtf_store.record(asr_system.get_codename(), asr_system.hyp_gen_stats.audio_sec, time.monotonic() - start_time, parallelism)
+                        # samples with an EMPTY or INVALID hypothesis are failed, samples without a hypothesis (failed requests)
+                        # stay pending and are retried by the next run
+                        manifest.mark_done(job_id,
+                                           [sample_idx for (sample_idx, _, _), gen_hyp in zip(chunk, gen_hyps)
+                                            if gen_hyp is not None and gen_hyp != "" and gen_hyp not in INVALID_HYP_MARKERS],
+                                           [sample_idx for (sample_idx, _, _), gen_hyp in zip(chunk, gen_hyps)
+                                            if gen_hyp == "" or gen_hyp in INVALID_HYP_MARKERS])
+                        print("Generated or retrieved hypotheses for {} samples for subset: {}\n and split: {}\n".format(len(gen_hyps), subset, split) )
+                    if job_force_hyps:
+                        manifest.end_forced_pass(job_id)
+            finally:
+                # workers are stopped also if a job fails
+                if worker_pool is not None:
+                    worker_pool.close()
+    model_manager.unload()
@@ -0,0 +1,267 @@
+"""
+ASR Hypothesis Generation Plan Module.
+
+This module contains the Prefect flow estimating a HYP_GEN run before it is started: the
+cache coverage, the audio duration still missing per ASR system, the wall time and the cost
+of the cloud ASR systems. The plan is computed read-only: no model is loaded, no hypothesis
+is generated, and the job manifest, the sample catalog and the audio files are not modified
+or hashed.
+
+- Real-time factors (wall seconds per second of audio sent to the ASR system) are recorded by
+  every HYP_GEN run per system codename in <BIGOS_EVAL_DATA_REPO_PATH>/hyp_gen_manifests/
+  real_time_factors.json, normalized by the parallelism of the system (worker processes or
+  concurrent cloud requests), so estimates stay valid when the parallelism changes.
+- Prices of the cloud ASR systems (USD per hour of audio) are read from the
+  CLOUD_ASR_PRICES_USD_PER_HOUR table of the common config.
+"""
+
+from prefect import flow
+from prefect_flows.tasks import load_hf_dataset_split
+from prefect_flows.hyp_gen_manifest import HypGenManifest, get_manifest_file
+from asr_systems import initialize_cache_only_asr_system
+from asr_systems.hyp_gen_pool import get_worker_pool_settings
+from asr_systems.request_engine import CLOUD_ASR_SYSTEMS
+from asr_systems.duration_batching import get_audio_durations
+from scripts.utils.sample_catalog import get_sample_catalog, get_sample_catalog_file
+from datetime import datetime as dt
+import pandas as pd
+import json
+import os
+
+def get_real_time_factor_file(config_user):
+    """Get the path to the real-time factors recorded by HYP_GEN runs.
+
+    Args:
+        config_user (configparser.ConfigParser): User-specific config.
+
+    Returns:
+        str: Path to the JSON file.
+    """
+    return os.path.join(config_user["PATHS"]["BIGOS_EVAL_DATA_REPO_PATH"], "hyp_gen_manifests", "real_time_factors.json")
+
+def get_parallelism(config_user, config_runtime, system):
+    """Get the number of samples of the ASR system processed at the same time.
+
+    Args:
+        config_user (configparser.ConfigParser): User-specific config.
+        config_runtime (dict): Runtime configuration.
+        system (str): Identifier for the ASR system type (e.g., 'google', 'mms').
+
+    Returns:
+        int: Number of worker processes of local systems or requests in flight of cloud systems, 1 otherwise.
+    """
+    worker_pool_settings = get_worker_pool_settings(config_runtime, system)
+    if worker_pool_settings is not None:
+        return worker_pool_settings["num_workers"]
+    if system in CLOUD_ASR_SYSTEMS:
+        # request engine settings of the provider, see create_request_engine
+        prefix = system.upper()
+        max_concurrency = config_user.getint("CLOUD_ASR_SETTINGS", prefix + "_MAX_CONCURRENCY", fallback=1)
+        async_max_in_flight = config_user.getint("CLOUD_ASR_SETTINGS", prefix + "_ASYNC_MAX_IN_FLIGHT", fallback=0)
+        return max(1, max_concurrency, async_max_in_flight)
+    return 1
+
+def get_price_per_hour(config_common, system, model):
+    """Get the price of transcribing an hour of audio with the cloud ASR system.
+
+    Args:
+        config_common (dict): Common configuration with the CLOUD_ASR_PRICES_USD_PER_HOUR table.
+        system (str): Identifier for the ASR system type (e.g., 'google', 'azure').
+        model (str): The specific model of the ASR system.
+
+    Returns:
+        float or None: Price in USD, 0.0 for local systems, None if the price of the cloud system is unknown.
+    """
+    if system not in CLOUD_ASR_SYSTEMS:
+        return 0.0
+    prices = config_common.get("CLOUD_ASR_PRICES_USD_PER_HOUR", {}).get(system, {})
+    return prices.get(model, prices.get("default"))
+
+class RealTimeFactorStore:
+    """Real-time factors of the ASR systems measured by HYP_GEN runs.
+
+    Totals of audio seconds and parallelism-normalized wall seconds are kept per system codename,
+    so the factor is averaged over all recorded chunks.
+
+    Attributes:
+        rtf_file (str): Path to the JSON file on disk.
+        entries (dict): Totals per system codename.
+    """
+
+    def __init__(self, rtf_file):
+        """Load the recorded real-time factors.
+
+        Args:
+            rtf_file (str): Path to the JSON file, created on first record.
+        """
+        self.rtf_file = rtf_file
+        self.entries = {}
+        if os.path.exists(rtf_file):
+            with open(rtf_file, "r") as f:
+                self.entries = json.load(f)
+
+    def get(self, codename):
+        """Get the real-time factor of the ASR system.
+
+        Args:
+            codename (str): Codename of the ASR system.
+
+        Returns:
+            float or None: Wall seconds per second of audio with a single sample in flight, None if not recorded.
+        """
+        entry = self.entries.get(codename)
+        if entry is None or entry["audio_sec"] <= 0:
+            return None
+        return entry["stream_sec"] / entry["audio_sec"]
+
+    def record(self, codename, audio_sec, wall_sec, parallelism=1):
+        """Add a measurement of the ASR system and save the store.
+
+        Args:
+            codename (str): Codename of the ASR system.
+            audio_sec (float): Duration of the audio sent to the ASR system.
+            wall_sec (float): Wall time of processing the audio.
+            parallelism (int, optional): Number of samples processed at the same time. Defaults to 1.
+        """
+        # chunks served from the cache do not measure the ASR system
+        if audio_sec <= 0:
+            return
+        entry = self.entries.setdefault(codename, {"audio_sec": 0.0, "stream_sec": 0.0})
+        entry["audio_sec"] += audio_sec
+        entry["stream_sec"] += wall_sec * max(1, parallelism)
+        entry["updated"] = dt.now().strftime("%Y%m%d")
+        os.makedirs(os.path.dirname(self.rtf_file), exist_ok=True)
+        tmp_file = self.rtf_file + ".tmp"
+        with open(tmp_file, "w") as f:
+            json.dump(self.entries, f, indent=4, sort_keys=True)
+        os.replace(tmp_file, self.rtf_file)
+
+def get_planned_samples(manifest, sample_catalog, dataset, subset, split, max_samples):
+    """Get the audio paths and durations of the samples processed by HYP_GEN, without modifying any store.
+
+    Samples are read from the job manifest of the eval run if the subset is stored in it,
+    otherwise from the dataset metadata. Durations missing in the metadata are read from the
+    sample catalog if the audio files are cataloged.
+
+    Args:
+        manifest (HypGenManifest or None): Job manifest of the eval run opened read-only, None if it does not exist.
+        sample_catalog (SampleCatalog): Catalog of the audio files.
+        dataset (str): Dataset name.
+        subset (str): Subset of the dataset.
+        split (str): Split of the dataset.
+        max_samples (int): Number of the first samples of the subset.
+
+    Returns:
+        list: List of (audio_path, duration) tuples, duration is None if unknown.
+    """
+    if manifest is not None and manifest.has_subset(dataset, subset, split):
+        samples = [(audio_path, duration) for _, audio_path, duration in manifest.get_subset_samples(dataset, subset, split, max_samples)]
+    else:
+        hf_dataset = load_hf_dataset_split(dataset, subset, split)
+        audio_paths = hf_dataset["audiopath_local"][:max_samples]
+        durations = get_audio_durations(hf_dataset)
+        samples = list(zip(audio_paths, durations[:max_samples] if durations is not None else [None] * len(audio_paths)))
+    planned_samples = []
+    for audio_path, duration in samples:
+        if duration is None:
+            entry = sample_catalog.read_entry(audio_path)
+            duration = entry["duration"] if entry is not None else None
+        planned_samples.append((audio_path, duration))
+    return planned_samples
+
+@flow(name="ASR Hypothesis Generation Plan Flow")
+def asr_hyp_gen_plan(config_user, config_common, config_runtime, force_hyps=False):
+    """
+    Prefect flow that estimates the time and cost of generating ASR hypotheses.
+
+    This flow expands the config into the samples of every dataset/subset/split (from the job
+    manifest of the eval run or the dataset metadata), checks which samples have no valid cached
+    hypothesis and sums their durations per system and model. The wall time is estimated from
+    the recorded real-time factor and the parallelism of the system, the cost from the price table
+    of the common config. The plan is printed and saved as a TSV file.
+
+    Args:
+        config_user (dict): User-specific configuration settings.
+        config_common (dict): Common configuration settings with the CLOUD_ASR_PRICES_USD_PER_HOUR table.
+        config_runtime (dict): Runtime configuration containing datasets, subsets,
+                               splits, systems, and sample limits.
+        force_hyps (bool, optional): If True, plan regeneration of all hypotheses,
+                                    as HYP_GEN with force_hyps. Defaults to False.
+
+    Returns:
+        pd.DataFrame: Plan with one row per system and model.
+    """
+
+    datasets = config_runtime["datasets"]
+    subsets = config_runtime["subsets"]
+    splits = config_runtime["splits"]
+    systems = config_runtime["systems"]
+    max_samples_per_subset = config_runtime["max_samples_per_subset"]
+    sample_catalog = get_sample_catalog(get_sample_catalog_file(config_user))
+    manifest_file = get_manifest_file(config_user, config_runtime["eval_run_codename"])
+    manifest = HypGenManifest(manifest_file, read_only=True) if os.path.exists(manifest_file) else None
+    rtf_store = RealTimeFactorStore(get_real_time_factor_file(config_user))
+
+    planned_samples = []
+    for dataset_name in datasets:
+        for subset in subsets:
+            for split in splits:
+                planned_samples.extend(get_planned_samples(manifest, sample_catalog, dataset_name, subset, split, max_samples_per_subset))
+    nr_of_unknown_durations = sum(1 for _, duration in planned_samples if duration is None)
+
+    plan = []
+    for system in systems:
+        parallelism = get_parallelism(config_user, config_runtime, system)
+        for model in config_runtime["systems"][system]["models"]:
+            # cached hypotheses are checked without loading the model
+            asr_system = initialize_cache_only_asr_system(system, model)
+            codename = asr_system.get_codename()
+            nr_of_missing_samples, missing_sec = 0, 0.0
+            for audio_path, duration in planned_samples:
+                if force_hyps or not asr_system.has_valid_cached_hyp(audio_path):
+                    nr_of_missing_samples += 1
+                    missing_sec += duration or 0.0
+            rtf = rtf_store.get(codename)
+            price_per_hour = get_price_per_hour(config_common, system, model)
+            plan.append({
+                "system": system,
+                "model": model,
+                "codename": codename,
+                "samples": len(planned_samples),
+                "missing_samples": nr_of_missing_samples,
+                "cache_coverage_%": round(100 * (1 - nr_of_missing_samples / len(planned_samples)), 2) if planned_samples else 100.0,
+                "missing_audio_h": round(missing_sec / 3600, 3),
+                "parallelism": parallelism,
+                "rtf": round(rtf, 4) if rtf is not None else None,
+                "est_wall_h": round(missing_sec * rtf / parallelism / 3600, 3) if rtf is not None else None,
+                "est_cost_usd": round(missing_sec / 3600 * price_per_hour, 2) if price_per_hour is not None else None,
+            })
+
+    plan_df = pd.DataFrame(plan)
+    if plan_df.empty:
+        print("No systems to plan")
+        return plan_df
+    total_wall_h = plan_df["est_wall_h"].sum()
+    plan_df["wall_share_%"] = (100 * plan_df["est_wall_h"] / total_wall_h).round(1) if total_wall_h > 0 else None
+    plan_df = plan_df.sort_values(["est_wall_h", "missing_audio_h"], ascending=False, na_position="first").reset_index(drop=True)
+
+    with pd.option_context("display.max_rows", None, "display.max_columns", None, "display.width", 200):
+        print(plan_df)
+    print("Missing audio: {:.2f} h, estimated wall time: {:.2f} h (systems run one after another), estimated cloud cost: {:.2f} USD".format(
+        plan_df["missing_audio_h"].sum(), total_wall_h, plan_df["est_cost_usd"].sum()))
+    if nr_of_unknown_durations:
+        print("Duration of {} of {} samples is unknown (not in the dataset metadata or the sample catalog) and is not counted".format(
+            nr_of_unknown_durations, len(planned_samples)))
+    no_rtf = plan_df[plan_df["rtf"].isna() & (plan_df["missing_samples"] > 0)]["codename"].tolist()
+    if no_rtf:
+        print("No real-time factor recorded yet (run HYP_GEN on a small config first): {}".format(", ".join(no_rtf)))
+    no_price = plan_df[plan_df["est_cost_usd"].isna()]["codename"].tolist()
+    if no_price:
+        print("No price in CLOUD_ASR_PRICES_USD_PER_HOUR: {}".format(", ".join(no_price)))
+    print("Hypotheses available only in the cache service are counted as missing")
+
+    plan_file = os.path.join(config_user["PATHS"]["BIGOS_EVAL_DATA_REPO_PATH"], "hyp_gen_plans", config_runtime["eval_run_codename"] + ".tsv")
+    os.makedirs(os.path.dirname(plan_file), exist_ok=True)
+    plan_df.to_csv(plan_file, sep="\t", index=False)
+    print("HYP_GEN plan saved to: ", plan_file)
+    return plan_df
@@ -11,7 +11,7 @@ detailed reporting of hypothesis coverage across different datasets.
 
 from prefect import flow
 from prefect_flows.tasks import load_hf_dataset_split, check_cached_hyps_size_and_coverage, cached_hyps_stats_to_df
-from asr_systems import initialize_asr_system
+from asr_systems import initialize_cache_only_asr_system
 from datetime import datetime as dt
 import pandas as pd
 import os
@@ -67,8 +67,8 @@ def asr_hyp_stats(config_user, config_common, config_runtime):
         # Iterate through each configured ASR system
         for system in systems:
             for model in config_runtime["systems"][system]["models"]:
-                # Initialize the ASR system with the specified model
-                asr_system = initialize_asr_system(system, model, config_user)
+                # Initialize the reader of cached hypotheses (the model is not loaded)
+                asr_system = initialize_cache_only_asr_system(system, model)
                 print("ASR system initialized")
                 asr_system_codename=asr_system.get_codename()
                 cached_hyps_stats[asr_system_codename]={}
@@ -0,0 +1,264 @@
+"""
+HYP_GEN Job Manifest Module.
+
+A HYP_GEN run expands the runtime config into a persisted job manifest before generating any
+hypotheses. The manifest is a SQLite database (<BIGOS_EVAL_DATA_REPO_PATH>/hyp_gen_manifests/
+<eval_run_codename>.sqlite) with:
+- the audio paths (and durations from the dataset metadata) of every dataset/subset/split,
+  so datasets are loaded only once,
+- one job per (system, model, dataset, subset, split) and the status of each of its samples.
+  Samples are done with a valid hypothesis and failed with an EMPTY or INVALID hypothesis (not retried
+  unless the run is forced). Samples without any hypothesis (failed requests) stay pending and are retried.
+
+Progress is checkpointed after every chunk of samples. A restarted run skips finished jobs
+without loading datasets or scanning the cache and resumes every job at its first pending sample.
+"""
+
+import os
+import sqlite3
+
+PENDING = "pending"
+DONE = "done"
+FAILED = "failed"
+
+def get_manifest_file(config_user, eval_run_codename):
+    """Get the path to the job manifest of the eval run.
+
+    Args:
+        config_user (configparser.ConfigParser): User-specific config.
+        eval_run_codename (str): Codename of the eval run from the runtime config.
+
+    Returns:
+        str: Path to the SQLite database of the manifest.
+    """
+    manifest_dir = os.path.join(config_user["PATHS"]["BIGOS_EVAL_DATA_REPO_PATH"], "hyp_gen_manifests")
+    return os.path.join(manifest_dir, eval_run_codename + ".sqlite")
+
+class HypGenManifest:
+    """Persisted job manifest of a HYP_GEN run.
+
+    Attributes:
+        manifest_file (str): Path to the SQLite database on disk.
+    """
+
+    def __init__(self, manifest_file, timeout=60, read_only=False):
+        """Open the manifest and create the database schema if needed.
+
+        Args:
+            manifest_file (str): Path to the SQLite database on disk.
+            timeout (float, optional): Number of seconds to wait for a lock held by another process. Defaults to 60.
+            read_only (bool, optional): If True, open an existing manifest without modifying it (used by the PLAN flow). Defaults to False.
+        """
+        self.manifest_file = manifest_file
+        if read_only:
+            self.conn = sqlite3.connect("file:{}?mode=ro".format(os.path.abspath(manifest_file)), timeout=timeout, uri=True)
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(manifest_file)), exist_ok=True)
+        self.conn = sqlite3.connect(manifest_file, timeout=timeout, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS subset_samples (
+                dataset TEXT NOT NULL,
+                subset TEXT NOT NULL,
+                split TEXT NOT NULL,
+                sample_idx INTEGER NOT NULL,
+                audio_path TEXT NOT NULL,
+                duration REAL,
+                PRIMARY KEY (dataset, subset, split, sample_idx)
+            )""")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                system TEXT NOT NULL,
+                model TEXT NOT NULL,
+                dataset TEXT NOT NULL,
+                subset TEXT NOT NULL,
+                split TEXT NOT NULL,
+                force_hyps INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (system, model, dataset, subset, split)
+            )""")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS job_samples (
+                job_id INTEGER NOT NULL,
+                sample_idx INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                PRIMARY KEY (job_id, sample_idx)
+            )""")
+
+    def has_subset(self, dataset, subset, split):
+        """Check if the samples of the dataset subset and split are stored in the manifest.
+
+        Args:
+            dataset (str): Dataset name.
+            subset (str): Subset of the dataset.
+            split (str): Split of the dataset.
+
+        Returns:
+            bool: True if the subset was already loaded.
+        """
+        row = self.conn.execute("SELECT 1 FROM subset_samples WHERE dataset = ? AND subset = ? AND split = ? LIMIT 1",
+                                (dataset, subset, split)).fetchone()
+        return row is not None
+
+    def add_subset(self, dataset, subset, split, audio_paths, durations=None):
+        """Store the samples of the dataset subset and split.
+
+        Args:
+            dataset (str): Dataset name.
+            subset (str): Subset of the dataset.
+            split (str): Split of the dataset.
+            audio_paths (list): Audio paths of all samples in the dataset order.
+            durations (list, optional): Durations of the samples from the dataset metadata. Defaults to None.
+        """
+        if durations is None:
+            durations = [None] * len(audio_paths)
+        self.conn.execute("BEGIN")
+        self.conn.executemany("INSERT OR REPLACE INTO subset_samples VALUES (?, ?, ?, ?, ?, ?)",
+                              [(dataset, subset, split, i, audio_path, duration)
+                               for i, (audio_path, duration) in enumerate(zip(audio_paths, durations))])
+        self.conn.execute("COMMIT")
+
+    def get_subset_samples(self, dataset, subset, split, max_samples):
+        """Get the first samples of the dataset subset and split in the dataset order.
+
+        Args:
+            dataset (str): Dataset name.
+            subset (str): Subset of the dataset.
+            split (str): Split of the dataset.
+            max_samples (int): Number of the first samples of the subset.
+
+        Returns:
+            list: List of (sample_idx, audio_path, duration) tuples.
+        """
+        return self.conn.execute("""
+            SELECT sample_idx, audio_path, duration FROM subset_samples
+            WHERE dataset = ? AND subset = ? AND split = ? AND sample_idx < ?
+            ORDER BY sample_idx""", (dataset, subset, split, max_samples)).fetchall()
+
+    def add_job(self, system, model, dataset, subset, split, max_samples):
+        """Add the job and its pending samples, or reconcile an existing job with the current sample limit.
+
+        Samples below the limit missing in an existing job are added, pending samples at or above
+        the limit (left by a run with a larger limit) are removed.
+
+        Args:
+            system (str): Identifier for the ASR system type.
+            model (str): The specific model of the ASR system.
+            dataset (str): Dataset name.
+            subset (str): Subset of the dataset.
+            split (str): Split of the dataset.
+            max_samples (int): Number of the first samples of the subset processed by the job.
+
+        Returns:
+            int: Identifier of the job.
+        """
+        self.conn.execute("INSERT OR IGNORE INTO jobs (system, model, dataset, subset, split) VALUES (?, ?, ?, ?, ?)",
+                          (system, model, dataset, subset, split))
+        job_id = self.get_job_id(system, model, dataset, subset, split)
+        self.conn.execute("""
+            INSERT OR IGNORE INTO job_samples (job_id, sample_idx, status)
+            SELECT ?, sample_idx, ? FROM subset_samples
+            WHERE dataset = ? AND subset = ? AND split = ? AND sample_idx < ?""",
+                          (job_id, PENDING, dataset, subset, split, max_samples))
+        self.conn.execute("DELETE FROM job_samples WHERE job_id = ? AND status = ? AND sample_idx >= ?",
+                          (job_id, PENDING, max_samples))
+        return job_id
+
+    def get_job_id(self, system, model, dataset, subset, split):
+        """Get the identifier of the job.
+
+        Args:
+            system (str): Identifier for the ASR system type.
+            model (str): The specific model of the ASR system.
+            dataset (str): Dataset name.
+            subset (str): Subset of the dataset.
+            split (str): Split of the dataset.
+
+        Returns:
+            int or None: Identifier of the job, None if the job is not in the manifest.
+        """
+        row = self.conn.execute("SELECT job_id FROM jobs WHERE system = ? AND model = ? AND dataset = ? AND subset = ? AND split = ?",
+                                (system, model, dataset, subset, split)).fetchone()
+        return row[0] if row else None
+
+    def get_nr_of_pending_samples(self, job_ids):
+        """Get the number of pending samples of the jobs.
+
+        Args:
+            job_ids (list): Identifiers of the jobs.
+
+        Returns:
+            int: Number of samples to process.
+        """
+        if not job_ids:
+            return 0
+        placeholders = ",".join("?" * len(job_ids))
+        row = self.conn.execute("SELECT COUNT(*) FROM job_samples WHERE status = ? AND job_id IN ({})".format(placeholders),
+                                [PENDING] + list(job_ids)).fetchone()
+        return row[0]
+
+    def restart_jobs(self, job_ids):
+        """Mark all samples of the jobs as pending and regenerate them with force_hyps (forced runs).
+
+        The jobs stay forced until every sample was processed once (see end_forced_pass).
+
+        Args:
+            job_ids (list): Identifiers of the jobs.
+        """
+        self.conn.execute("BEGIN")
+        for job_id in job_ids:
+            self.conn.execute("UPDATE job_samples SET status = ? WHERE job_id = ?", (PENDING, job_id))
+            self.conn.execute("UPDATE jobs SET force_hyps = 1 WHERE job_id = ?", (job_id,))
+        self.conn.execute("COMMIT")
+
+    def is_forced(self, job_id):
+        """Check if the job regenerates hypotheses of cached samples.
+
+        Args:
+            job_id (int): Identifier of the job.
+
+        Returns:
+            bool: True if the job was started with force_hyps and its forced pass is not finished yet.
+        """
+        return bool(self.conn.execute("SELECT force_hyps FROM jobs WHERE job_id = ?", (job_id,)).fetchone()[0])
+
+    def get_pending_samples(self, job_id):
+        """Get the pending samples of the job in the dataset order.
+
+        Args:
+            job_id (int): Identifier of the job.
+
+        Returns:
+            list: List of (sample_idx, audio_path, duration) tuples.
+        """
+        return self.conn.execute("""
+            SELECT s.sample_idx, s.audio_path, s.duration
+            FROM jobs j
+            JOIN job_samples js ON js.job_id = j.job_id
+            JOIN subset_samples s ON s.dataset = j.dataset AND s.subset = j.subset AND s.split = j.split AND s.sample_idx = js.sample_idx
+            WHERE j.job_id = ? AND js.status = ?
+            ORDER BY s.sample_idx""", (job_id, PENDING)).fetchall()
+
+    def mark_done(self, job_id, sample_idxs, failed_sample_idxs=()):
+        """Checkpoint the processed samples of the job.
+
+        Args:
+            job_id (int): Identifier of the job.
+            sample_idxs (list): Indexes of the samples with a valid hypothesis.
+            failed_sample_idxs (list, optional): Indexes of the samples with an EMPTY or INVALID hypothesis. Defaults to ().
+        """
+        self.conn.execute("BEGIN")
+        self.conn.executemany("UPDATE job_samples SET status = ? WHERE job_id = ? AND sample_idx = ?",
+                              [(DONE, job_id, sample_idx) for sample_idx in sample_idxs] +
+                              [(FAILED, job_id, sample_idx) for sample_idx in failed_sample_idxs])
+        self.conn.execute("COMMIT")
+
+    def end_forced_pass(self, job_id):
+        """Stop forcing the job after its forced pass processed every sample.
+
+        Samples left pending by the pass (failed requests) are retried by the next run from the cache or the ASR system.
+
+        Args:
+            job_id (int): Identifier of the job.
+        """
+        self.conn.execute("UPDATE jobs SET force_hyps = 0 WHERE job_id = ?", (job_id,))
@@ -1,10 +1,14 @@
 from prefect import task
 from datasets import load_dataset
 from eval_utils.lexical_metrics import get_lexical_metrics_per_dataset, get_lexical_metrics_per_sample
+from asr_systems.duration_batching import make_duration_batches, get_padding_ratio
 import pandas as pd
 import matplotlib.pyplot as plt
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 @task
 def load_config(config_path):
     """
@@ -21,7 +25,7 @@ def load_config(config_path):
     print("Loading config from {}".format(config_path))
 
 @task
-def gen_hyps_from_audio_samples(audio_paths, asr_system, force_hyps):
+def gen_hyps_from_audio_samples(audio_paths, asr_system, force_hyps, batch_size=1, durations=None, max_batch_sec=0, prefetch_depth=0, prefetch_workers=2):
     """
     Generate ASR hypotheses from audio samples.
     
@@ -29,18 +33,93 @@ def gen_hyps_from_audio_samples(audio_paths, asr_system, force_hyps):
         audio_paths (list): List of paths to audio files.
         asr_system (object): ASR system object with process_audio method.
         force_hyps (bool): Flag to force generation even if hypotheses exist in cache.
+        batch_size (int, optional): Number of audio files transcribed together by
+                                    process_audio_batch. Defaults to 1 (one file at a time).
+                                    Raised for cloud ASR systems configured with concurrent requests.
+        durations (list, optional): Durations of the audio files in seconds from the dataset metadata.
+                                    Defaults to None (unknown).
+        max_batch_sec (float, optional): Maximum padded audio seconds of a batch of samples with similar
+                                    durations. Used by local ASR systems if durations are known, with
+                                    batch_size > 1 as the limit of samples per batch. Defaults to 0 (disabled).
+        prefetch_depth (int, optional): Number of audio files decoded in the background ahead of the
+                                    model, at least one batch. Used by local ASR systems. Defaults to 0 (disabled).
+        prefetch_workers (int, optional): Number of background decoding threads. Defaults to 2.
     
     Returns:
         list: Generated ASR hypotheses.
     """
     asr_hyps = []
-    for audiopath in audio_paths:
-        print("Processing sample {}".format(audiopath))
-        asr_hyp = asr_system.process_audio(audiopath, force_hyps)
-        asr_hyps.append(asr_hyp)
+    # counters of the subset, with a progress line every LOG_PROGRESS_EVERY samples
+    asr_system.hyp_gen_stats.reset(len(audio_paths))
+    if not force_hyps:
+        # fetch hypotheses generated on other machines in a single request
+        asr_system.prefetch_from_cache_service(audio_paths)
+    request_engine = getattr(asr_system, "request_engine", None)
+    if request_engine is not None and request_engine.async_max_in_flight > 0:
+        # asyncio requests for the whole subset, the cache is updated as responses arrive
+        logger.info("Processing %d samples with up to %d asyncio requests in flight", len(audio_paths), request_engine.async_max_in_flight)
+        asr_hyps = asr_system.process_audio_async(audio_paths, force_hyps)
+        asr_system.flush_cache()
+        asr_system.hyp_gen_stats.log_progress("summary")
+        return(asr_hyps)
+    if request_engine is not None and request_engine.max_concurrency > 1:
+        # keep enough requests in flight to use the concurrency limit of the cloud ASR provider
+        batch_size = max(batch_size, 4 * request_engine.max_concurrency)
+    batches = None
+    if max_batch_sec > 0 and durations is not None and request_engine is None:
+        # batches of similar durations, results are returned in the original order
+        batches = make_duration_batches(durations, max_batch_sec, batch_size if batch_size > 1 else None)
+        logger.info("Processing %d samples in %d duration-bucketed batches (padding ratio: %.2f)", len(audio_paths), len(batches), get_padding_ratio(durations, batches))
+    if prefetch_depth > 0 and request_engine is None:
+        # decode the audio in the processing order, keeping at least the next batch decoded
+        processing_order = [audio_paths[i] for batch in batches for i in batch] if batches is not None else audio_paths
+        max_batch_len = max((len(batch) for batch in batches), default=1) if batches is not None else batch_size
+        asr_system.start_audio_prefetch(processing_order, force_hyps, max(prefetch_depth, max_batch_len), prefetch_workers)
+    if batches is not None:
+        asr_hyps = [None] * len(audio_paths)
+        for batch_nr, batch in enumerate(batches):
+            logger.debug("Processing batch %d of %d (%d samples)", batch_nr + 1, len(batches), len(batch))
+            batch_asr_hyps = asr_system.process_audio_batch([audio_paths[i] for i in batch], force_hyps)
+            for i, asr_hyp in zip(batch, batch_asr_hyps):
+                asr_hyps[i] = asr_hyp
+    elif batch_size > 1:
+        for i in range(0, len(audio_paths), batch_size):
+            batch_audio_paths = audio_paths[i:i + batch_size]
+            logger.debug("Processing samples %d-%d of %d", i + 1, i + len(batch_audio_paths), len(audio_paths))
+            asr_hyps.extend(asr_system.process_audio_batch(batch_audio_paths, force_hyps))
+    else:
+        for audiopath in audio_paths:
+            asr_hyp = asr_system.process_audio(audiopath, force_hyps)
+            asr_hyps.append(asr_hyp)
+    asr_system.stop_audio_prefetch()
+    # persist hypotheses buffered by the write-behind cache after every subset
+    asr_system.flush_cache()
+    asr_system.hyp_gen_stats.log_progress("summary")
     
     return(asr_hyps)
 
+@task
+def gen_hyps_with_worker_pool(audio_paths, asr_system, worker_pool, force_hyps):
+    """
+    Generate ASR hypotheses from audio samples with a pool of worker processes.
+    
+    Args:
+        audio_paths (list): List of paths to audio files.
+        asr_system (object): ASR system owning the cache, e.g. initialized in cache-only mode.
+        worker_pool (HypGenWorkerPool): Worker processes with the model replicas.
+        force_hyps (bool): Flag to force generation even if hypotheses exist in cache.
+    
+    Returns:
+        list: Generated ASR hypotheses.
+    """
+    asr_system.hyp_gen_stats.reset(len(audio_paths))
+    if not force_hyps:
+        # fetch hypotheses generated on other machines in a single request
+        asr_system.prefetch_from_cache_service(audio_paths)
+    asr_hyps = worker_pool.generate(asr_system, audio_paths, force_hyps)
+    asr_system.hyp_gen_stats.log_progress("summary")
+    return asr_hyps
+
 @task
 def load_hf_dataset(dataset_name, subset="all", force_download=False):
     """
@@ -190,7 +269,7 @@ def calculate_eval_metrics_per_dataset(eval_input_df, dataset, subset, split, sy
     return(df_eval_results_all)
 
 @task
-def calculate_eval_metrics_per_sample(eval_input_df, dataset, subset, split, system_codename, ref_types=["orig"], norm_types=["all"], norm_lexicon=None):
+def calculate_eval_metrics_per_sample(eval_input_df, dataset, subset, split, system_codename, ref_types=["orig"], norm_types=["all"], norm_lexicon=None, audio_durations=None):
     """
     Calculate evaluation metrics for each sample individually.
     
@@ -203,6 +282,8 @@ def calculate_eval_metrics_per_sample(eval_input_df, dataset, subset, split, sys
         ref_types (list, optional): Types of references to use. Defaults to ["orig"].
         norm_types (list, optional): Types of normalization to apply. Defaults to ["all"].
         norm_lexicon (dict, optional): Normalization lexicon. Defaults to None.
+        audio_durations (dict, optional): Audio path -> duration in seconds from the sample catalog.
+                                          Defaults to None (durations read from the audio files).
     
     Returns:
         pd.DataFrame: DataFrame containing evaluation metrics for each sample.
@@ -213,7 +294,7 @@ def calculate_eval_metrics_per_sample(eval_input_df, dataset, subset, split, sys
     for ref_type in ref_types:
         #iterate over normalization methods
         for norm_type in norm_types:
-            df_eval_results = get_lexical_metrics_per_sample(eval_input_df, dataset, subset, split, system_codename, ref_type, norm_type, norm_lexicon)
+            df_eval_results = get_lexical_metrics_per_sample(eval_input_df, dataset, subset, split, system_codename, ref_type, norm_type, norm_lexicon, audio_durations)
             df_eval_results_all = pd.concat([df_eval_results_all, df_eval_results])
 
     return(df_eval_results_all)
@@ -263,15 +344,12 @@ def check_cached_hyps_size_and_coverage(asr_system, audio_paths):
     """
     # Implement logic to get number of cached hypotheses
     asr_system_codename = asr_system.get_codename()
-    cached_hyps = asr_system.get_cached_hyps()
-    # check if audio paths are in cache
-    cached_audio_paths = list(cached_hyps.keys())
-    nr_of_cached_hyps = len(cached_audio_paths)
-    # check common part of cached_audio_paths and audio_paths
-    common_audio_paths = list(set(cached_audio_paths) & set(audio_paths))
+    # look up only the requested audio paths instead of loading all cached hypotheses
+    nr_of_cached_hyps = asr_system.get_nr_of_cached_hyps()
+    # check common part of cached audio paths and audio_paths
+    common_audio_paths = [audio_path for audio_path in set(audio_paths) if asr_system.is_cached(audio_path)]
     nr_of_common_audio_paths = len(common_audio_paths)
-    missing_audio_paths = list(set(audio_paths) - set(cached_audio_paths))
-    nr_of_missing_audio_paths = len(missing_audio_paths)
+    nr_of_missing_audio_paths = len(set(audio_paths)) - nr_of_common_audio_paths
     return(nr_of_cached_hyps, nr_of_common_audio_paths, nr_of_missing_audio_paths)
 
 
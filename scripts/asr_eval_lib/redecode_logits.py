@@ -0,0 +1,144 @@
+"""
+BIGOS ASR Evaluation Framework - Re-decoding of Cached CTC Logits
+
+This script decodes the logits of a CTC model cached during hypothesis generation
+(CACHE_SETTINGS LOGITS_CACHE = True) with a new decoding strategy, without running the
+acoustic model. The hypotheses are stored in the hypothesis cache of a new system variant
+(model name "<model>-<variant>"), so they are evaluated and reported separately by the
+EVAL_PREP and EVAL_RUN flows when the variant is added to the models of the system in the
+runtime config.
+
+Decoding strategies:
+1. greedy: argmax over the frames, with optional blank penalty and vocabulary filter
+2. beam: CTC beam search (requires the optional pyctcdecode package)
+
+Usage:
+    python redecode_logits.py --system=<system> --model=<model> [--version=<YYYYQn>] [--decoder=greedy|beam]
+                              [--beam_width=<int>] [--blank_penalty=<float>] [--allowed_tokens=<characters>]
+                              [--variant=<name>] [--dataset=<name> --subset=<name> --split=<name>]
+
+Example:
+    python redecode_logits.py --system=wav2vec2 --model=xls-r-1b-polish --decoder=greedy --blank_penalty=0.5
+"""
+
+# Add the repository root to sys.path before importing the scripts.* modules of the repository
+import os
+import sys
+repo_root_dir = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../../'))
+sys.path.insert(0, repo_root_dir)
+
+from asr_systems import initialize_cache_only_asr_system
+from asr_systems.hyp_cache import get_cache_codename
+from asr_systems.logits_cache import LogitsCache, get_logits_cache_dir, ctc_greedy_decode, ctc_beam_search_decode
+from scripts.utils.utils import read_config_ini, configure_logging
+from scripts.utils.sample_catalog import get_sample_catalog, get_sample_catalog_file
+import argparse
+import time
+
+DECODERS = ["greedy", "beam"]
+
+def get_variant_name(decoder, beam_width, blank_penalty, allowed_tokens):
+    """Build the default name of the system variant from the decoding options.
+
+    Args:
+        decoder (str): Decoding strategy (greedy or beam).
+        beam_width (int): Number of beams of the beam search.
+        blank_penalty (float): Value subtracted from the log probability of the blank token.
+        allowed_tokens (str or None): Characters that can be emitted.
+
+    Returns:
+        str: Variant name, e.g. "greedy-bp0.5" or "beam100".
+    """
+    variant = "beam{}".format(beam_width) if decoder == "beam" else decoder
+    if blank_penalty:
+        variant += "-bp{}".format(blank_penalty)
+    if allowed_tokens:
+        variant += "-filtered"
+    return variant
+
+if __name__ == "__main__":
+    script_dir = os.path.dirname(os.path.realpath(__file__))
+
+    parser = argparse.ArgumentParser(
+        description='BIGOS re-decoding of cached CTC logits',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+Examples:
+  # Greedy decoding with a blank penalty, hypotheses cached as wav2vec2 / xls-r-1b-polish-greedy-bp0.5
+  python redecode_logits.py --system=wav2vec2 --model=xls-r-1b-polish --blank_penalty=0.5
+
+  # Beam search over the samples of a single subset
+  python redecode_logits.py --system=mms --model=1b-all --decoder=beam --dataset=amu-cai/pl-asr-bigos-v2 --subset=pwr-maleset-unk --split=test
+        """
+    )
+    parser.add_argument('--system', type=str, required=True,
+                        help='ASR system type of the cached logits (e.g. wav2vec2, mms, nemo)')
+    parser.add_argument('--model', type=str, required=True,
+                        help='Model of the cached logits')
+    parser.add_argument('--version', type=str,
+                        help='Version of the ASR system (YYYYQn format)',
+                        default="2024Q1")
+    parser.add_argument('--decoder', type=str,
+                        help='Decoding strategy: greedy or beam',
+                        default="greedy")
+    parser.add_argument('--beam_width', type=int,
+                        help='Number of beams of the beam search',
+                        default=100)
+    parser.add_argument('--blank_penalty', type=float,
+                        help='Value subtracted from the log probability of the blank token (positive - more tokens)',
+                        default=0.0)
+    parser.add_argument('--allowed_tokens', type=str,
+                        help='Characters that can be emitted by the greedy decoder (default: all tokens)',
+                        default=None)
+    parser.add_argument('--variant', type=str,
+                        help='Name of the system variant (default: built from the decoding options)',
+                        default=None)
+    parser.add_argument('--dataset', type=str,
+                        help='Decode only the samples of the dataset subset and split recorded in the sample catalog',
+                        default=None)
+    parser.add_argument('--subset', type=str, default=None)
+    parser.add_argument('--split', type=str, default=None)
+    args = parser.parse_args()
+
+    if args.decoder not in DECODERS:
+        print(f"Unknown decoder: {args.decoder}. Supported decoders: {DECODERS}")
+        sys.exit(1)
+
+    config_user_path = os.path.join(script_dir, '../../config/user-specific/config.ini')
+    if not os.path.exists(config_user_path):
+        print(f"User config file does not exist: {config_user_path}")
+        sys.exit(1)
+    config_user = read_config_ini(config_user_path)
+    configure_logging(config_user)
+
+    cache_dir = os.path.join(config_user["PATHS"]["BIGOS_EVAL_DATA_REPO_PATH"], "asr_hyps_cache")
+    logits_cache_dir = get_logits_cache_dir(cache_dir, get_cache_codename(args.system, args.model), args.version)
+    if not os.path.exists(os.path.join(logits_cache_dir, "index.jsonl")):
+        print(f"Logits cache does not exist: {logits_cache_dir}")
+        sys.exit(1)
+    logits_cache = LogitsCache(logits_cache_dir)
+    audio_paths = logits_cache.get_audio_paths()
+    print("Cached logits: {} samples in {}".format(len(audio_paths), logits_cache_dir))
+
+    if args.dataset:
+        subset_paths = set(get_sample_catalog(get_sample_catalog_file(config_user)).get_subset_paths(args.dataset, args.subset, args.split))
+        audio_paths = {cache_key: audio_path for cache_key, audio_path in audio_paths.items() if audio_path in subset_paths}
+        print("Samples of {} {} {}: {}".format(args.dataset, args.subset, args.split, len(audio_paths)))
+
+    variant = args.variant or get_variant_name(args.decoder, args.beam_width, args.blank_penalty, args.allowed_tokens)
+    variant_model = "{}-{}".format(args.model, variant)
+    asr_system = initialize_cache_only_asr_system(args.system, variant_model, args.version)
+
+    allowed_tokens = set(args.allowed_tokens) | {logits_cache.vocabulary.get("word_delimiter")} if args.allowed_tokens else None
+    start_time = time.monotonic()
+    for cache_key, audio_path in audio_paths.items():
+        logits = logits_cache.get(cache_key)
+        if args.decoder == "beam":
+            hyp = ctc_beam_search_decode(logits, logits_cache.vocabulary, args.beam_width, args.blank_penalty)
+        else:
+            hyp = ctc_greedy_decode(logits, logits_cache.vocabulary, args.blank_penalty, allowed_tokens)
+        asr_system.update_cache(audio_path, hyp if hyp != "" else "EMPTY")
+    asr_system.flush_cache()
+    print("\nDecoded {} samples in {:.1f} s".format(len(audio_paths), time.monotonic() - start_time))
+    print("Hypotheses cached as {} - {} (codename: {}). Add the model \"{}\" to the runtime config to evaluate the variant.".format(
+        args.system, variant_model, asr_system.get_codename(), variant_model))
@@ -0,0 +1,296 @@
+"""
+Sample Catalog Module.
+
+Persistent catalog of the audio samples of the BIGOS datasets, stored in a SQLite database
+(<BIGOS_EVAL_DATA_REPO_PATH>/sample_catalog.sqlite by default). For every audio path it keeps
+the file size, modification time, existence, duration and sample rate read from the file
+header. Catalog entries are refreshed only when the file size or modification time change,
+so the flows read durations and validity of the samples from the catalog instead of opening
+the audio files on every run. Entries are read from the database on first use, not loaded
+up front. Content digests of the files are served by the audio digest index of the
+hypothesis cache (asr_systems.audio_digest), so every file is hashed at most once and only
+when its digest is requested.
+
+The samples of every dataset/subset/split are recorded as well, so the catalog of a subset
+is built once (in parallel) and reused by all flows, systems and normalization types.
+"""
+
+import os
+import wave
+import sqlite3
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# catalogs shared by all users in the process
+_sample_catalogs = {}
+
+def get_sample_catalog_file(config_user):
+    """Get the path to the sample catalog from the user-specific config.
+
+    Args:
+        config_user (configparser.ConfigParser): User-specific config.
+
+    Returns:
+        str: Path to the SQLite database, CACHE_SETTINGS SAMPLE_CATALOG_FILE if set.
+    """
+    catalog_file = config_user.get("CACHE_SETTINGS", "SAMPLE_CATALOG_FILE", fallback=None)
+    if catalog_file:
+        return catalog_file
+    return os.path.join(config_user["PATHS"]["BIGOS_EVAL_DATA_REPO_PATH"], "sample_catalog.sqlite")
+
+def get_sample_catalog(catalog_file, digest_index_file=None):
+    """Get the sample catalog stored in the catalog file, opening it on first use.
+
+    Args:
+        catalog_file (str): Path to the SQLite database.
+        digest_index_file (str, optional): Path to the audio digest index used by get_digest,
+                                           set on the shared catalog if it has none. Defaults to None.
+
+    Returns:
+        SampleCatalog: The catalog shared by all users in the process.
+    """
+    if catalog_file not in _sample_catalogs:
+        _sample_catalogs[catalog_file] = SampleCatalog(catalog_file)
+    sample_catalog = _sample_catalogs[catalog_file]
+    if sample_catalog.digest_index_file is None:
+        sample_catalog.digest_index_file = digest_index_file
+    return sample_catalog
+
+def read_audio_header(audio_path):
+    """Read the duration and sample rate of the audio file from its header.
+
+    Args:
+        audio_path (str): Path to the audio file.
+
+    Returns:
+        tuple: (duration in seconds, sample rate), (None, None) if the header can not be read.
+    """
+    try:
+        import soundfile
+        info = soundfile.info(audio_path)
+        return info.duration, info.samplerate
+    except Exception:
+        pass
+    try:
+        # PCM WAV files without soundfile installed
+        with wave.open(audio_path, "rb") as f:
+            return f.getnframes() / f.getframerate(), f.getframerate()
+    except Exception:
+        pass
+    try:
+        # formats not supported by libsndfile (e.g. mp3)
+        import librosa
+        if librosa.__version__ < "0.10.0":
+            duration = librosa.get_duration(path=audio_path)
+        else:
+            duration = librosa.get_duration(filename=audio_path)
+        return duration, librosa.get_samplerate(audio_path)
+    except Exception as e:
+        logger.warning("Failed to read the header of %s: %s", audio_path, e)
+        return None, None
+
+class SampleCatalog:
+    """Persistent catalog of audio samples.
+
+    Entries are dictionaries with the keys "size", "mtime_ns", "exists", "duration" and
+    "sample_rate". Missing files are cataloged with "exists" set to False.
+
+    Attributes:
+        catalog_file (str): Path to the SQLite database on disk.
+        digest_index_file (str or None): Path to the audio digest index used by get_digest.
+        entries (dict): Dictionary mapping audio paths to the catalog entries read or written in this process.
+    """
+
+    def __init__(self, catalog_file, digest_index_file=None, timeout=60):
+        """Open the catalog and create the database schema if needed.
+
+        Args:
+            catalog_file (str): Path to the SQLite database on disk.
+            digest_index_file (str, optional): Path to the audio digest index used by get_digest. Defaults to None.
+            timeout (float, optional): Number of seconds to wait for a lock held by another process. Defaults to 60.
+        """
+        self.catalog_file = catalog_file
+        self.digest_index_file = digest_index_file
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(catalog_file)), exist_ok=True)
+        self.conn = sqlite3.connect(catalog_file, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS samples (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                file_exists INTEGER NOT NULL,
+                duration REAL,
+                sample_rate INTEGER
+            )""")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS subset_samples (
+                dataset TEXT NOT NULL,
+                subset TEXT NOT NULL,
+                split TEXT NOT NULL,
+                path TEXT NOT NULL,
+                PRIMARY KEY (dataset, subset, split, path)
+            )""")
+        self.entries = {}
+
+    def read_entry(self, audio_path):
+        """Get the stored catalog entry of the audio file, reading it from the database on first use.
+
+        Args:
+            audio_path (str): Path to the audio file.
+
+        Returns:
+            dict or None: The catalog entry, None if the file was never cataloged.
+        """
+        entry = self.entries.get(audio_path)
+        if entry is not None:
+            return entry
+        with self.lock:
+            row = self.conn.execute("SELECT size, mtime_ns, file_exists, duration, sample_rate FROM samples WHERE path = ?",
+                                    (audio_path,)).fetchone()
+        if row is None:
+            return None
+        size, mtime_ns, file_exists, duration, sample_rate = row
+        entry = {"size": size, "mtime_ns": mtime_ns, "exists": bool(file_exists), "duration": duration, "sample_rate": sample_rate}
+        self.entries[audio_path] = entry
+        return entry
+
+    @staticmethod
+    def create_entry(audio_path):
+        """Read the catalog entry of the audio file from the file system.
+
+        Args:
+            audio_path (str): Path to the audio file.
+
+        Returns:
+            dict: The catalog entry.
+        """
+        try:
+            stat = os.stat(audio_path)
+        except OSError:
+            return {"size": 0, "mtime_ns": 0, "exists": False, "duration": None, "sample_rate": None}
+        duration, sample_rate = read_audio_header(audio_path) if stat.st_size > 0 else (0.0, None)
+        return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "exists": True,
+                "duration": duration, "sample_rate": sample_rate}
+
+    def is_stale(self, audio_path):
+        """Check if the catalog entry of the audio file is missing or outdated.
+
+        Args:
+            audio_path (str): Path to the audio file.
+
+        Returns:
+            bool: True if the file was not cataloged or its size or modification time changed.
+        """
+        entry = self.read_entry(audio_path)
+        if entry is None:
+            return True
+        try:
+            stat = os.stat(audio_path)
+        except OSError:
+            return entry["exists"]
+        return not entry["exists"] or entry["size"] != stat.st_size or entry["mtime_ns"] != stat.st_mtime_ns
+
+    def put_many(self, items):
+        """Store several catalog entries.
+
+        Args:
+            items (list): List of (audio_path, entry) tuples.
+        """
+        with self.lock:
+            for audio_path, entry in items:
+                self.entries[audio_path] = entry
+            self.conn.execute("BEGIN")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO samples (path, size, mtime_ns, file_exists, duration, sample_rate) VALUES (?, ?, ?, ?, ?, ?)",
+                [(audio_path, entry["size"], entry["mtime_ns"], int(entry["exists"]), entry["duration"], entry["sample_rate"])
+                 for audio_path, entry in items])
+            self.conn.execute("COMMIT")
+
+    def get_entry(self, audio_path):
+        """Get the catalog entry of the audio file, cataloging it if it is new or was modified.
+
+        Args:
+            audio_path (str): Path to the audio file.
+
+        Returns:
+            dict: The catalog entry.
+        """
+        if self.is_stale(audio_path):
+            self.put_many([(audio_path, self.create_entry(audio_path))])
+        return self.entries[audio_path]
+
+    def get_digest(self, audio_path):
+        """Get the content digest of the audio file from the audio digest index, hashing the file only if it is new or was modified.
+
+        Args:
+            audio_path (str): Path to the audio file.
+
+        Returns:
+            str or None: Hex encoded 128-bit BLAKE2b digest, None if the file does not exist.
+
+        Raises:
+            ValueError: If the catalog was opened without the path to the audio digest index.
+        """
+        if self.digest_index_file is None:
+            raise ValueError("Sample catalog {} has no audio digest index".format(self.catalog_file))
+        # shared with the digest cache keys of the ASR systems
+        from asr_systems.audio_digest import get_audio_digest_index
+        return get_audio_digest_index(self.digest_index_file).get_digest(audio_path)
+
+    def build(self, audio_paths, dataset=None, subset=None, split=None, num_workers=8):
+        """Catalog the audio files in parallel, skipping files with up-to-date entries.
+
+        Args:
+            audio_paths (list): Paths to the audio files.
+            dataset (str, optional): Dataset of the audio files, recorded with subset and split. Defaults to None.
+            subset (str, optional): Subset of the dataset. Defaults to None.
+            split (str, optional): Split of the dataset. Defaults to None.
+            num_workers (int, optional): Number of threads reading the files. Defaults to 8.
+
+        Returns:
+            int: Number of newly cataloged audio files.
+        """
+        stale_paths = [audio_path for audio_path in dict.fromkeys(audio_paths) if self.is_stale(audio_path)]
+        if stale_paths:
+            logger.info("Cataloging %d of %d audio files with %d threads", len(stale_paths), len(audio_paths), num_workers)
+            with ThreadPoolExecutor(max_workers=max(1, num_workers)) as executor:
+                new_entries = list(executor.map(self.create_entry, stale_paths))
+            self.put_many(list(zip(stale_paths, new_entries)))
+        if dataset is not None:
+            with self.lock:
+                self.conn.execute("BEGIN")
+                self.conn.executemany("INSERT OR IGNORE INTO subset_samples VALUES (?, ?, ?, ?)",
+                                      [(dataset, subset, split, audio_path) for audio_path in audio_paths])
+                self.conn.execute("COMMIT")
+        return len(stale_paths)
+
+    def get_durations(self, audio_paths):
+        """Get the durations of the audio files, cataloging the files that are not cataloged yet.
+
+        Args:
+            audio_paths (list): Paths to the audio files.
+
+        Returns:
+            list: Durations in seconds in the order of audio_paths (None for missing or unreadable files).
+        """
+        self.build(audio_paths)
+        return [self.entries[audio_path]["duration"] for audio_path in audio_paths]
+
+    def get_subset_paths(self, dataset, subset, split):
+        """Get the audio paths recorded for the dataset subset and split.
+
+        Args:
+            dataset (str): Dataset name.
+            subset (str): Subset of the dataset.
+            split (str): Split of the dataset.
+
+        Returns:
+            list: Audio paths of the subset.
+        """
+        rows = self.conn.execute("SELECT path FROM subset_samples WHERE dataset = ? AND subset = ? AND split = ?", (dataset, subset, split))
+        return [path for (path,) in rows]
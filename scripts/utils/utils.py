@@ -1,4 +1,5 @@
 import json
+import logging
 import configparser
 
 def read_config_ini(config_path):
@@ -9,4 +10,36 @@ def read_config_ini(config_path):
 def read_config_json(config_path):
     with open(config_path, "r") as f:
         config = json.load(f)
-    return config
\ No newline at end of file
+    return config
+
+# packages of the evaluation framework logging through logging.getLogger(__name__)
+LOGGER_NAMES = ["asr_systems", "eval_utils", "prefect_flows", "scripts.utils"]
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+def get_log_settings(config_user):
+    """Get the logging settings (optional LOGGING section of the user-specific config).
+
+    Args:
+        config_user (configparser.ConfigParser): User-specific config.
+
+    Returns:
+        dict: level (name of the log level), progress_every (samples per HYP_GEN progress line, 0 - disabled)
+              and debug_sample_every (1 of N samples logged at DEBUG level).
+    """
+    return {"level": config_user.get("LOGGING", "LOG_LEVEL", fallback="INFO").upper(),
+            "progress_every": config_user.getint("LOGGING", "LOG_PROGRESS_EVERY", fallback=1000),
+            "debug_sample_every": config_user.getint("LOGGING", "LOG_DEBUG_SAMPLE_EVERY", fallback=100)}
+
+def configure_logging(config_user):
+    """Set the level of the loggers of the evaluation framework.
+
+    Records propagate to the handlers of the root logger (e.g. configured by Prefect). A stream
+    handler is added to the root logger only if it has no handlers yet.
+
+    Args:
+        config_user (configparser.ConfigParser): User-specific config.
+    """
+    level = get_log_settings(config_user)["level"]
+    logging.basicConfig(format=LOG_FORMAT)
+    for name in LOGGER_NAMES:
+        logging.getLogger(name).setLevel(level)